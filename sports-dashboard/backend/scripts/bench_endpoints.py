@@ -0,0 +1,342 @@
+"""
+Benchmark das rotas de equipas, jogadores, jogos e análises: latência
+(percentis), número de instruções SQL e tamanho das respostas por rota.
+
+Os pedidos passam pelo cliente de testes do Flask contra uma base de dados
+preenchida pelo gerador sintético (src.services.synthetic), criada na
+primeira execução (por omissão na pasta temporária do sistema, uma por
+escala e seed). Cada rota é medida a quente (caches e tabelas derivadas
+válidas) e a frio (todas as versões de dados incrementadas antes de cada
+pedido, o que invalida as caches). O resultado em JSON serve para comparar
+commits. Uso (a partir de sports-dashboard/backend):
+
+    python scripts/bench_endpoints.py --database /tmp/bench.db --scale medium
+    python scripts/bench_endpoints.py --database /tmp/bench.db --output depois.json --compare antes.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Dimensões do gerador sintético por escala
+SCALES = {
+    'small': {'leagues': 2, 'teams_per_league': 10, 'seasons': 2},
+    'medium': {'leagues': 4, 'teams_per_league': 20, 'seasons': 4},
+    'full': {'leagues': 10, 'teams_per_league': 20, 'seasons': 10}
+}
+# Blueprints cujas rotas devem estar todas cobertas
+BLUEPRINTS = ('team', 'player', 'match', 'analytics')
+PERCENTILES = (50, 90, 95, 99)
+
+class QueryCounter:
+    """Conta as instruções SQL executadas no motor entre reset() e a leitura."""
+    
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._count)
+    
+    def _count(self, *args):
+        self.count += 1
+    
+    def reset(self):
+        self.count = 0
+
+def percentile(values, p):
+    """Percentil pelo método do posto mais próximo (valores já ordenados)."""
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+def summarize(samples):
+    latencies = sorted(sample['ms'] for sample in samples)
+    queries = [sample['queries'] for sample in samples]
+    result = {f'p{p}_ms': round(percentile(latencies, p), 3) for p in PERCENTILES}
+    result.update({
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'min_ms': round(latencies[0], 3),
+        'max_ms': round(latencies[-1], 3),
+        'queries_median': statistics.median_low(queries),
+        'queries_max': max(queries),
+        'bytes_median': statistics.median_low([sample['bytes'] for sample in samples]),
+        'status': sorted({sample['status'] for sample in samples})
+    })
+    return result
+
+def sample_ids(db):
+    """Equipas, jogadores e jogos usados nos pedidos (sempre os mesmos para a mesma seed)."""
+    from src.models import Team, Player, Match
+    
+    team = Team.query.order_by(Team.id).first()
+    rival = Team.query.filter(Team.league == team.league, Team.id != team.id).order_by(Team.id).first()
+    forwards = Player.query.filter_by(team_id=team.id, position='Forward').order_by(Player.id).limit(2).all()
+    match = (
+        Match.query.filter(Match.status == 'completed', Match.home_team_id == team.id)
+        .order_by(Match.date.desc())
+        .first()
+    )
+    scheduled = Match.query.filter(Match.status == 'scheduled').order_by(Match.id).first()
+    return {
+        'team_id': team.id,
+        'team2_id': rival.id,
+        'league': team.league,
+        'season': match.season,
+        'competition': match.competition,
+        'player_id': forwards[0].id,
+        'player2_id': forwards[1].id,
+        'match_id': match.id,
+        'scheduled_match_id': scheduled.id if scheduled else match.id
+    }
+
+def build_cases(ids):
+    """
+    Pedidos a medir: (nome, método, url, corpo, preparação, limpeza).
+    A preparação cria o alvo de escritas destrutivas e devolve variáveis
+    para o url; a limpeza desfaz o que o pedido criou. Nenhuma das duas
+    entra na medição.
+    """
+    def new_team(client):
+        response = client.post('/api/teams/', json={'name': 'Bench FC', 'country': 'Portugal', 'league': 'Bench'})
+        return {'target_id': response.get_json()['team']['id']}
+    
+    def new_player(client):
+        response = client.post('/api/players/', json={
+            'name': 'Bench Player', 'position': 'Midfielder', 'nationality': 'Portugal', 'team_id': ids['team_id']
+        })
+        return {'target_id': response.get_json()['player']['id']}
+    
+    def new_match(client):
+        response = client.post('/api/matches/', json={
+            'date': '2099-01-01T15:00:00', 'home_team_id': ids['team_id'], 'away_team_id': ids['team2_id'],
+            'season': 'bench', 'competition': 'Bench'
+        })
+        return {'target_id': response.get_json()['match']['id']}
+    
+    def delete(path, key):
+        def cleanup(client, response, variables):
+            target_id = variables.get('target_id') or (response.get_json() or {}).get(key, {}).get('id')
+            if target_id:
+                client.delete(f'/api/{path}/{target_id}')
+        return cleanup
+    
+    def delete_events(client, response, variables):
+        from src.main import db
+        from src.models import MatchEvent
+        from src.services import versions
+        created = [event['id'] for event in (response.get_json() or {}).get('events', [])]
+        with client.application.app_context():
+            MatchEvent.query.filter(MatchEvent.id.in_(created)).delete(synchronize_session=False)
+            versions.bump('match_events', f'match_events:match_id:{ids["scheduled_match_id"]}')
+            db.session.commit()
+    
+    team_id, player_id, match_id = ids['team_id'], ids['player_id'], ids['match_id']
+    league, season = ids['league'], ids['season']
+    events = {'events': [
+        {'type': 'goal', 'team_id': ids['team_id'], 'player_id': player_id, 'minute': 10},
+        {'type': 'yellow_card', 'team_id': ids['team_id'], 'player_id': player_id, 'minute': 20}
+    ]}
+    
+    return [
+        ('GET /api/teams/', 'GET', '/api/teams/', None, None, None),
+        ('GET /api/teams/<int:team_id>', 'GET', f'/api/teams/{team_id}', None, None, None),
+        ('GET /api/teams/<int:team_id>/players', 'GET', f'/api/teams/{team_id}/players', None, None, None),
+        ('GET /api/teams/<int:team_id>/matches', 'GET', f'/api/teams/{team_id}/matches', None, None, None),
+        ('GET /api/teams/<int:team_id>/statistics', 'GET', f'/api/teams/{team_id}/statistics', None, None, None),
+        ('POST /api/teams/', 'POST', '/api/teams/', {'name': 'Bench FC', 'country': 'Portugal', 'league': 'Bench'}, None, delete('teams', 'team')),
+        ('PUT /api/teams/<int:team_id>', 'PUT', '/api/teams/{target_id}', {'founded_year': 1900}, new_team, delete('teams', 'team')),
+        ('DELETE /api/teams/<int:team_id>', 'DELETE', '/api/teams/{target_id}', None, new_team, None),
+        
+        ('GET /api/players/', 'GET', '/api/players/', None, None, None),
+        ('GET /api/players/ [team_id]', 'GET', f'/api/players/?team_id={team_id}', None, None, None),
+        ('GET /api/players/<int:player_id>', 'GET', f'/api/players/{player_id}', None, None, None),
+        ('GET /api/players/<int:player_id>/statistics', 'GET', f'/api/players/{player_id}/statistics', None, None, None),
+        ('GET /api/players/<int:player_id>/statistics [season]', 'GET', f'/api/players/{player_id}/statistics?season={season}', None, None, None),
+        ('GET /api/players/<int:player_id>/performance', 'GET', f'/api/players/{player_id}/performance', None, None, None),
+        ('POST /api/players/', 'POST', '/api/players/', {
+            'name': 'Bench Player', 'position': 'Midfielder', 'nationality': 'Portugal', 'team_id': team_id
+        }, None, delete('players', 'player')),
+        ('PUT /api/players/<int:player_id>', 'PUT', '/api/players/{target_id}', {'jersey_number': 99}, new_player, delete('players', 'player')),
+        ('DELETE /api/players/<int:player_id>', 'DELETE', '/api/players/{target_id}', None, new_player, None),
+        
+        ('GET /api/matches/', 'GET', '/api/matches/', None, None, None),
+        ('GET /api/matches/ [season, team_id]', 'GET', f'/api/matches/?season={season}&team_id={team_id}', None, None, None),
+        ('GET /api/matches/<int:match_id>', 'GET', f'/api/matches/{match_id}', None, None, None),
+        ('GET /api/matches/<int:match_id>/statistics', 'GET', f'/api/matches/{match_id}/statistics', None, None, None),
+        ('GET /api/matches/<int:match_id>/timeline', 'GET', f'/api/matches/{match_id}/timeline', None, None, None),
+        ('GET /api/matches/<int:match_id>/stream', 'GET', f'/api/matches/{match_id}/stream', None, None, None),
+        ('POST /api/matches/', 'POST', '/api/matches/', {
+            'date': '2099-01-01T15:00:00', 'home_team_id': team_id, 'away_team_id': ids['team2_id'],
+            'season': 'bench', 'competition': 'Bench'
+        }, None, delete('matches', 'match')),
+        ('PUT /api/matches/<int:match_id>', 'PUT', '/api/matches/{target_id}', {
+            'home_score': 2, 'away_score': 1, 'status': 'completed'
+        }, new_match, delete('matches', 'match')),
+        ('DELETE /api/matches/<int:match_id>', 'DELETE', '/api/matches/{target_id}', None, new_match, None),
+        ('POST /api/matches/<int:match_id>/events', 'POST', f'/api/matches/{ids["scheduled_match_id"]}/events', events, None, delete_events),
+        
+        ('GET /api/analytics/dashboard', 'GET', '/api/analytics/dashboard', None, None, None),
+        ('GET /api/analytics/cache-stats', 'GET', '/api/analytics/cache-stats', None, None, None),
+        ('GET /api/analytics/team-comparison', 'GET', f'/api/analytics/team-comparison?team1_id={team_id}&team2_id={ids["team2_id"]}', None, None, None),
+        ('GET /api/analytics/player-comparison', 'GET', f'/api/analytics/player-comparison?player1_id={player_id}&player2_id={ids["player2_id"]}', None, None, None),
+        ('GET /api/analytics/similar-players', 'GET', f'/api/analytics/similar-players?player_id={player_id}', None, None, None),
+        ('GET /api/analytics/league-table', 'GET', f'/api/analytics/league-table?league={league}&season={season}', None, None, None),
+        ('GET /api/analytics/ratings', 'GET', f'/api/analytics/ratings?league={league}&season={season}', None, None, None),
+        ('GET /api/analytics/performance-trends [team_id]', 'GET', f'/api/analytics/performance-trends?team_id={team_id}', None, None, None),
+        ('GET /api/analytics/performance-trends [player_id]', 'GET', f'/api/analytics/performance-trends?player_id={player_id}', None, None, None)
+    ]
+
+def uncovered_routes(app, cases):
+    """Rotas dos blueprints medidos sem nenhum pedido no benchmark."""
+    covered = {name.split(' [')[0] for name, *_ in cases}
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.split('.')[0] not in BLUEPRINTS:
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS', 'PATCH'}):
+            if f'{method} {rule.rule}' not in covered:
+                missing.append(f'{method} {rule.rule}')
+    return missing
+
+def run_case(client, counter, invalidate, case, iterations, cold):
+    name, method, url, body, setup, cleanup = case
+    samples = []
+    
+    for _ in range(iterations):
+        variables = setup(client) if setup else {}
+        if cold:
+            invalidate()
+        
+        counter.reset()
+        started = time.perf_counter()
+        response = client.open(url.format(**variables), method=method, json=body)
+        # Respostas em streaming só terminam quando o corpo é lido
+        size = len(response.get_data())
+        elapsed = (time.perf_counter() - started) * 1000
+        queries = counter.count
+        
+        samples.append({'ms': elapsed, 'queries': queries, 'bytes': size, 'status': response.status_code})
+        if cleanup:
+            cleanup(client, response, variables)
+    
+    return summarize(samples)
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], check=True, capture_output=True, text=True, cwd=BACKEND_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, baseline):
+    """Imprime a variação do p50 e das consultas em relação a um resultado anterior."""
+    print(f"\nComparação com {baseline['meta'].get('revision')} (p50 ms / consultas, a quente):")
+    for name, result in current['endpoints'].items():
+        previous = baseline['endpoints'].get(name)
+        if not previous:
+            print(f'  {name}: novo')
+            continue
+        now, before = result['warm'], previous['warm']
+        change = (now['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0.0
+        print(f"  {name}: {before['p50_ms']:.2f} -> {now['p50_ms']:.2f} ms ({change:+.0f}%), "
+              f"{before['queries_median']} -> {now['queries_median']} consultas")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', help='ficheiro SQLite (criado se não existir; por omissão na pasta temporária, um por escala e seed)')
+    parser.add_argument('--scale', default='small', choices=sorted(SCALES), help='dimensão dos dados gerados')
+    parser.add_argument('--seed', type=int, default=42, help='seed do gerador sintético')
+    parser.add_argument('--iterations', type=int, default=20, help='pedidos medidos por rota e modo')
+    parser.add_argument('--warmup', type=int, default=2, help='pedidos por rota antes da medição a quente')
+    parser.add_argument('--only', help='medir apenas rotas cujo nome contém este texto')
+    parser.add_argument('--output', help='ficheiro JSON com o resultado (por omissão stdout)')
+    parser.add_argument('--compare', help='resultado JSON anterior para comparar')
+    args = parser.parse_args()
+    
+    # A base de dados gerada é reutilizada entre execuções, fora da árvore do repositório
+    if not args.database:
+        args.database = os.path.join(tempfile.gettempdir(), f'sports-dashboard-bench-{args.scale}-{args.seed}.db')
+    
+    from flask_jwt_extended import create_access_token
+    from src.main import create_app, db
+    from src.models import DataVersion, Team
+    from src.services.synthetic import generate
+    
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(args.database)}', 'CHART_WORKERS': 0})
+    
+    with app.app_context():
+        db.create_all()
+        generated = None
+        if db.session.query(Team.id).first() is None:
+            print(f'A gerar dados ({args.scale}, seed {args.seed})...', file=sys.stderr)
+            generated = generate(seed=args.seed, **SCALES[args.scale])
+        
+        counts = {table: db.session.execute(db.text(f'SELECT COUNT(*) FROM {table}')).scalar() for table in ('teams', 'players', 'matches', 'statistics')}
+        ids = sample_ids(db)
+        token = create_access_token(identity=1)
+        counter = QueryCounter(db.engine)
+    
+    def invalidate():
+        # Nova versão de todos os dados: caches e cópias em memória ficam obsoletas
+        with app.app_context():
+            db.session.execute(DataVersion.__table__.update().values(version=DataVersion.version + 1))
+            db.session.commit()
+    
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    
+    cases = build_cases(ids)
+    for route in uncovered_routes(app, cases):
+        print(f'Aviso: rota sem medição: {route}', file=sys.stderr)
+    if args.only:
+        cases = [case for case in cases if args.only in case[0]]
+    
+    endpoints = {}
+    for case in cases:
+        for _ in range(args.warmup):
+            run_case(client, counter, invalidate, case, 1, cold=False)
+        endpoints[case[0]] = {
+            'warm': run_case(client, counter, invalidate, case, args.iterations, cold=False),
+            'cold': run_case(client, counter, invalidate, case, args.iterations, cold=True)
+        }
+        warm, cold = endpoints[case[0]]['warm'], endpoints[case[0]]['cold']
+        print(f"{case[0]}: p50 {warm['p50_ms']:.2f} ms a quente, {cold['p50_ms']:.2f} ms a frio, "
+              f"{cold['queries_median']} consultas", file=sys.stderr)
+    
+    result = {
+        'meta': {
+            'revision': git_revision(),
+            'created_at': datetime.utcnow().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'database': os.path.abspath(args.database),
+            'rows': counts,
+            'generated': generated,
+            'sample': ids,
+            'iterations': args.iterations,
+            'warmup': args.warmup
+        },
+        'endpoints': endpoints
+    }
+    
+    output = json.dumps(result, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+    
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(result, json.load(baseline_file))
+
+if __name__ == '__main__':
+    main()
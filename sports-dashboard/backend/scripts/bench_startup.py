@@ -0,0 +1,91 @@
+"""
+Benchmark de arranque da API: tempo de importação, tempo de create_app,
+memória residente (RSS) e bibliotecas pesadas carregadas.
+
+Cada medição corre num processo Python novo, como um worker acabado de
+lançar. Uso (a partir de sports-dashboard/backend):
+
+    python scripts/bench_startup.py --runs 5
+    python scripts/bench_startup.py --json > startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos cuja presença após o arranque indica importações antecipadas
+HEAVY_MODULES = ('numpy', 'pandas', 'matplotlib', 'seaborn')
+
+# Código executado em cada processo filho
+PROBE = r'''
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+
+def rss_kb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+baseline = rss_kb()
+started = time.perf_counter()
+from src.main import create_app
+imported = time.perf_counter()
+app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+created = time.perf_counter()
+
+print(json.dumps({
+    'import_seconds': imported - started,
+    'create_app_seconds': created - imported,
+    'rss_mb': rss_kb() / 1024,
+    'rss_delta_mb': (rss_kb() - baseline) / 1024,
+    'heavy_modules': sorted(m for m in sys.argv[2].split(',') if m in sys.modules)
+}))
+'''
+
+def measure():
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, BACKEND_DIR, ','.join(HEAVY_MODULES)],
+        check=True, capture_output=True, text=True, cwd=BACKEND_DIR
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='número de processos medidos')
+    parser.add_argument('--json', action='store_true', help='escrever o resultado em JSON')
+    args = parser.parse_args()
+    
+    runs = [measure() for _ in range(max(1, args.runs))]
+    
+    summary = {
+        'runs': len(runs),
+        'python': sys.version.split()[0],
+        'heavy_modules': runs[-1]['heavy_modules']
+    }
+    for field in ('import_seconds', 'create_app_seconds', 'rss_mb', 'rss_delta_mb'):
+        values = [run[field] for run in runs]
+        summary[field] = {
+            'median': round(statistics.median(values), 4),
+            'min': round(min(values), 4),
+            'max': round(max(values), 4)
+        }
+    
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    
+    print(f"Execuções: {summary['runs']} (Python {summary['python']})")
+    print(f"Importação:  {summary['import_seconds']['median'] * 1000:.1f} ms (mediana)")
+    print(f"create_app:  {summary['create_app_seconds']['median'] * 1000:.1f} ms (mediana)")
+    print(f"RSS:         {summary['rss_mb']['median']:.1f} MB (+{summary['rss_delta_mb']['median']:.1f} MB)")
+    print(f"Bibliotecas pesadas carregadas: {', '.join(summary['heavy_modules']) or 'nenhuma'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import os
+import datetime
+
+def env_int(name, default):
+    """Inteiro lido do ambiente, com valor por omissão."""
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+class Config:
+    """Configuração por omissão, com valores que podem vir do ambiente."""
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI') or os.environ.get('DATABASE_URL', 'sqlite:///sports_analytics.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'sports_dashboard_secret_key')
+    JWT_ACCESS_TOKEN_EXPIRES = datetime.timedelta(days=1)
+    # Origem das agregações de estatísticas: 'sql' ou 'columnar' (arrays NumPy em memória)
+    STATS_BACKEND = os.environ.get('STATS_BACKEND', 'sql')
+    
+    # Pool de ligações por processo (também usado com SQLite em ficheiro)
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 5)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 10)
+    DB_POOL_TIMEOUT = env_int('DB_POOL_TIMEOUT', 30)
+    DB_POOL_RECYCLE = env_int('DB_POOL_RECYCLE', 1800)
+    
+    # PRAGMAs aplicados a cada nova ligação SQLite (None desativa um PRAGMA).
+    # WAL permite leituras concorrentes com uma escrita; busy_timeout faz as
+    # escritas concorrentes esperar em vez de falhar; cache_size negativo é em KiB.
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'busy_timeout': env_int('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'mmap_size': env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'cache_size': env_int('SQLITE_CACHE_SIZE', -64 * 1024)
+    }
+    
+    # Canal SSE de jogos em direto (ver src.services.live)
+    LIVE_POLL_SECONDS = float(os.environ.get('LIVE_POLL_SECONDS', 1.0))
+    LIVE_HEARTBEAT_SECONDS = float(os.environ.get('LIVE_HEARTBEAT_SECONDS', 15.0))
+    LIVE_QUEUE_SIZE = env_int('LIVE_QUEUE_SIZE', 256)
+    LIVE_RING_SIZE = env_int('LIVE_RING_SIZE', 512)
+    
+    # Gráficos (ver src.services.charts): processos de renderização (0 renderiza
+    # no próprio pedido), pedidos em espera, tempo máximo e cache em bytes
+    CHART_WORKERS = env_int('CHART_WORKERS', 2)
+    CHART_QUEUE_SIZE = env_int('CHART_QUEUE_SIZE', 8)
+    CHART_TIMEOUT_SECONDS = float(os.environ.get('CHART_TIMEOUT_SECONDS', 30.0))
+    CHART_CACHE_BYTES = env_int('CHART_CACHE_BYTES', 32 * 1024 * 1024)
+    
+    # Exportação colunar (ver src.services.export); por omissão instance/exports
+    EXPORT_DIR = os.environ.get('EXPORT_DIR')
+    
+    # Métricas por pedido em /api/metrics (ver src.services.metrics). Com
+    # METRICS_SLOW_QUERIES > 0 guardam-se e registam-se no log as instruções
+    # mais lentas que METRICS_SLOW_QUERY_MS. Os endpoints (/api/metrics e
+    # /slow-queries) só existem com METRICS_TOKEN definido e exigem
+    # 'Authorization: Bearer <token>'
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') not in ('0', 'false', 'False')
+    METRICS_SLOW_QUERIES = env_int('METRICS_SLOW_QUERIES', 0)
+    METRICS_SLOW_QUERY_MS = env_int('METRICS_SLOW_QUERY_MS', 100)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # Deteção de N+1 e orçamentos de consultas (@query_budget, ver
+    # src.utils.query_budget): 'off', 'warn' ou 'raise'. Por omissão 'raise'
+    # em testes, 'warn' em debug e 'off' em produção
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE') or None
+    QUERY_REPEAT_THRESHOLD = env_int('QUERY_REPEAT_THRESHOLD', 5)
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    CHART_WORKERS = 0
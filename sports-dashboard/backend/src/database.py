@@ -0,0 +1,70 @@
+import re
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# PRAGMAs de SQLite que podem ser configurados (ver Config.SQLITE_PRAGMAS)
+ALLOWED_PRAGMAS = ('journal_mode', 'busy_timeout', 'synchronous', 'mmap_size', 'cache_size', 'temp_store', 'foreign_keys')
+
+def is_sqlite_file(uri):
+    """Indica se o URI aponta para uma base de dados SQLite em ficheiro."""
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def engine_options(config):
+    """
+    Opções do engine a partir da configuração: tamanho do pool e tempos
+    de espera. Em SQLite em ficheiro usa-se um QueuePool (o SQLAlchemy
+    abriria uma ligação nova por pedido), partilhável entre threads.
+    """
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    url = make_url(uri)
+    
+    if url.get_backend_name() == 'sqlite' and not is_sqlite_file(uri):
+        # Base de dados em memória: o Flask-SQLAlchemy usa StaticPool
+        return {}
+    
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': True
+    }
+    
+    if is_sqlite_file(uri):
+        busy_timeout = (config.get('SQLITE_PRAGMAS') or {}).get('busy_timeout') or 5000
+        options['poolclass'] = QueuePool
+        options['pool_pre_ping'] = False
+        options['connect_args'] = {'check_same_thread': False, 'timeout': busy_timeout / 1000}
+    
+    return options
+
+def pragma_statements(pragmas):
+    """Valida os PRAGMAs configurados e devolve as instruções a executar."""
+    statements = []
+    for name, value in (pragmas or {}).items():
+        if value is None:
+            continue
+        if name not in ALLOWED_PRAGMAS:
+            raise ValueError(f'PRAGMA não suportado: {name}')
+        if not isinstance(value, int) and not re.fullmatch(r'[A-Za-z]+|-?\d+', str(value)):
+            raise ValueError(f'Valor inválido para o PRAGMA {name}: {value}')
+        statements.append(f'PRAGMA {name}={value}')
+    return statements
+
+def register_sqlite_pragmas(engine, pragmas):
+    """Aplica os PRAGMAs a cada ligação nova do engine (apenas SQLite)."""
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    statements = pragma_statements(pragmas)
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
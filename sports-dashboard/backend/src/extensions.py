@@ -0,0 +1,10 @@
+from flask_sqlalchemy import SQLAlchemy
+from flask_cors import CORS
+from flask_jwt_extended import JWTManager
+
+# Extensões criadas sem aplicação; são ligadas em create_app (src.main).
+# Ficam num módulo próprio para que `src.main` e o ficheiro carregado pelo
+# `flask` CLI (FLASK_APP=src/main.py) partilhem as mesmas instâncias.
+db = SQLAlchemy()
+jwt = JWTManager()
+cors = CORS()
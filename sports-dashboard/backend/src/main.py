@@ -2,48 +2,181 @@ import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))  # Configuração necessária para imports
 
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from flask_cors import CORS
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
-import pandas as pd
-import numpy as np
-import datetime
+import click
+from flask import Flask, jsonify
 
-# Inicializar aplicação Flask
-app = Flask(__name__)
+# Os modelos e serviços continuam a importar `db` deste módulo
+from src.extensions import db, jwt, cors
 
-# Configuração
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///sports_analytics.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['JWT_SECRET_KEY'] = 'sports_dashboard_secret_key'
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = datetime.timedelta(days=1)
+def create_app(config=None):
+    """
+    Cria e configura a aplicação Flask.
+    `config` pode ser um dicionário ou um objeto/classe de configuração
+    (ver src.config); os valores sobrepõem-se à configuração por omissão.
+    Bibliotecas pesadas de análise (pandas, NumPy, matplotlib) só são
+    importadas quando uma rota precisa delas.
+    """
+    from src.config import Config
+    
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+    
+    # Pool de ligações configurável (ver src.config e src.database)
+    from src.database import engine_options, register_sqlite_pragmas
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    
+    # Inicializar extensões
+    db.init_app(app)
+    jwt.init_app(app)
+    cors.init_app(app)
+    
+    # Importar modelos e rotas
+    from src import models
+    from src.routes import auth_routes, team_routes, player_routes, match_routes, analytics_routes, statistic_routes, chart_routes, import_routes, metrics_routes
+    from src.services import versions, player_rollup, ratings, team_match_stats, metrics
+    from src.utils import query_budget
+    
+    # Incrementar as versões dos dados a cada escrita (invalidação de caches)
+    versions.register_listeners()
+    # Manter a agregação por jogador e temporada a cada escrita de estatísticas
+    player_rollup.register_listeners()
+    # Calcular os ratings e as médias móveis a cada escrita de estatísticas
+    ratings.register_listeners()
+    # Recalcular o box score por equipa dos jogos concluídos
+    team_match_stats.register_listeners()
+    # Latência, instruções SQL e tempo de base de dados por pedido (/api/metrics)
+    metrics.init_app(app)
+    # Instruções repetidas (N+1) e orçamentos de consultas em testes e debug
+    query_budget.init_app(app)
+    
+    # Registrar blueprints
+    app.register_blueprint(auth_routes.bp)
+    app.register_blueprint(team_routes.bp)
+    app.register_blueprint(player_routes.bp)
+    app.register_blueprint(match_routes.bp)
+    app.register_blueprint(analytics_routes.bp)
+    app.register_blueprint(statistic_routes.bp)
+    app.register_blueprint(chart_routes.bp)
+    app.register_blueprint(import_routes.bp)
+    app.register_blueprint(metrics_routes.bp)
+    
+    # PRAGMAs de concorrência em cada ligação SQLite (WAL, busy_timeout, ...)
+    with app.app_context():
+        register_sqlite_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS'))
+    
+    register_commands(app)
+    
+    # Rota de teste
+    @app.route('/')
+    def index():
+        return jsonify({"message": "API do Dashboard de Análise de Dados Desportivos está funcionando!"})
+    
+    # Criar tabelas do banco de dados
+    @app.before_first_request
+    def create_tables():
+        db.create_all()
+    
+    return app
 
-# Inicializar extensões
-db = SQLAlchemy(app)
-jwt = JWTManager(app)
-CORS(app)
-
-# Importar modelos e rotas (serão implementados em seguida)
-from src.models import User, Team, Player, Match, Statistic
-from src.routes import auth_routes, team_routes, player_routes, match_routes, analytics_routes
-
-# Registrar blueprints
-app.register_blueprint(auth_routes.bp)
-app.register_blueprint(team_routes.bp)
-app.register_blueprint(player_routes.bp)
-app.register_blueprint(match_routes.bp)
-app.register_blueprint(analytics_routes.bp)
-
-# Rota de teste
-@app.route('/')
-def index():
-    return jsonify({"message": "API do Dashboard de Análise de Dados Desportivos está funcionando!"})
-
-# Criar tabelas do banco de dados
-@app.before_first_request
-def create_tables():
-    db.create_all()
+def register_commands(app):
+    """Comandos de administração (flask <comando>)."""
+    
+    @app.cli.command('rebuild-standings')
+    def rebuild_standings_command():
+        """Reconstrói a classificação materializada a partir dos jogos concluídos."""
+        from src.services.standings import rebuild_standings
+        db.create_all()
+        rows = rebuild_standings()
+        print(f'Classificação reconstruída: {rows} linhas.')
+    
+    @app.cli.command('rebuild-player-stats')
+    def rebuild_player_stats_command():
+        """Reconstrói a agregação de estatísticas por jogador e temporada."""
+        from src.services.player_rollup import rebuild_player_season_stats
+        db.create_all()
+        rows = rebuild_player_season_stats()
+        print(f'Estatísticas por temporada reconstruídas: {rows} linhas.')
+    
+    @app.cli.command('rebuild-head-to-head')
+    def rebuild_head_to_head_command():
+        """Reconstrói os resumos de confronto direto entre equipas."""
+        from src.services.head_to_head import rebuild_head_to_head
+        db.create_all()
+        rows = rebuild_head_to_head()
+        print(f'Confrontos diretos reconstruídos: {rows} pares.')
+    
+    @app.cli.command('rebuild-team-match-stats')
+    def rebuild_team_match_stats_command():
+        """Recalcula o box score por equipa de todos os jogos (e preenche statistics.team_id em bases antigas)."""
+        from src.services.team_match_stats import rebuild_team_match_stats
+        db.create_all()
+        rows = rebuild_team_match_stats()
+        print(f'Box scores por equipa recalculados: {rows} linhas.')
+    
+    @app.cli.command('export-data')
+    @click.option('--table', 'tables', multiple=True, type=click.Choice(['matches', 'statistics']), help='Tabela a exportar (por omissão todas).')
+    @click.option('--format', 'fmt', default='ipc', type=click.Choice(['ipc', 'parquet']), help='Arrow IPC (memory-map) ou Parquet.')
+    @click.option('--full', is_flag=True, help='Apagar a exportação anterior e exportar tudo.')
+    @click.option('--chunk-size', default=10000, type=int, help='Linhas lidas e escritas por bloco.')
+    def export_data_command(tables, fmt, full, chunk_size):
+        """Exporta jogos e estatísticas em ficheiros colunares por temporada e competição."""
+        from src.services.export import export_root, export_tables
+        db.create_all()
+        summary = export_tables(list(tables) or None, fmt=fmt, full=full, chunk_size=chunk_size)
+        for table, result in summary.items():
+            print(f"{table}: {result['rows']} linhas em {result['files']} ficheiros ({result['seconds']} s).")
+        print(f'Exportação em {export_root()}.')
+    
+    @app.cli.command('import-data')
+    @click.argument('entity', type=click.Choice(['teams', 'players', 'matches']))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--mode', default='insert', type=click.Choice(['insert', 'upsert']), help='Atualizar (upsert) ou recusar linhas já existentes.')
+    @click.option('--chunk-size', default=1000, type=int, help='Linhas lidas e escritas por bloco.')
+    def import_data_command(entity, path, mode, chunk_size):
+        """Importa equipas, jogadores ou jogos de um ficheiro CSV ou Excel."""
+        from src.routes.import_routes import file_format
+        from src.services.importer import import_file
+        db.create_all()
+        summary = import_file(entity, path, fmt=file_format(path), mode=mode, chunk_size=chunk_size)
+        print(f"{summary['rows']} linhas: {summary['inserted']} inseridas, {summary['updated']} atualizadas, "
+              f"{summary['invalid']} inválidas ({summary['rows_per_second']} linhas/s).")
+        for error in summary['errors']:
+            print(f"  linha {error['index']}: {error['error']}")
+        if 'error' in summary:
+            raise click.ClickException(summary['error'])
+    
+    @app.cli.command('generate-data')
+    @click.option('--leagues', default=10, type=int, help='Número de ligas.')
+    @click.option('--teams', 'teams_per_league', default=20, type=int, help='Equipas por liga (número par).')
+    @click.option('--seasons', default=10, type=int, help='Temporadas por liga.')
+    @click.option('--first-season', default=2015, type=int, help='Ano de início da primeira temporada.')
+    @click.option('--squad-size', default=22, type=int, help='Jogadores por equipa.')
+    @click.option('--seed', default=42, type=int, help='Seed do gerador (mesma seed, mesmos dados).')
+    @click.option('--no-events', is_flag=True, help='Não gerar eventos de jogo (golos, cartões, substituições).')
+    @click.option('--reset', is_flag=True, help='Apagar e recriar todas as tabelas antes de gerar.')
+    def generate_data_command(leagues, teams_per_league, seasons, first_season, squad_size, seed, no_events, reset):
+        """Preenche a base de dados com equipas, jogadores, jogos e estatísticas sintéticos."""
+        from src.services.synthetic import generate
+        db.create_all()
+        summary = generate(
+            leagues=leagues, teams_per_league=teams_per_league, seasons=seasons, first_season=first_season,
+            squad_size=squad_size, seed=seed, events=not no_events, reset=reset
+        )
+        print(f"{summary['teams']} equipas, {summary['players']} jogadores, {summary['matches']} jogos, "
+              f"{summary['statistics']} estatísticas e {summary['match_events']} eventos em {summary['seconds']} s.")
+    
+    @app.cli.command('rebuild-ratings')
+    def rebuild_ratings_command():
+        """Recalcula os ratings por jogo e as médias móveis de todos os jogadores."""
+        from src.services.ratings import rebuild_ratings
+        db.create_all()
+        rows = rebuild_ratings()
+        print(f'Ratings recalculados: {rows} linhas.')
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    create_app().run(debug=True, host='0.0.0.0', port=5000)
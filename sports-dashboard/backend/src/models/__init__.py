@@ -4,6 +4,13 @@ from src.models.team import Team
 from src.models.player import Player
 from src.models.match import Match
 from src.models.statistic import Statistic
+from src.models.standing import Standing
+from src.models.data_version import DataVersion
+from src.models.player_season_stat import PlayerSeasonStat
+from src.models.match_event import MatchEvent
+from src.models.player_rating import PlayerMatchRating
+from src.models.head_to_head import HeadToHead
+from src.models.team_match_stat import TeamMatchStat
 
 # Exportar todos os modelos para facilitar importação
-__all__ = ['User', 'Team', 'Player', 'Match', 'Statistic']
+__all__ = ['User', 'Team', 'Player', 'Match', 'Statistic', 'Standing', 'DataVersion', 'PlayerSeasonStat', 'MatchEvent', 'PlayerMatchRating', 'HeadToHead', 'TeamMatchStat']
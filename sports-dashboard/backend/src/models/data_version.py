@@ -0,0 +1,20 @@
+from src.main import db
+from datetime import datetime
+
+class DataVersion(db.Model):
+    __tablename__ = 'data_versions'
+    
+    # Âmbito versionado: nome de tabela (ex.: 'matches')
+    scope = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<DataVersion {self.scope}={self.version}>'
+    
+    def to_dict(self):
+        return {
+            'scope': self.scope,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,56 @@
+from src.main import db
+from datetime import datetime
+import json
+
+class HeadToHead(db.Model):
+    __tablename__ = 'head_to_head'
+    __table_args__ = (
+        # Um registo por par de equipas, guardado com o menor id primeiro
+        db.UniqueConstraint('team_low_id', 'team_high_id', name='uq_head_to_head_pair'),
+        db.CheckConstraint('team_low_id < team_high_id', name='ck_head_to_head_pair_order'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    team_low_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=False)
+    team_high_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=False, index=True)
+    
+    # Resumo dos jogos concluídos entre as duas equipas
+    played = db.Column(db.Integer, default=0, nullable=False)
+    low_wins = db.Column(db.Integer, default=0, nullable=False)
+    high_wins = db.Column(db.Integer, default=0, nullable=False)
+    draws = db.Column(db.Integer, default=0, nullable=False)
+    low_goals = db.Column(db.Integer, default=0, nullable=False)
+    high_goals = db.Column(db.Integer, default=0, nullable=False)
+    last_results = db.Column(db.Text)  # JSON com os últimos jogos (mais recente primeiro)
+    last_match_date = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<HeadToHead Team {self.team_low_id} vs Team {self.team_high_id}>'
+    
+    def for_team(self, team_id):
+        """Resumo orientado para a equipa indicada (vitórias, golos marcados, ...)."""
+        low = team_id == self.team_low_id
+        return {
+            'played': self.played,
+            'wins': self.low_wins if low else self.high_wins,
+            'draws': self.draws,
+            'losses': self.high_wins if low else self.low_wins,
+            'goals_for': self.low_goals if low else self.high_goals,
+            'goals_against': self.high_goals if low else self.low_goals,
+            'last_results': json.loads(self.last_results or '[]')
+        }
+    
+    def to_dict(self):
+        return {
+            'team_low_id': self.team_low_id,
+            'team_high_id': self.team_high_id,
+            'played': self.played,
+            'low_wins': self.low_wins,
+            'high_wins': self.high_wins,
+            'draws': self.draws,
+            'low_goals': self.low_goals,
+            'high_goals': self.high_goals,
+            'last_results': json.loads(self.last_results or '[]'),
+            'last_match_date': self.last_match_date.isoformat() if self.last_match_date else None
+        }
@@ -3,6 +3,12 @@ from datetime import datetime
 
 class Match(db.Model):
     __tablename__ = 'matches'
+    __table_args__ = (
+        # Ordem da listagem e da paginação por chave
+        db.Index('ix_matches_date_id', 'date', 'id'),
+        # Jogos entre duas equipas (confronto direto), por data
+        db.Index('ix_matches_home_away_date', 'home_team_id', 'away_team_id', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,35 @@
+from src.main import db
+from datetime import datetime
+
+class MatchEvent(db.Model):
+    __tablename__ = 'match_events'
+    __table_args__ = (
+        db.Index('ix_match_events_match_minute', 'match_id', 'minute'),
+    )
+    
+    # Tabela apenas de inserção: os eventos não são alterados depois de registados
+    id = db.Column(db.Integer, primary_key=True)
+    match_id = db.Column(db.Integer, db.ForeignKey('matches.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('players.id'))
+    related_player_id = db.Column(db.Integer, db.ForeignKey('players.id'))  # assistência ou jogador que sai na substituição
+    type = db.Column(db.String(20), nullable=False)  # goal, own_goal, yellow_card, red_card, substitution, shot, shot_on_target
+    minute = db.Column(db.SmallInteger, nullable=False)
+    second = db.Column(db.SmallInteger, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<MatchEvent {self.type} {self.minute}:{self.second:02d} in Match {self.match_id}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'match_id': self.match_id,
+            'team_id': self.team_id,
+            'player_id': self.player_id,
+            'related_player_id': self.related_player_id,
+            'type': self.type,
+            'minute': self.minute,
+            'second': self.second,
+            'created_at': self.created_at.isoformat()
+        }
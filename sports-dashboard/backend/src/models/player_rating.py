@@ -0,0 +1,30 @@
+from src.main import db
+from datetime import datetime
+
+class PlayerMatchRating(db.Model):
+    __tablename__ = 'player_match_ratings'
+    __table_args__ = (
+        db.Index('ix_player_match_ratings_player_match', 'player_id', 'match_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    statistic_id = db.Column(db.Integer, db.ForeignKey('statistics.id'), nullable=False, unique=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('players.id'), nullable=False)
+    match_id = db.Column(db.Integer, db.ForeignKey('matches.id'), nullable=False, index=True)
+    
+    # Pontuação do jogo (normalizada a 90 minutos) e média móvel dos últimos jogos
+    rating = db.Column(db.Float, nullable=False)
+    rolling_rating = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PlayerMatchRating Player {self.player_id} in Match {self.match_id}: {self.rating:.2f}>'
+    
+    def to_dict(self):
+        return {
+            'statistic_id': self.statistic_id,
+            'player_id': self.player_id,
+            'match_id': self.match_id,
+            'rating': self.rating,
+            'rolling_rating': self.rolling_rating
+        }
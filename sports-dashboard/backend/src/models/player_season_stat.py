@@ -0,0 +1,71 @@
+from src.main import db
+from datetime import datetime
+
+class PlayerSeasonStat(db.Model):
+    __tablename__ = 'player_season_stats'
+    __table_args__ = (
+        db.UniqueConstraint('player_id', 'season', name='uq_player_season_stats_player_season'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('players.id'), nullable=False, index=True)
+    season = db.Column(db.String(20), nullable=False, index=True)
+    
+    # Totais da temporada
+    matches_played = db.Column(db.Integer, default=0, nullable=False)
+    minutes_played = db.Column(db.Integer, default=0, nullable=False)
+    goals = db.Column(db.Integer, default=0, nullable=False)
+    assists = db.Column(db.Integer, default=0, nullable=False)
+    shots = db.Column(db.Integer, default=0, nullable=False)
+    shots_on_target = db.Column(db.Integer, default=0, nullable=False)
+    key_passes = db.Column(db.Integer, default=0, nullable=False)
+    passes = db.Column(db.Integer, default=0, nullable=False)
+    passes_completed = db.Column(db.Integer, default=0, nullable=False)
+    tackles = db.Column(db.Integer, default=0, nullable=False)
+    interceptions = db.Column(db.Integer, default=0, nullable=False)
+    yellow_cards = db.Column(db.Integer, default=0, nullable=False)
+    red_cards = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Valores derivados (recalculados a cada atualização dos totais)
+    shot_accuracy = db.Column(db.Float, default=0.0, nullable=False)  # em percentagem
+    pass_accuracy = db.Column(db.Float, default=0.0, nullable=False)  # em percentagem
+    conversion_rate = db.Column(db.Float, default=0.0, nullable=False)  # em percentagem
+    goals_per_90 = db.Column(db.Float, default=0.0, nullable=False)
+    assists_per_90 = db.Column(db.Float, default=0.0, nullable=False)
+    shots_per_90 = db.Column(db.Float, default=0.0, nullable=False)
+    key_passes_per_90 = db.Column(db.Float, default=0.0, nullable=False)
+    tackles_per_90 = db.Column(db.Float, default=0.0, nullable=False)
+    interceptions_per_90 = db.Column(db.Float, default=0.0, nullable=False)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PlayerSeasonStat Player {self.player_id} {self.season}>'
+    
+    def to_dict(self):
+        return {
+            'player_id': self.player_id,
+            'season': self.season,
+            'matches_played': self.matches_played,
+            'minutes_played': self.minutes_played,
+            'goals': self.goals,
+            'assists': self.assists,
+            'shots': self.shots,
+            'shots_on_target': self.shots_on_target,
+            'key_passes': self.key_passes,
+            'passes': self.passes,
+            'passes_completed': self.passes_completed,
+            'tackles': self.tackles,
+            'interceptions': self.interceptions,
+            'yellow_cards': self.yellow_cards,
+            'red_cards': self.red_cards,
+            'shot_accuracy': self.shot_accuracy,
+            'pass_accuracy': self.pass_accuracy,
+            'conversion_rate': self.conversion_rate,
+            'goals_per_90': self.goals_per_90,
+            'assists_per_90': self.assists_per_90,
+            'shots_per_90': self.shots_per_90,
+            'key_passes_per_90': self.key_passes_per_90,
+            'tackles_per_90': self.tackles_per_90,
+            'interceptions_per_90': self.interceptions_per_90
+        }
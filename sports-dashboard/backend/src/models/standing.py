@@ -0,0 +1,43 @@
+from src.main import db
+from datetime import datetime
+
+class Standing(db.Model):
+    __tablename__ = 'standings'
+    __table_args__ = (
+        db.UniqueConstraint('league', 'season', 'team_id', name='uq_standings_league_season_team'),
+        db.Index('ix_standings_league_season_points', 'league', 'season', 'points', 'goal_difference'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    league = db.Column(db.String(100), nullable=False)
+    season = db.Column(db.String(20), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=False)
+    
+    # Classificação materializada (apenas jogos concluídos)
+    played = db.Column(db.Integer, default=0, nullable=False)
+    wins = db.Column(db.Integer, default=0, nullable=False)
+    draws = db.Column(db.Integer, default=0, nullable=False)
+    losses = db.Column(db.Integer, default=0, nullable=False)
+    goals_for = db.Column(db.Integer, default=0, nullable=False)
+    goals_against = db.Column(db.Integer, default=0, nullable=False)
+    goal_difference = db.Column(db.Integer, default=0, nullable=False)
+    points = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Standing {self.league} {self.season} Team {self.team_id}>'
+    
+    def to_dict(self):
+        return {
+            'league': self.league,
+            'season': self.season,
+            'team_id': self.team_id,
+            'played': self.played,
+            'wins': self.wins,
+            'draws': self.draws,
+            'losses': self.losses,
+            'goals_for': self.goals_for,
+            'goals_against': self.goals_against,
+            'goal_difference': self.goal_difference,
+            'points': self.points
+        }
@@ -3,10 +3,16 @@ from datetime import datetime
 
 class Statistic(db.Model):
     __tablename__ = 'statistics'
+    __table_args__ = (
+        db.Index('ix_statistics_player_match', 'player_id', 'match_id'),
+        db.Index('ix_statistics_match_team', 'match_id', 'team_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     match_id = db.Column(db.Integer, db.ForeignKey('matches.id'), nullable=False)
     player_id = db.Column(db.Integer, db.ForeignKey('players.id'), nullable=False)
+    # Equipa do jogador à data do jogo (registada na escrita; uma transferência não a altera)
+    team_id = db.Column(db.Integer, db.ForeignKey('teams.id'))
     
     # Estatísticas gerais
     minutes_played = db.Column(db.Integer, default=0)
@@ -56,6 +62,7 @@ class Statistic(db.Model):
             'id': self.id,
             'match_id': self.match_id,
             'player_id': self.player_id,
+            'team_id': self.team_id,
             'minutes_played': self.minutes_played,
             'goals': self.goals,
             'assists': self.assists,
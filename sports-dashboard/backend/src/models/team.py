@@ -7,7 +7,7 @@ class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     country = db.Column(db.String(50), nullable=False)
-    league = db.Column(db.String(100), nullable=False)
+    league = db.Column(db.String(100), nullable=False, index=True)
     founded_year = db.Column(db.Integer)
     logo_url = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,42 @@
+from src.main import db
+from datetime import datetime
+
+class TeamMatchStat(db.Model):
+    __tablename__ = 'team_match_stats'
+    __table_args__ = (
+        db.UniqueConstraint('match_id', 'team_id', name='uq_team_match_stats_match_team'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    match_id = db.Column(db.Integer, db.ForeignKey('matches.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('teams.id'), nullable=False, index=True)
+    is_home = db.Column(db.Boolean, nullable=False)
+    season = db.Column(db.String(20), nullable=False)
+    
+    # Box score da equipa no jogo (somado das estatísticas dos jogadores)
+    passes = db.Column(db.Integer, default=0, nullable=False)
+    passes_completed = db.Column(db.Integer, default=0, nullable=False)
+    shots = db.Column(db.Integer, default=0, nullable=False)
+    shots_on_target = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Percentagens (nulas quando não há passes registados)
+    possession = db.Column(db.Float)
+    pass_accuracy = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<TeamMatchStat Team {self.team_id} in Match {self.match_id}>'
+    
+    def to_dict(self):
+        return {
+            'match_id': self.match_id,
+            'team_id': self.team_id,
+            'is_home': self.is_home,
+            'season': self.season,
+            'passes': self.passes,
+            'passes_completed': self.passes_completed,
+            'shots': self.shots,
+            'shots_on_target': self.shots_on_target,
+            'possession': self.possession,
+            'pass_accuracy': self.pass_accuracy
+        }
@@ -8,6 +8,10 @@ from src.routes.team_routes import bp as team_bp
 from src.routes.player_routes import bp as player_bp
 from src.routes.match_routes import bp as match_bp
 from src.routes.analytics_routes import bp as analytics_bp
+from src.routes.statistic_routes import bp as statistic_bp
+from src.routes.chart_routes import bp as chart_bp
+from src.routes.import_routes import bp as import_bp
+from src.routes.metrics_routes import bp as metrics_bp
 
 # Exportar todos os blueprints para facilitar importação
-__all__ = ['auth_bp', 'team_bp', 'player_bp', 'match_bp', 'analytics_bp']
+__all__ = ['auth_bp', 'team_bp', 'player_bp', 'match_bp', 'analytics_bp', 'statistic_bp', 'chart_bp', 'import_bp', 'metrics_bp']
@@ -1,111 +1,112 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models import Team, Player, Match, Statistic
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import io
-import base64
+from src.models import Team, Player, Match, Statistic, Standing, PlayerMatchRating, HeadToHead, TeamMatchStat
+from src.services import versions, player_rollup, ratings, live
+from src.services.charts import renderer as chart_renderer
+from src.services import head_to_head as head_to_head_service
+from src.services.similarity import index as similarity_index
+from src.services.cache import get_cache, cache_stats
+from src.utils.conditional import conditional
+from src.utils.pagination import paginate
+from src.utils.query_budget import query_budget
 from datetime import datetime, timedelta
 import os
 
 bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
 
+dashboard_cache = get_cache('dashboard', maxsize=8)
+
+# Tabelas de que dependem as análises (versões usadas na cache e nas ETags)
+ANALYTICS_SCOPES = ('teams', 'players', 'matches', 'statistics')
+
+# Número máximo de jogos numa tendência de desempenho
+MAX_TREND_LIMIT = 500
+MAX_RATINGS_LIMIT = 200
+# Número máximo de vizinhos em /similar-players
+MAX_SIMILAR_PLAYERS = 50
+# Número máximo de equipas ou jogadores numa comparação (?ids=)
+MAX_COMPARISON_IDS = 50
+
 @bp.route('/dashboard', methods=['GET'])
 @jwt_required()
+@conditional(*ANALYTICS_SCOPES)
+@query_budget(6)
 def get_dashboard_data():
     """
     Endpoint para obter dados gerais para o dashboard principal.
     Inclui estatísticas resumidas de equipas, jogadores e jogos.
+    O resultado fica em cache até à próxima escrita nas tabelas envolvidas.
     """
-    # Contar totais
-    total_teams = Team.query.count()
-    total_players = Player.query.count()
-    total_matches = Match.query.count()
-    
-    # Obter jogos recentes
-    recent_matches = Match.query.order_by(Match.date.desc()).limit(5).all()
-    
-    # Obter jogadores com mais gols
-    top_scorers_stats = (
-        Statistic.query
-        .with_entities(
-            Statistic.player_id,
-            db.func.sum(Statistic.goals).label('total_goals')
-        )
-        .group_by(Statistic.player_id)
-        .order_by(db.func.sum(Statistic.goals).desc())
-        .limit(5)
-        .all()
-    )
-    
-    top_scorers = []
-    for stat in top_scorers_stats:
-        player = Player.query.get(stat.player_id)
-        if player:
-            top_scorers.append({
-                'player_id': player.id,
-                'player_name': player.name,
-                'team_id': player.team_id,
-                'team_name': Team.query.get(player.team_id).name if Team.query.get(player.team_id) else 'Unknown',
-                'goals': stat.total_goals
-            })
-    
-    # Obter distribuição de jogadores por posição
-    positions = (
-        Player.query
-        .with_entities(
-            Player.position,
-            db.func.count(Player.id).label('count')
-        )
-        .group_by(Player.position)
-        .all()
-    )
-    
-    position_distribution = [
-        {'position': pos.position, 'count': pos.count}
-        for pos in positions
-    ]
+    version = versions.get_versions(*ANALYTICS_SCOPES)
+    data = dashboard_cache.get_or_compute('dashboard', version, build_dashboard_data)
     
+    return jsonify(data), 200
+
+@bp.route('/cache-stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """
+    Endpoint para consultar a taxa de acerto das caches de análise
+    e o estado do canal de jogos em direto e dos gráficos deste worker.
+    """
     return jsonify({
-        'summary': {
-            'total_teams': total_teams,
-            'total_players': total_players,
-            'total_matches': total_matches
-        },
-        'recent_matches': [match.to_dict() for match in recent_matches],
-        'top_scorers': top_scorers,
-        'position_distribution': position_distribution
+        'caches': cache_stats(),
+        'live': live.hub.stats(),
+        'charts': chart_renderer.stats()
     }), 200
 
 @bp.route('/team-comparison', methods=['GET'])
 @jwt_required()
+@conditional(*ANALYTICS_SCOPES)
+@query_budget(6)
 def compare_teams():
     """
     Endpoint para comparar estatísticas entre duas equipas.
+    O resumo do confronto direto e os totais vêm de tabelas mantidas a cada
+    escrita de jogos; a lista de jogos entre as equipas é paginada
+    (limit/cursor).
+    Com ?ids=1,2,3 (até MAX_COMPARISON_IDS) compara várias equipas, sem
+    confronto direto; os totais de todas vêm das mesmas consultas agrupadas.
     """
+    if 'ids' in request.args:
+        try:
+            team_ids = parse_ids(request.args['ids'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return compare_team_list(team_ids)
+    
     team1_id = request.args.get('team1_id', type=int)
     team2_id = request.args.get('team2_id', type=int)
     
     if not team1_id or not team2_id:
         return jsonify({'error': 'IDs das duas equipas são obrigatórios.'}), 400
     
-    team1 = Team.query.get(team1_id)
-    team2 = Team.query.get(team2_id)
+    teams = {team.id: team for team in Team.query.filter(Team.id.in_([team1_id, team2_id])).all()}
+    team1 = teams.get(team1_id)
+    team2 = teams.get(team2_id)
     
     if not team1 or not team2:
         return jsonify({'error': 'Uma ou ambas as equipas não foram encontradas.'}), 404
     
-    # Obter jogos entre as duas equipas
-    head_to_head = Match.query.filter(
-        ((Match.home_team_id == team1_id) & (Match.away_team_id == team2_id)) |
-        ((Match.home_team_id == team2_id) & (Match.away_team_id == team1_id))
-    ).order_by(Match.date.desc()).all()
+    # Jogos entre as duas equipas, paginados por (data, id)
+    try:
+        head_to_head, h2h_pagination = paginate(
+            head_to_head_service.pair_matches(team1_id, team2_id),
+            [Match.date, Match.id],
+            descending=True
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Resumo do confronto direto (uma linha por par) e totais das equipas
+    # somados a partir da classificação materializada
+    low, high = head_to_head_service.pair_key(team1_id, team2_id)
+    summary = HeadToHead.query.filter_by(team_low_id=low, team_high_id=high).first()
     
-    # Calcular estatísticas para cada equipa
-    team1_stats = calculate_team_stats(team1_id)
-    team2_stats = calculate_team_stats(team2_id)
+    teams_stats = calculate_teams_stats([team1_id, team2_id])
+    team1_stats = teams_stats[team1_id]
+    team2_stats = teams_stats[team2_id]
     
     # Preparar dados para comparação
     comparison = {
@@ -143,30 +144,50 @@ def compare_teams():
             'stats': team2_stats
         },
         'comparison': comparison,
-        'head_to_head': [match.to_dict() for match in head_to_head]
+        'head_to_head': [match.to_dict() for match in head_to_head],
+        'head_to_head_summary': summarize_head_to_head(summary, team1_id, team2_id),
+        'head_to_head_pagination': h2h_pagination
     }), 200
 
 @bp.route('/player-comparison', methods=['GET'])
 @jwt_required()
+@conditional(*ANALYTICS_SCOPES)
+@query_budget(4)
 def compare_players():
     """
     Endpoint para comparar estatísticas entre dois jogadores.
+    Aceita um filtro opcional por temporada.
+    Com ?ids=1,2,3 (até MAX_COMPARISON_IDS) compara vários jogadores; os
+    totais de todos vêm de uma consulta agrupada à agregação por temporada.
     """
+    season = request.args.get('season')
+    
+    if 'ids' in request.args:
+        try:
+            player_ids = parse_ids(request.args['ids'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return compare_player_list(player_ids, season)
+    
     player1_id = request.args.get('player1_id', type=int)
     player2_id = request.args.get('player2_id', type=int)
     
     if not player1_id or not player2_id:
         return jsonify({'error': 'IDs dos dois jogadores são obrigatórios.'}), 400
     
-    player1 = Player.query.get(player1_id)
-    player2 = Player.query.get(player2_id)
+    players = {player.id: player for player in Player.query.filter(Player.id.in_([player1_id, player2_id])).all()}
+    player1 = players.get(player1_id)
+    player2 = players.get(player2_id)
     
     if not player1 or not player2:
         return jsonify({'error': 'Um ou ambos os jogadores não foram encontrados.'}), 404
     
-    # Calcular estatísticas para cada jogador
-    player1_stats = calculate_player_stats(player1_id)
-    player2_stats = calculate_player_stats(player2_id)
+    # Calcular estatísticas dos dois jogadores (uma consulta agrupada)
+    players_stats = calculate_players_stats([player1_id, player2_id], season)
+    player1_stats = players_stats[player1_id]
+    player2_stats = players_stats[player2_id]
+    team_names = get_team_names([player1.team_id, player2.team_id])
     
     # Preparar dados para comparação
     comparison = {
@@ -196,22 +217,74 @@ def compare_players():
         'player1': {
             'id': player1.id,
             'name': player1.name,
-            'team': Team.query.get(player1.team_id).name if Team.query.get(player1.team_id) else 'Unknown',
+            'team': team_names.get(player1.team_id, 'Unknown'),
             'position': player1.position,
             'stats': player1_stats
         },
         'player2': {
             'id': player2.id,
             'name': player2.name,
-            'team': Team.query.get(player2.team_id).name if Team.query.get(player2.team_id) else 'Unknown',
+            'team': team_names.get(player2.team_id, 'Unknown'),
             'position': player2.position,
             'stats': player2_stats
         },
+        'season': season,
         'comparison': comparison
     }), 200
 
+@bp.route('/similar-players', methods=['GET'])
+@jwt_required()
+@conditional('players', 'statistics')
+@query_budget(5)
+def get_similar_players():
+    """
+    Endpoint para encontrar os jogadores mais parecidos com um jogador,
+    pela distância entre vetores padronizados de estatísticas por 90 minutos.
+    Parâmetros: player_id (obrigatório), k (1 a 50) e position (opcional).
+    """
+    player_id = request.args.get('player_id', type=int)
+    k = request.args.get('k', default=10, type=int)
+    position = request.args.get('position')
+    
+    if not player_id:
+        return jsonify({'error': 'ID do jogador é obrigatório.'}), 400
+    
+    if k < 1 or k > MAX_SIMILAR_PLAYERS:
+        return jsonify({'error': f'k deve estar entre 1 e {MAX_SIMILAR_PLAYERS}.'}), 400
+    
+    player = Player.query.get(player_id)
+    if not player:
+        return jsonify({'error': 'Jogador não encontrado.'}), 404
+    
+    features, neighbours = similarity_index.similar(player_id, k, position)
+    if features is None:
+        return jsonify({'error': 'Jogador sem minutos suficientes para comparação.'}), 404
+    
+    players = {
+        row.id: row
+        for row in Player.query.filter(Player.id.in_([neighbour_id for neighbour_id, _, _ in neighbours])).all()
+    }
+    
+    return jsonify({
+        'player': {**player.to_dict(), 'features': features},
+        'position': position,
+        'k': k,
+        'similar_players': [
+            {
+                **players[neighbour_id].to_dict(),
+                'distance': round(distance, 4),
+                'similarity': round(1 / (1 + distance), 4),
+                'features': neighbour_features
+            }
+            for neighbour_id, distance, neighbour_features in neighbours
+            if neighbour_id in players
+        ]
+    }), 200
+
 @bp.route('/league-table', methods=['GET'])
 @jwt_required()
+@conditional('teams', 'matches')
+@query_budget(2)
 def get_league_table():
     """
     Endpoint para obter a tabela classificativa de uma liga.
@@ -222,103 +295,137 @@ def get_league_table():
     if not league or not season:
         return jsonify({'error': 'Liga e temporada são obrigatórios.'}), 400
     
-    # Obter todas as equipas da liga
-    teams = Team.query.filter_by(league=league).all()
+    table = build_league_table(league, season)
     
-    if not teams:
+    if not table:
         return jsonify({'error': 'Nenhuma equipa encontrada para esta liga.'}), 404
     
-    # Calcular pontos e estatísticas para cada equipa
-    table = []
+    return jsonify({
+        'league': league,
+        'season': season,
+        'table': table
+    }), 200
+
+@bp.route('/ratings', methods=['GET'])
+@jwt_required()
+@conditional(*ANALYTICS_SCOPES)
+@query_budget(4)
+def get_ratings_leaderboard():
+    """
+    Endpoint para obter a classificação de jogadores por rating médio.
+    Filtros opcionais: league, season, position e min_matches. O filtro
+    league conta os ratings obtidos ao serviço de equipas dessa liga
+    (statistics.team_id, a equipa à data do jogo); a equipa mostrada é a
+    atual do jogador. Os ratings são calculados na escrita das estatísticas
+    (ver src.services.ratings); esta rota só lê.
+    """
+    league = request.args.get('league')
+    season = request.args.get('season')
+    position = request.args.get('position')
+    min_matches = request.args.get('min_matches', default=1, type=int)
+    limit = request.args.get('limit', default=20, type=int)
+    limit = max(1, min(limit, MAX_RATINGS_LIMIT))
+    
+    average = db.func.avg(PlayerMatchRating.rating)
+    query = (
+        db.session.query(
+            Player.id,
+            Player.name,
+            Player.position,
+            Team.id,
+            Team.name,
+            average,
+            db.func.count(PlayerMatchRating.id)
+        )
+        .join(PlayerMatchRating, PlayerMatchRating.player_id == Player.id)
+        .outerjoin(Team, Team.id == Player.team_id)
+    )
     
-    for team in teams:
-        # Obter jogos da equipa na temporada especificada
-        home_matches = Match.query.filter_by(
-            home_team_id=team.id,
-            season=season,
-            status='completed'
-        ).all()
-        
-        away_matches = Match.query.filter_by(
-            away_team_id=team.id,
-            season=season,
-            status='completed'
-        ).all()
-        
-        # Calcular estatísticas
-        played = len(home_matches) + len(away_matches)
-        wins = 0
-        draws = 0
-        losses = 0
-        goals_for = 0
-        goals_against = 0
-        
-        for match in home_matches:
-            goals_for += match.home_score
-            goals_against += match.away_score
-            
-            if match.home_score > match.away_score:
-                wins += 1
-            elif match.home_score == match.away_score:
-                draws += 1
-            else:
-                losses += 1
-        
-        for match in away_matches:
-            goals_for += match.away_score
-            goals_against += match.home_score
-            
-            if match.away_score > match.home_score:
-                wins += 1
-            elif match.away_score == match.home_score:
-                draws += 1
-            else:
-                losses += 1
-        
-        # Calcular pontos (3 por vitória, 1 por empate)
-        points = wins * 3 + draws
-        
-        table.append({
-            'team_id': team.id,
-            'team_name': team.name,
-            'played': played,
-            'wins': wins,
-            'draws': draws,
-            'losses': losses,
-            'goals_for': goals_for,
-            'goals_against': goals_against,
-            'goal_difference': goals_for - goals_against,
-            'points': points
-        })
+    if season:
+        query = query.join(Match, Match.id == PlayerMatchRating.match_id).filter(Match.season == season)
+    if league:
+        league_teams = db.session.query(Team.id).filter(Team.league == league)
+        query = (
+            query.join(Statistic, Statistic.id == PlayerMatchRating.statistic_id)
+            .filter(Statistic.team_id.in_(league_teams.scalar_subquery()))
+        )
+    if position:
+        query = query.filter(Player.position == position)
+    
+    rows = (
+        query.group_by(Player.id, Player.name, Player.position, Team.id, Team.name)
+        .having(db.func.count(PlayerMatchRating.id) >= min_matches)
+        .order_by(average.desc(), Player.id)
+        .limit(limit)
+        .all()
+    )
     
-    # Ordenar tabela por pontos (decrescente) e depois por diferença de gols
-    table.sort(key=lambda x: (x['points'], x['goal_difference']), reverse=True)
+    # Média móvel mais recente de cada jogador listado, numa só consulta
+    form = {}
+    if rows:
+        latest = db.func.row_number().over(
+            partition_by=PlayerMatchRating.player_id,
+            order_by=(Match.date.desc(), PlayerMatchRating.id.desc())
+        ).label('rank')
+        ranked = (
+            db.session.query(PlayerMatchRating.player_id, PlayerMatchRating.rolling_rating, latest)
+            .join(Match, Match.id == PlayerMatchRating.match_id)
+            .filter(PlayerMatchRating.player_id.in_([row[0] for row in rows]))
+        )
+        if season:
+            ranked = ranked.filter(Match.season == season)
+        ranked = ranked.subquery()
+        form = dict(
+            db.session.query(ranked.c.player_id, ranked.c.rolling_rating)
+            .filter(ranked.c.rank == 1)
+            .all()
+        )
+    
+    leaderboard = []
     
-    # Adicionar posição na tabela
-    for i, team in enumerate(table):
-        team['position'] = i + 1
+    for i, (player_id, name, player_position, team_id, team_name, rating, matches) in enumerate(rows):
+        rolling = form.get(player_id)
+        leaderboard.append({
+            'rank': i + 1,
+            'player_id': player_id,
+            'player_name': name,
+            'position': player_position,
+            'team_id': team_id,
+            'team_name': team_name or 'Unknown',
+            'matches': matches,
+            'rating': round(rating, 2),
+            'rolling_rating': round(rolling, 2) if rolling is not None else None
+        })
     
     return jsonify({
         'league': league,
         'season': season,
-        'table': table
+        'position': position,
+        'rolling_window': ratings.ROLLING_WINDOW,
+        'leaderboard': leaderboard
     }), 200
 
 @bp.route('/performance-trends', methods=['GET'])
 @jwt_required()
+@conditional(*ANALYTICS_SCOPES)
+@query_budget(4)
 def get_performance_trends():
     """
     Endpoint para obter tendências de desempenho ao longo do tempo.
-    Pode ser para uma equipa ou jogador específico.
+    Pode ser para uma equipa ou jogador específico, com filtros opcionais
+    por temporada e competição. Os últimos N jogos vêm de uma única consulta.
     """
     team_id = request.args.get('team_id', type=int)
     player_id = request.args.get('player_id', type=int)
+    season = request.args.get('season')
+    competition = request.args.get('competition')
     
     if not team_id and not player_id:
         return jsonify({'error': 'ID da equipa ou do jogador é obrigatório.'}), 400
     
     # Período de análise (padrão: últimos 10 jogos)
     limit = request.args.get('limit', default=10, type=int)
+    limit = max(1, min(limit, MAX_TREND_LIMIT))
     
     if team_id:
         # Análise de tendência para equipa
@@ -327,72 +434,10 @@ def get_performance_trends():
         if not team:
             return jsonify({'error': 'Equipa não encontrada.'}), 404
         
-        # Obter jogos da equipa
-        home_matches = Match.query.filter_by(
-            home_team_id=team_id,
-            status='completed'
-        ).order_by(Match.date.desc()).limit(limit).all()
-        
-        away_matches = Match.query.filter_by(
-            away_team_id=team_id,
-            status='completed'
-        ).order_by(Match.date.desc()).limit(limit).all()
-        
-        # Combinar e ordenar por data
-        all_matches = home_matches + away_matches
-        all_matches.sort(key=lambda x: x.date, reverse=True)
-        all_matches = all_matches[:limit]
-        
-        # Calcular métricas de desempenho por jogo
-        performance_data = []
-        
-        for match in all_matches:
-            is_home = match.home_team_id == team_id
-            
-            # Obter estatísticas do jogo
-            match_stats = Statistic.query.filter_by(match_id=match.id).all()
-            
-            # Filtrar estatísticas da equipa
-            team_players = Player.query.filter_by(team_id=team_id).all()
-            team_player_ids = [player.id for player in team_players]
-            team_stats = [stat for stat in match_stats if stat.player_id in team_player_ids]
-            
-            # Calcular métricas
-            goals_scored = match.home_score if is_home else match.away_score
-            goals_conceded = match.away_score if is_home else match.home_score
-            
-            shots = sum(stat.shots for stat in team_stats)
-            shots_on_target = sum(stat.shots_on_target for stat in team_stats)
-            passes = sum(stat.passes for stat in team_stats)
-            passes_completed = sum(stat.passes_completed for stat in team_stats)
-            
-            shot_accuracy = (shots_on_target / shots * 100) if shots > 0 else 0
-            pass_accuracy = (passes_completed / passes * 100) if passes > 0 else 0
-            
-            # Determinar resultado
-            if is_home:
-                result = 'W' if match.home_score > match.away_score else ('D' if match.home_score == match.away_score else 'L')
-            else:
-                result = 'W' if match.away_score > match.home_score else ('D' if match.away_score == match.home_score else 'L')
-            
-            performance_data.append({
-                'match_id': match.id,
-                'date': match.date.isoformat(),
-                'opponent': Team.query.get(match.away_team_id if is_home else match.home_team_id).name,
-                'is_home': is_home,
-                'result': result,
-                'goals_scored': goals_scored,
-                'goals_conceded': goals_conceded,
-                'shots': shots,
-                'shots_on_target': shots_on_target,
-                'shot_accuracy': shot_accuracy,
-                'pass_accuracy': pass_accuracy
-            })
-        
         return jsonify({
             'team_id': team_id,
             'team_name': team.name,
-            'performance_data': performance_data
+            'performance_data': get_team_trend(team_id, limit, season, competition)
         }), 200
     
     elif player_id:
@@ -402,182 +447,457 @@ def get_performance_trends():
         if not player:
             return jsonify({'error': 'Jogador não encontrado.'}), 404
         
-        # Obter estatísticas do jogador
-        player_stats = Statistic.query.filter_by(
-            player_id=player_id
-        ).order_by(Match.date.desc()).limit(limit).all()
-        
-        # Calcular métricas de desempenho por jogo
-        performance_data = []
-        
-        for stat in player_stats:
-            match = Match.query.get(stat.match_id)
-            
-            if not match or match.status != 'completed':
-                continue
-            
-            is_home = match.home_team_id == player.team_id
-            
-            performance_data.append({
-                'match_id': match.id,
-                'date': match.date.isoformat(),
-                'opponent': Team.query.get(match.away_team_id if is_home else match.home_team_id).name,
-                'is_home': is_home,
-                'minutes_played': stat.minutes_played,
-                'goals': stat.goals,
-                'assists': stat.assists,
-                'shots': stat.shots,
-                'shots_on_target': stat.shots_on_target,
-                'shot_accuracy': (stat.shots_on_target / stat.shots * 100) if stat.shots > 0 else 0,
-                'pass_accuracy': stat.pass_accuracy
-            })
+        team = Team.query.get(player.team_id)
         
         return jsonify({
             'player_id': player_id,
             'player_name': player.name,
-            'team_name': Team.query.get(player.team_id).name if Team.query.get(player.team_id) else 'Unknown',
-            'performance_data': performance_data
+            'team_name': team.name if team else 'Unknown',
+            'performance_data': get_player_trend(player, limit, season, competition)
         }), 200
 
 # Funções auxiliares
 
-def calculate_team_stats(team_id):
-    """Calcula estatísticas agregadas para uma equipa."""
-    team = Team.query.get(team_id)
+# Métricas de cada entrada em 'comparison' nas comparações com ?ids=
+TEAM_COMPARISON_METRICS = {
+    'goals_scored': 'goals_scored',
+    'goals_conceded': 'goals_conceded',
+    'win_percentage': 'win_percentage',
+    'possession': 'avg_possession',
+    'pass_accuracy': 'avg_pass_accuracy'
+}
+PLAYER_COMPARISON_METRICS = ('goals', 'assists', 'shots_on_target', 'pass_accuracy', 'tackles')
+
+def parse_ids(value):
+    """
+    IDs separados por vírgulas (?ids=1,2,3), sem repetidos e pela ordem
+    indicada. Levanta ValueError com menos de dois ou mais de
+    MAX_COMPARISON_IDS IDs.
+    """
+    try:
+        ids = list(dict.fromkeys(int(part) for part in value.split(',') if part.strip()))
+    except ValueError:
+        raise ValueError('ids deve ser uma lista de números inteiros separados por vírgulas.')
     
-    if not team:
-        return {}
+    if len(ids) < 2 or len(ids) > MAX_COMPARISON_IDS:
+        raise ValueError(f'Indique entre 2 e {MAX_COMPARISON_IDS} IDs diferentes.')
     
-    # Obter jogos da equipa
-    home_matches = Match.query.filter_by(
-        home_team_id=team_id,
-        status='completed'
-    ).all()
+    return ids
+
+def compare_team_list(team_ids):
+    """
+    Comparação de várias equipas: uma consulta para as equipas e as
+    consultas agrupadas de calculate_teams_stats, qualquer que seja o número
+    de equipas. Em 'comparison' os valores são indexados pelo ID da equipa.
+    """
+    teams = {team.id: team for team in Team.query.filter(Team.id.in_(team_ids)).all()}
+    missing = [team_id for team_id in team_ids if team_id not in teams]
     
-    away_matches = Match.query.filter_by(
-        away_team_id=team_id,
-        status='completed'
-    ).all()
+    if missing:
+        return jsonify({'error': f'Equipas não encontradas: {", ".join(map(str, missing))}.'}), 404
     
-    # Calcular estatísticas básicas
-    total_matches = len(home_matches) + len(away_matches)
+    stats = calculate_teams_stats(team_ids)
     
-    if total_matches == 0:
-        return {
-            'total_matches': 0,
-            'wins': 0,
-            'draws': 0,
-            'losses': 0,
-            'goals_scored': 0,
-            'goals_conceded': 0,
-            'win_percentage': 0,
-            'avg_possession': 0,
-            'avg_pass_accuracy': 0
+    return jsonify({
+        'teams': [
+            {
+                'id': team_id,
+                'name': teams[team_id].name,
+                'stats': stats[team_id]
+            }
+            for team_id in team_ids
+        ],
+        'comparison': {
+            metric: {team_id: stats[team_id][field] for team_id in team_ids}
+            for metric, field in TEAM_COMPARISON_METRICS.items()
         }
+    }), 200
+
+def compare_player_list(player_ids, season=None):
+    """
+    Comparação de vários jogadores: jogadores, nomes das equipas e totais
+    (summarize_many) em três consultas, qualquer que seja o número de
+    jogadores. Em 'comparison' os valores são indexados pelo ID do jogador.
+    """
+    players = {player.id: player for player in Player.query.filter(Player.id.in_(player_ids)).all()}
+    missing = [player_id for player_id in player_ids if player_id not in players]
     
-    # Calcular vitórias, empates e derrotas
-    wins = 0
-    draws = 0
-    losses = 0
-    goals_scored = 0
-    goals_conceded = 0
+    if missing:
+        return jsonify({'error': f'Jogadores não encontrados: {", ".join(map(str, missing))}.'}), 404
     
-    for match in home_matches:
-        goals_scored += match.home_score
-        goals_conceded += match.away_score
+    stats = calculate_players_stats(player_ids, season)
+    team_names = get_team_names([player.team_id for player in players.values()])
+    
+    return jsonify({
+        'players': [
+            {
+                'id': player_id,
+                'name': players[player_id].name,
+                'team': team_names.get(players[player_id].team_id, 'Unknown'),
+                'position': players[player_id].position,
+                'stats': stats[player_id]
+            }
+            for player_id in player_ids
+        ],
+        'season': season,
+        'comparison': {
+            metric: {player_id: stats[player_id][metric] for player_id in player_ids}
+            for metric in PLAYER_COMPARISON_METRICS
+        }
+    }), 200
+
+def get_team_names(team_ids):
+    """Nomes das equipas por ID, numa consulta."""
+    return dict(db.session.query(Team.id, Team.name).filter(Team.id.in_(set(team_ids))).all())
+
+def get_team_trend(team_id, limit, season=None, competition=None):
+    """
+    Últimos N jogos concluídos de uma equipa com as suas métricas, numa única
+    consulta: os jogos são escolhidos numa CTE e as estatísticas dos
+    jogadores da equipa são agregadas apenas para esses jogos.
+    """
+    recent = Match.query.with_entities(
+        Match.id, Match.date, Match.home_team_id, Match.away_team_id,
+        Match.home_score, Match.away_score
+    ).filter(
+        (Match.home_team_id == team_id) | (Match.away_team_id == team_id),
+        Match.status == 'completed'
+    )
+    if season:
+        recent = recent.filter(Match.season == season)
+    if competition:
+        recent = recent.filter(Match.competition == competition)
+    recent = recent.order_by(Match.date.desc(), Match.id.desc()).limit(limit).cte('recent')
+    
+    team_stats = (
+        db.session.query(
+            Statistic.match_id,
+            db.func.sum(Statistic.shots).label('shots'),
+            db.func.sum(Statistic.shots_on_target).label('shots_on_target'),
+            db.func.sum(Statistic.passes).label('passes'),
+            db.func.sum(Statistic.passes_completed).label('passes_completed')
+        )
+        .filter(Statistic.team_id == team_id, Statistic.match_id.in_(db.select(recent.c.id)))
+        .group_by(Statistic.match_id)
+        .subquery()
+    )
+    
+    opponent_id = db.case(
+        (recent.c.home_team_id == team_id, recent.c.away_team_id),
+        else_=recent.c.home_team_id
+    )
+    rows = (
+        db.session.query(
+            recent,
+            Team.name.label('opponent'),
+            team_stats.c.shots,
+            team_stats.c.shots_on_target,
+            team_stats.c.passes,
+            team_stats.c.passes_completed
+        )
+        .outerjoin(Team, Team.id == opponent_id)
+        .outerjoin(team_stats, team_stats.c.match_id == recent.c.id)
+        .order_by(recent.c.date.desc(), recent.c.id.desc())
+        .all()
+    )
+    
+    performance_data = []
+    
+    for row in rows:
+        is_home = row.home_team_id == team_id
+        goals_scored = row.home_score if is_home else row.away_score
+        goals_conceded = row.away_score if is_home else row.home_score
         
-        if match.home_score > match.away_score:
-            wins += 1
-        elif match.home_score == match.away_score:
-            draws += 1
-        else:
-            losses += 1
-    
-    for match in away_matches:
-        goals_scored += match.away_score
-        goals_conceded += match.home_score
+        shots = row.shots or 0
+        shots_on_target = row.shots_on_target or 0
+        passes = row.passes or 0
+        passes_completed = row.passes_completed or 0
         
-        if match.away_score > match.home_score:
-            wins += 1
-        elif match.away_score == match.home_score:
-            draws += 1
-        else:
-            losses += 1
+        # Determinar resultado
+        result = 'W' if goals_scored > goals_conceded else ('D' if goals_scored == goals_conceded else 'L')
+        
+        performance_data.append({
+            'match_id': row.id,
+            'date': row.date.isoformat(),
+            'opponent': row.opponent,
+            'is_home': is_home,
+            'result': result,
+            'goals_scored': goals_scored,
+            'goals_conceded': goals_conceded,
+            'shots': shots,
+            'shots_on_target': shots_on_target,
+            'shot_accuracy': (shots_on_target / shots * 100) if shots > 0 else 0,
+            'pass_accuracy': (passes_completed / passes * 100) if passes > 0 else 0
+        })
+    
+    return performance_data
+
+def get_player_trend(player, limit, season=None, competition=None):
+    """Últimos N jogos concluídos de um jogador, numa única consulta com join."""
+    # Adversário pela equipa em que o jogador estava à data de cada jogo
+    opponent_id = db.case(
+        (Match.home_team_id == Statistic.team_id, Match.away_team_id),
+        else_=Match.home_team_id
+    )
+    query = (
+        db.session.query(
+            Statistic.minutes_played,
+            Statistic.goals,
+            Statistic.assists,
+            Statistic.shots,
+            Statistic.shots_on_target,
+            Statistic.pass_accuracy,
+            Match.id.label('match_id'),
+            Match.date,
+            Match.home_team_id,
+            Statistic.team_id,
+            Team.name.label('opponent')
+        )
+        .join(Match, Match.id == Statistic.match_id)
+        .outerjoin(Team, Team.id == opponent_id)
+        .filter(Statistic.player_id == player.id, Match.status == 'completed')
+    )
+    if season:
+        query = query.filter(Match.season == season)
+    if competition:
+        query = query.filter(Match.competition == competition)
+    
+    rows = query.order_by(Match.date.desc(), Match.id.desc()).limit(limit).all()
+    
+    return [
+        {
+            'match_id': row.match_id,
+            'date': row.date.isoformat(),
+            'opponent': row.opponent,
+            'is_home': row.home_team_id == row.team_id,
+            'minutes_played': row.minutes_played,
+            'goals': row.goals,
+            'assists': row.assists,
+            'shots': row.shots,
+            'shots_on_target': row.shots_on_target,
+            'shot_accuracy': (row.shots_on_target / row.shots * 100) if row.shots else 0,
+            'pass_accuracy': row.pass_accuracy
+        }
+        for row in rows
+    ]
+
+def build_league_table(league, season):
+    """Tabela classificativa de uma liga e temporada (lista vazia se a liga não tiver equipas)."""
+    # Leitura única da classificação materializada; equipas sem jogos
+    # concluídos aparecem com zeros graças ao outer join
+    rows = (
+        db.session.query(Team.id, Team.name, Standing)
+        .outerjoin(Standing, db.and_(
+            Standing.team_id == Team.id,
+            Standing.league == league,
+            Standing.season == season
+        ))
+        .filter(Team.league == league)
+        .order_by(
+            db.func.coalesce(Standing.points, 0).desc(),
+            db.func.coalesce(Standing.goal_difference, 0).desc(),
+            Team.id
+        )
+        .all()
+    )
+    
+    table = []
+    
+    for i, (team_id, team_name, standing) in enumerate(rows):
+        table.append({
+            'team_id': team_id,
+            'team_name': team_name,
+            'played': standing.played if standing else 0,
+            'wins': standing.wins if standing else 0,
+            'draws': standing.draws if standing else 0,
+            'losses': standing.losses if standing else 0,
+            'goals_for': standing.goals_for if standing else 0,
+            'goals_against': standing.goals_against if standing else 0,
+            'goal_difference': standing.goal_difference if standing else 0,
+            'points': standing.points if standing else 0,
+            'position': i + 1
+        })
+    
+    return table
+
+def build_dashboard_data():
+    """Calcula os dados do dashboard com um pequeno número de consultas agregadas."""
+    # Contar totais numa única consulta
+    total_teams, total_players, total_matches = db.session.query(
+        db.session.query(db.func.count(Team.id)).scalar_subquery(),
+        db.session.query(db.func.count(Player.id)).scalar_subquery(),
+        db.session.query(db.func.count(Match.id)).scalar_subquery()
+    ).one()
+    
+    # Obter jogos recentes
+    recent_matches = Match.query.order_by(Match.date.desc()).limit(5).all()
+    
+    # Obter jogadores com mais golos, já com nome do jogador e da equipa
+    total_goals = db.func.sum(Statistic.goals).label('total_goals')
+    top_scorers_stats = (
+        db.session.query(
+            Player.id,
+            Player.name,
+            Player.team_id,
+            Team.name.label('team_name'),
+            total_goals
+        )
+        .join(Player, Player.id == Statistic.player_id)
+        .outerjoin(Team, Team.id == Player.team_id)
+        .group_by(Player.id, Player.name, Player.team_id, Team.name)
+        .order_by(total_goals.desc(), Player.id)
+        .limit(5)
+        .all()
+    )
     
-    # Calcular percentagem de vitórias
-    win_percentage = (wins / total_matches * 100) if total_matches > 0 else 0
+    top_scorers = [
+        {
+            'player_id': stat.id,
+            'player_name': stat.name,
+            'team_id': stat.team_id,
+            'team_name': stat.team_name or 'Unknown',
+            'goals': stat.total_goals
+        }
+        for stat in top_scorers_stats
+    ]
     
-    # Calcular posse média e precisão de passes (simulado)
-    # Em uma implementação real, estes valores viriam das estatísticas detalhadas dos jogos
-    avg_possession = 50.0  # Valor padrão
-    avg_pass_accuracy = 80.0  # Valor padrão
+    # Obter distribuição de jogadores por posição
+    positions = (
+        Player.query
+        .with_entities(
+            Player.position,
+            db.func.count(Player.id).label('count')
+        )
+        .group_by(Player.position)
+        .all()
+    )
+    
+    position_distribution = [
+        {'position': pos.position, 'count': pos.count}
+        for pos in positions
+    ]
     
     return {
-        'total_matches': total_matches,
-        'wins': wins,
-        'draws': draws,
-        'losses': losses,
-        'goals_scored': goals_scored,
-        'goals_conceded': goals_conceded,
-        'win_percentage': win_percentage,
-        'avg_possession': avg_possession,
-        'avg_pass_accuracy': avg_pass_accuracy
+        'summary': {
+            'total_teams': total_teams,
+            'total_players': total_players,
+            'total_matches': total_matches
+        },
+        'recent_matches': [match.to_dict() for match in recent_matches],
+        'top_scorers': top_scorers,
+        'position_distribution': position_distribution
     }
 
-def calculate_player_stats(player_id):
-    """Calcula estatísticas agregadas para um jogador."""
-    player = Player.query.get(player_id)
-    
-    if not player:
-        return {}
+def calculate_team_stats(team_id):
+    """Calcula estatísticas agregadas para uma equipa."""
+    return calculate_teams_stats([team_id])[team_id]
+
+def calculate_teams_stats(team_ids):
+    """
+    Estatísticas agregadas de várias equipas: resultados somados da
+    classificação materializada (todas as ligas e temporadas) e médias de
+    posse e precisão de passes do box score guardado por jogo, com uma
+    consulta agrupada para cada tabela.
+    """
+    rows = {
+        row[0]: row[1:]
+        for row in db.session.query(
+            Standing.team_id,
+            db.func.sum(Standing.played),
+            db.func.sum(Standing.wins),
+            db.func.sum(Standing.draws),
+            db.func.sum(Standing.losses),
+            db.func.sum(Standing.goals_for),
+            db.func.sum(Standing.goals_against)
+        )
+        .filter(Standing.team_id.in_(team_ids))
+        .group_by(Standing.team_id)
+        .all()
+    }
+    averages = {
+        row[0]: row[1:]
+        for row in db.session.query(
+            TeamMatchStat.team_id,
+            db.func.avg(TeamMatchStat.possession),
+            db.func.avg(TeamMatchStat.pass_accuracy)
+        )
+        .filter(TeamMatchStat.team_id.in_(team_ids))
+        .group_by(TeamMatchStat.team_id)
+        .all()
+    }
     
-    # Obter estatísticas do jogador
-    stats = Statistic.query.filter_by(player_id=player_id).all()
+    stats = {}
+    for team_id in team_ids:
+        played, wins, draws, losses, goals_scored, goals_conceded = rows.get(team_id) or (0, 0, 0, 0, 0, 0)
+        avg_possession, avg_pass_accuracy = averages.get(team_id) or (None, None)
+        
+        # Jogos sem passes registados não entram nas médias
+        stats[team_id] = {
+            'total_matches': played,
+            'wins': wins,
+            'draws': draws,
+            'losses': losses,
+            'goals_scored': goals_scored,
+            'goals_conceded': goals_conceded,
+            'win_percentage': (wins / played * 100) if played > 0 else 0,
+            'avg_possession': round(avg_possession, 1) if avg_possession is not None else 0,
+            'avg_pass_accuracy': round(avg_pass_accuracy, 1) if avg_pass_accuracy is not None else 0
+        }
     
-    if not stats:
+    return stats
+
+def summarize_head_to_head(summary, team1_id, team2_id):
+    """Resumo do confronto direto orientado para team1 (vitórias de cada equipa)."""
+    if summary is None:
         return {
-            'matches_played': 0,
-            'minutes_played': 0,
-            'goals': 0,
-            'assists': 0,
-            'shots': 0,
-            'shots_on_target': 0,
-            'shot_accuracy': 0,
-            'passes': 0,
-            'pass_accuracy': 0,
-            'tackles': 0,
-            'interceptions': 0
+            'played': 0,
+            'team1_wins': 0,
+            'team2_wins': 0,
+            'draws': 0,
+            'team1_goals': 0,
+            'team2_goals': 0,
+            'last_results': []
         }
     
-    # Calcular estatísticas agregadas
-    matches_played = len(stats)
-    minutes_played = sum(stat.minutes_played for stat in stats)
-    goals = sum(stat.goals for stat in stats)
-    assists = sum(stat.assists for stat in stats)
-    shots = sum(stat.shots for stat in stats)
-    shots_on_target = sum(stat.shots_on_target for stat in stats)
-    passes = sum(stat.passes for stat in stats)
-    passes_completed = sum(stat.passes_completed for stat in stats)
-    tackles = sum(stat.tackles for stat in stats)
-    interceptions = sum(stat.interceptions for stat in stats)
-    
-    # Calcular médias e percentagens
-    shot_accuracy = (shots_on_target / shots * 100) if shots > 0 else 0
-    pass_accuracy = (passes_completed / passes * 100) if passes > 0 else 0
-    
+    oriented = summary.for_team(team1_id)
     return {
-        'matches_played': matches_played,
-        'minutes_played': minutes_played,
-        'goals': goals,
-        'assists': assists,
-        'shots': shots,
-        'shots_on_target': shots_on_target,
-        'shot_accuracy': shot_accuracy,
-        'passes': passes,
-        'pass_accuracy': pass_accuracy,
-        'tackles': tackles,
-        'interceptions': interceptions
+        'played': oriented['played'],
+        'team1_wins': oriented['wins'],
+        'team2_wins': oriented['losses'],
+        'draws': oriented['draws'],
+        'team1_goals': oriented['goals_for'],
+        'team2_goals': oriented['goals_against'],
+        'last_results': oriented['last_results']
     }
 
+def calculate_player_stats(player_id, season=None):
+    """Calcula estatísticas agregadas para um jogador (opcionalmente numa temporada)."""
+    return calculate_players_stats([player_id], season)[player_id]
+
+def calculate_players_stats(player_ids, season=None):
+    """
+    Estatísticas agregadas de vários jogadores (opcionalmente numa
+    temporada), lidas da agregação por jogador e temporada numa consulta.
+    """
+    stats = {}
+    for player_id, totals in player_rollup.summarize_many(player_ids, season).items():
+        stats[player_id] = {
+            'matches_played': totals['matches_played'],
+            'minutes_played': totals['minutes_played'],
+            'goals': totals['goals'],
+            'assists': totals['assists'],
+            'shots': totals['shots'],
+            'shots_on_target': totals['shots_on_target'],
+            'shot_accuracy': totals['shot_accuracy'],
+            'passes': totals['passes'],
+            'pass_accuracy': totals['pass_accuracy'],
+            'tackles': totals['tackles'],
+            'interceptions': totals['interceptions'],
+            'goals_per_90': totals['goals_per_90'],
+            'assists_per_90': totals['assists_per_90']
+        }
+    
+    return stats
+
 # Importar db do contexto principal
 from src.main import db
@@ -0,0 +1,195 @@
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import jwt_required
+from src.models import Team, Player
+from src.routes.analytics_routes import (
+    ANALYTICS_SCOPES, MAX_TREND_LIMIT, build_league_table, calculate_players_stats,
+    calculate_teams_stats, get_player_trend, get_team_trend
+)
+from src.services.charts import FORMATS, ChartBusy, ChartTimeout, renderer
+from src.utils.conditional import conditional
+from src.utils.query_budget import query_budget
+
+bp = Blueprint('charts', __name__, url_prefix='/api/charts')
+
+# Métricas de cada radar de comparação (chave nas estatísticas -> legenda)
+TEAM_RADAR_METRICS = {
+    'goals_scored': 'Golos marcados',
+    'goals_conceded': 'Golos sofridos',
+    'win_percentage': 'Vitórias (%)',
+    'avg_possession': 'Posse (%)',
+    'avg_pass_accuracy': 'Passes certos (%)'
+}
+PLAYER_RADAR_METRICS = {
+    'goals': 'Golos',
+    'assists': 'Assistências',
+    'shots_on_target': 'Remates enquadrados',
+    'pass_accuracy': 'Passes certos (%)',
+    'tackles': 'Desarmes'
+}
+
+@bp.route('/performance-trends', methods=['GET'])
+@jwt_required()
+@conditional(*ANALYTICS_SCOPES)
+@query_budget(4)
+def performance_trends_chart():
+    """
+    Gráfico da tendência de desempenho de uma equipa (golos marcados,
+    sofridos e remates enquadrados) ou de um jogador (golos, assistências
+    e remates enquadrados). Mesmos parâmetros de /api/analytics/performance-trends,
+    mais format=png|svg.
+    """
+    fmt = request.args.get('format', 'png')
+    team_id = request.args.get('team_id', type=int)
+    player_id = request.args.get('player_id', type=int)
+    season = request.args.get('season')
+    competition = request.args.get('competition')
+    limit = max(1, min(request.args.get('limit', default=10, type=int), MAX_TREND_LIMIT))
+    
+    if fmt not in FORMATS:
+        return jsonify({'error': f'Formato inválido. Use {", ".join(FORMATS)}.'}), 400
+    
+    if not team_id and not player_id:
+        return jsonify({'error': 'ID da equipa ou do jogador é obrigatório.'}), 400
+    
+    if team_id:
+        team = Team.query.get(team_id)
+        if not team:
+            return jsonify({'error': 'Equipa não encontrada.'}), 404
+        
+        def load():
+            trend = list(reversed(get_team_trend(team_id, limit, season, competition)))
+            return trend_chart_data(team.name, trend, {
+                'Golos marcados': 'goals_scored',
+                'Golos sofridos': 'goals_conceded',
+                'Remates enquadrados': 'shots_on_target'
+            })
+    else:
+        player = Player.query.get(player_id)
+        if not player:
+            return jsonify({'error': 'Jogador não encontrado.'}), 404
+        
+        def load():
+            trend = list(reversed(get_player_trend(player, limit, season, competition)))
+            return trend_chart_data(player.name, trend, {
+                'Golos': 'goals',
+                'Assistências': 'assists',
+                'Remates enquadrados': 'shots_on_target'
+            })
+    
+    params = {
+        'team_id': team_id,
+        'player_id': None if team_id else player_id,
+        'season': season,
+        'competition': competition,
+        'limit': limit
+    }
+    return chart_response('performance-trend', params, ANALYTICS_SCOPES, load, fmt)
+
+@bp.route('/comparison-radar', methods=['GET'])
+@jwt_required()
+@conditional(*ANALYTICS_SCOPES)
+@query_budget(5)
+def comparison_radar_chart():
+    """
+    Radar de comparação entre duas equipas (team1_id, team2_id) ou dois
+    jogadores (player1_id, player2_id, season opcional). Cada eixo é
+    normalizado pelo maior dos dois valores. format=png|svg.
+    """
+    fmt = request.args.get('format', 'png')
+    team_ids = [request.args.get('team1_id', type=int), request.args.get('team2_id', type=int)]
+    player_ids = [request.args.get('player1_id', type=int), request.args.get('player2_id', type=int)]
+    season = request.args.get('season')
+    
+    if fmt not in FORMATS:
+        return jsonify({'error': f'Formato inválido. Use {", ".join(FORMATS)}.'}), 400
+    
+    if all(team_ids):
+        teams = {team.id: team for team in Team.query.filter(Team.id.in_(team_ids)).all()}
+        if len(teams) < len(set(team_ids)):
+            return jsonify({'error': 'Uma ou ambas as equipas não foram encontradas.'}), 404
+        
+        def load():
+            stats = calculate_teams_stats(team_ids)
+            return radar_chart_data(
+                'Comparação de equipas',
+                [(teams[team_id].name, stats[team_id]) for team_id in team_ids],
+                TEAM_RADAR_METRICS
+            )
+        
+        params = {'team_ids': tuple(team_ids)}
+    elif all(player_ids):
+        players = {player.id: player for player in Player.query.filter(Player.id.in_(player_ids)).all()}
+        if len(players) < len(set(player_ids)):
+            return jsonify({'error': 'Um ou ambos os jogadores não foram encontrados.'}), 404
+        
+        def load():
+            stats = calculate_players_stats(player_ids, season)
+            return radar_chart_data(
+                'Comparação de jogadores',
+                [(players[player_id].name, stats[player_id]) for player_id in player_ids],
+                PLAYER_RADAR_METRICS
+            )
+        
+        params = {'player_ids': tuple(player_ids), 'season': season}
+    else:
+        return jsonify({'error': 'IDs das duas equipas ou dos dois jogadores são obrigatórios.'}), 400
+    
+    return chart_response('comparison-radar', params, ANALYTICS_SCOPES, load, fmt)
+
+@bp.route('/league-table', methods=['GET'])
+@jwt_required()
+@conditional('teams', 'matches')
+@query_budget(4)
+def league_table_chart():
+    """Gráfico de barras com os pontos da tabela classificativa (league, season, format=png|svg)."""
+    fmt = request.args.get('format', 'png')
+    league = request.args.get('league')
+    season = request.args.get('season')
+    
+    if fmt not in FORMATS:
+        return jsonify({'error': f'Formato inválido. Use {", ".join(FORMATS)}.'}), 400
+    
+    if not league or not season:
+        return jsonify({'error': 'Liga e temporada são obrigatórios.'}), 400
+    
+    if not Team.query.filter_by(league=league).first():
+        return jsonify({'error': 'Nenhuma equipa encontrada para esta liga.'}), 404
+    
+    def load():
+        table = build_league_table(league, season)
+        return {
+            'title': f'{league} {season}',
+            'teams': [row['team_name'] for row in table],
+            'points': [row['points'] for row in table]
+        }
+    
+    return chart_response('league-table', {'league': league, 'season': season}, ('teams', 'matches'), load, fmt)
+
+# Funções auxiliares
+
+def chart_response(kind, params, scopes, load, fmt):
+    """Renderiza (ou lê da cache) o gráfico e devolve a imagem."""
+    try:
+        image = renderer.render(kind, params, scopes, load, fmt)
+    except ChartBusy:
+        return jsonify({'error': 'Serviço de gráficos ocupado. Tente novamente.'}), 503
+    except ChartTimeout:
+        return jsonify({'error': 'A renderização do gráfico excedeu o tempo limite.'}), 504
+    
+    return Response(image, mimetype=FORMATS[fmt])
+
+def trend_chart_data(title, trend, series):
+    """Dados de um gráfico de tendência: uma série por métrica, do jogo mais antigo ao mais recente."""
+    return {
+        'title': title,
+        'labels': [f"{row['date'][:10]} {row['opponent'] or ''}".strip() for row in trend],
+        'series': {label: [row[field] or 0 for row in trend] for label, field in series.items()}
+    }
+
+def radar_chart_data(title, entities, metrics):
+    """Dados de um radar: valores de cada entidade pela ordem das métricas."""
+    return {
+        'title': title,
+        'metrics': list(metrics.values()),
+        'entities': {name: [stats.get(field) or 0 for field in metrics] for name, stats in entities}
+    }
@@ -0,0 +1,42 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from src.services import importer
+
+bp = Blueprint('import', __name__, url_prefix='/api/import')
+
+@bp.route('/<entity>', methods=['POST'])
+@jwt_required()
+def import_entities(entity):
+    """
+    Endpoint para importar equipas, jogadores ou jogos de um ficheiro CSV
+    ou Excel (multipart, campo 'file'). Parâmetros: mode=insert|upsert e
+    chunk_size. As equipas podem ser indicadas pelo nome (team, home_team,
+    away_team, com *_country opcional) ou pelo ID (*_id).
+    """
+    upload = request.files.get('file')
+    
+    if entity not in importer.ENTITIES:
+        return jsonify({'error': f'Entidade inválida. Use {", ".join(importer.ENTITIES)}.'}), 404
+    
+    if not upload or not upload.filename:
+        return jsonify({'error': 'É necessário enviar um ficheiro no campo "file".'}), 400
+    
+    fmt = request.values.get('format') or file_format(upload.filename)
+    mode = request.values.get('mode', 'insert')
+    chunk_size = request.values.get('chunk_size', default=importer.DEFAULT_CHUNK_SIZE, type=int)
+    
+    try:
+        summary = importer.import_file(entity, upload.stream, fmt=fmt, mode=mode, chunk_size=chunk_size)
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if 'error' in summary:
+        return jsonify(summary), 500
+    
+    return jsonify({'message': 'Importação concluída.', **summary}), 200
+
+# Funções auxiliares
+
+def file_format(filename):
+    """Formato pela extensão do ficheiro (csv por omissão)."""
+    return 'excel' if filename.lower().endswith(('.xlsx', '.xlsm', '.xls')) else 'csv'
@@ -1,13 +1,34 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models import Match, Team, Player, Statistic
-import pandas as pd
+from src.models import Match, Team, Player, Statistic, MatchEvent
+from src.services import standings, player_rollup, live, head_to_head, team_match_stats
+from src.services.stats_store import store, use_columnar
+from src.utils.pagination import paginate
+from src.utils.conditional import conditional
+from src.utils.streaming import stream_format, stream_query
+from src.utils.query_budget import query_budget
+from src.main import db
 from datetime import datetime
 
 bp = Blueprint('match', __name__, url_prefix='/api/matches')
 
+# Campos somados por equipa e campos por jogador em /statistics
+TEAM_STAT_FIELDS = [
+    'shots', 'shots_on_target', 'passes', 'passes_completed', 'tackles',
+    'interceptions', 'fouls_committed', 'yellow_cards', 'red_cards'
+]
+PLAYER_STAT_FIELDS = [
+    'minutes_played', 'goals', 'assists', 'shots', 'shots_on_target', 'passes',
+    'pass_accuracy', 'tackles', 'interceptions', 'yellow_cards', 'red_cards'
+]
+
+# Tipos de evento aceites na timeline
+EVENT_TYPES = ['goal', 'own_goal', 'yellow_card', 'red_card', 'substitution', 'shot', 'shot_on_target']
+
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional('matches')
+@query_budget(2)
 def get_matches():
     # Suporte para filtros
     team_id = request.args.get('team_id', type=int)
@@ -26,15 +47,30 @@ def get_matches():
     if season:
         query = query.filter_by(season=season)
     
-    # Ordenar por data (mais recente primeiro)
-    matches = query.order_by(Match.date.desc()).all()
+    # Exportação em streaming (NDJSON/CSV) de todos os jogos filtrados
+    fmt = stream_format()
+    if fmt:
+        rows = (
+            query.with_entities(*Match.__table__.columns)
+            .order_by(Match.date.desc(), Match.id.desc())
+        )
+        return stream_query(rows, fmt, 'matches')
+    
+    # Ordenar por data (mais recente primeiro), paginado por (data, id)
+    try:
+        matches, pagination = paginate(query, [Match.date, Match.id], descending=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
-        'matches': [match.to_dict() for match in matches]
+        'matches': [match.to_dict() for match in matches],
+        **pagination
     }), 200
 
 @bp.route('/<int:match_id>', methods=['GET'])
 @jwt_required()
+@conditional('matches:id:{match_id}')
+@query_budget(2)
 def get_match(match_id):
     match = Match.query.get(match_id)
     
@@ -77,6 +113,8 @@ def create_match():
     try:
         from src.main import db
         db.session.add(new_match)
+        standings.apply_match(new_match)
+        head_to_head.recompute_pairs(head_to_head.pairs_of(new_match))
         db.session.commit()
         
         return jsonify({
@@ -97,6 +135,9 @@ def update_match(match_id):
     
     data = request.get_json()
     
+    # Guardar o estado anterior para desfazer a sua contribuição na classificação
+    previous = standings.snapshot_match(match)
+    
     # Atualizar campos permitidos
     if data.get('date'):
         match.date = datetime.fromisoformat(data['date'])
@@ -116,6 +157,7 @@ def update_match(match_id):
         match.home_score = data['home_score']
     if 'away_score' in data:
         match.away_score = data['away_score']
+    season_changed = bool(data.get('season')) and data['season'] != match.season
     if data.get('season'):
         match.season = data['season']
     if data.get('competition'):
@@ -127,7 +169,18 @@ def update_match(match_id):
     
     try:
         from src.main import db
+        standings.revert_match(previous)
+        standings.apply_match(match)
+        head_to_head.recompute_pairs(head_to_head.pairs_of(previous, match))
+        if season_changed:
+            # As estatísticas do jogo mudam de temporada na agregação por jogador
+            player_ids = [
+                row.player_id
+                for row in Statistic.query.with_entities(Statistic.player_id).filter_by(match_id=match.id)
+            ]
+            player_rollup.rebuild_player_season_stats(player_ids, commit=False)
         db.session.commit()
+        live.hub.notify(match.id)
         return jsonify({
             'message': 'Jogo atualizado com sucesso!',
             'match': match.to_dict()
@@ -146,7 +199,10 @@ def delete_match(match_id):
     
     try:
         from src.main import db
+        standings.revert_match(match)
+        pairs = head_to_head.pairs_of(match)
         db.session.delete(match)
+        head_to_head.recompute_pairs(pairs)
         db.session.commit()
         return jsonify({
             'message': 'Jogo eliminado com sucesso!'
@@ -157,95 +213,119 @@ def delete_match(match_id):
 
 @bp.route('/<int:match_id>/statistics', methods=['GET'])
 @jwt_required()
+@conditional('matches:id:{match_id}', 'statistics:match_id:{match_id}', 'teams:rewrite', 'players:rewrite')
+@query_budget(6)
 def get_match_statistics(match_id):
     match = Match.query.get(match_id)
     
     if not match:
         return jsonify({'error': 'Jogo não encontrado.'}), 404
     
-    # Obter todas as estatísticas do jogo
-    statistics = Statistic.query.filter_by(match_id=match_id).all()
+    # Preparar dados para análise: equipas numa consulta, estatísticas e
+    # nomes dos jogadores numa segunda, sem consultas por linha
+    home_team, away_team = get_match_teams(match)
     
-    # Preparar dados para análise
-    home_team = Team.query.get(match.home_team_id)
-    away_team = Team.query.get(match.away_team_id)
-    
-    home_players = Player.query.filter_by(team_id=match.home_team_id).all()
-    away_players = Player.query.filter_by(team_id=match.away_team_id).all()
-    
-    home_player_ids = [player.id for player in home_players]
-    away_player_ids = [player.id for player in away_players]
-    
-    # Separar estatísticas por equipa
-    home_stats = [stat for stat in statistics if stat.player_id in home_player_ids]
-    away_stats = [stat for stat in statistics if stat.player_id in away_player_ids]
+    if use_columnar():
+        # Agregação vetorizada por equipa a partir do armazenamento colunar
+        team_totals = store.group_sum('team_id', TEAM_STAT_FIELDS, match_id=match_id)
+        home_totals = team_totals.get(match.home_team_id, dict.fromkeys(TEAM_STAT_FIELDS, 0))
+        away_totals = team_totals.get(match.away_team_id, dict.fromkeys(TEAM_STAT_FIELDS, 0))
+        
+        rows = store.rows(['player_id', 'team_id'] + PLAYER_STAT_FIELDS, match_id=match_id)
+        columns = {field: values.tolist() for field, values in rows.items()}
+        statistics = [
+            {field: columns[field][i] for field in columns}
+            for i in range(len(columns['player_id']))
+        ]
+        
+        player_names = dict(
+            Player.query.with_entities(Player.id, Player.name)
+            .filter(Player.id.in_(columns['player_id']))
+            .all()
+        )
+        for stat in statistics:
+            stat['player_name'] = player_names.get(stat['player_id'])
+    else:
+        # Obter todas as estatísticas do jogo com o nome e a equipa do jogador
+        stat_columns = [getattr(Statistic, field) for field in TEAM_STAT_FIELDS + PLAYER_STAT_FIELDS]
+        rows = (
+            Statistic.query
+            .join(Player, Player.id == Statistic.player_id)
+            .with_entities(Statistic.player_id, Player.name, Statistic.team_id, *stat_columns)
+            .filter(Statistic.match_id == match_id)
+            .order_by(Statistic.id)
+            .all()
+        )
+        
+        # Separar estatísticas por equipa com uma consulta direta ao dicionário
+        team_totals = {
+            match.home_team_id: dict.fromkeys(TEAM_STAT_FIELDS, 0),
+            match.away_team_id: dict.fromkeys(TEAM_STAT_FIELDS, 0)
+        }
+        statistics = []
+        
+        for row in rows:
+            totals = team_totals.get(row.team_id)
+            if totals is not None:
+                for field in TEAM_STAT_FIELDS:
+                    totals[field] += getattr(row, field) or 0
+            
+            stat = {field: getattr(row, field) for field in PLAYER_STAT_FIELDS}
+            stat.update({'player_id': row.player_id, 'player_name': row.name, 'team_id': row.team_id})
+            statistics.append(stat)
+        
+        home_totals = team_totals[match.home_team_id]
+        away_totals = team_totals[match.away_team_id]
     
     # Calcular estatísticas agregadas por equipa
     home_team_stats = {
         'goals': match.home_score,
-        'shots': sum(stat.shots for stat in home_stats),
-        'shots_on_target': sum(stat.shots_on_target for stat in home_stats),
+        'shots': home_totals['shots'],
+        'shots_on_target': home_totals['shots_on_target'],
         'possession': 0,  # Será calculado abaixo
-        'passes': sum(stat.passes for stat in home_stats),
+        'passes': home_totals['passes'],
         'pass_accuracy': 0,  # Será calculado abaixo
-        'tackles': sum(stat.tackles for stat in home_stats),
-        'interceptions': sum(stat.interceptions for stat in home_stats),
-        'fouls': sum(stat.fouls_committed for stat in home_stats),
-        'yellow_cards': sum(stat.yellow_cards for stat in home_stats),
-        'red_cards': sum(stat.red_cards for stat in home_stats)
+        'tackles': home_totals['tackles'],
+        'interceptions': home_totals['interceptions'],
+        'fouls': home_totals['fouls_committed'],
+        'yellow_cards': home_totals['yellow_cards'],
+        'red_cards': home_totals['red_cards']
     }
     
     away_team_stats = {
         'goals': match.away_score,
-        'shots': sum(stat.shots for stat in away_stats),
-        'shots_on_target': sum(stat.shots_on_target for stat in away_stats),
+        'shots': away_totals['shots'],
+        'shots_on_target': away_totals['shots_on_target'],
         'possession': 0,  # Será calculado abaixo
-        'passes': sum(stat.passes for stat in away_stats),
+        'passes': away_totals['passes'],
         'pass_accuracy': 0,  # Será calculado abaixo
-        'tackles': sum(stat.tackles for stat in away_stats),
-        'interceptions': sum(stat.interceptions for stat in away_stats),
-        'fouls': sum(stat.fouls_committed for stat in away_stats),
-        'yellow_cards': sum(stat.yellow_cards for stat in away_stats),
-        'red_cards': sum(stat.red_cards for stat in away_stats)
+        'tackles': away_totals['tackles'],
+        'interceptions': away_totals['interceptions'],
+        'fouls': away_totals['fouls_committed'],
+        'yellow_cards': away_totals['yellow_cards'],
+        'red_cards': away_totals['red_cards']
     }
     
-    # Calcular posse de bola
-    total_passes = home_team_stats['passes'] + away_team_stats['passes']
-    if total_passes > 0:
-        home_team_stats['possession'] = round(home_team_stats['passes'] / total_passes * 100, 1)
-        away_team_stats['possession'] = round(100 - home_team_stats['possession'], 1)
-    
-    # Calcular precisão de passes
-    home_passes_completed = sum(stat.passes_completed for stat in home_stats)
-    away_passes_completed = sum(stat.passes_completed for stat in away_stats)
-    
-    if home_team_stats['passes'] > 0:
-        home_team_stats['pass_accuracy'] = round(home_passes_completed / home_team_stats['passes'] * 100, 1)
+    # Calcular posse de bola e precisão de passes (mesmas regras do box score guardado)
+    home_possession, away_possession = team_match_stats.possession_split(home_team_stats['passes'], away_team_stats['passes'])
+    if home_possession is not None:
+        home_team_stats['possession'] = home_possession
+        away_team_stats['possession'] = away_possession
     
-    if away_team_stats['passes'] > 0:
-        away_team_stats['pass_accuracy'] = round(away_passes_completed / away_team_stats['passes'] * 100, 1)
+    home_team_stats['pass_accuracy'] = team_match_stats.pass_accuracy(home_team_stats['passes'], home_totals['passes_completed']) or 0
+    away_team_stats['pass_accuracy'] = team_match_stats.pass_accuracy(away_team_stats['passes'], away_totals['passes_completed']) or 0
     
     # Estatísticas de jogadores
+    team_names = {match.home_team_id: home_team.name, match.away_team_id: away_team.name}
     player_statistics = []
     for stat in statistics:
-        player = Player.query.get(stat.player_id)
         player_stat = {
-            'player_id': stat.player_id,
-            'player_name': player.name,
-            'team_id': player.team_id,
-            'team_name': home_team.name if player.team_id == match.home_team_id else away_team.name,
-            'minutes_played': stat.minutes_played,
-            'goals': stat.goals,
-            'assists': stat.assists,
-            'shots': stat.shots,
-            'shots_on_target': stat.shots_on_target,
-            'passes': stat.passes,
-            'pass_accuracy': stat.pass_accuracy,
-            'tackles': stat.tackles,
-            'interceptions': stat.interceptions,
-            'yellow_cards': stat.yellow_cards,
-            'red_cards': stat.red_cards
+            'player_id': stat['player_id'],
+            'player_name': stat['player_name'],
+            'team_id': stat['team_id'],
+            'team_name': team_names.get(stat['team_id'])
         }
+        player_stat.update({field: stat[field] for field in PLAYER_STAT_FIELDS})
         player_statistics.append(player_stat)
     
     return jsonify({
@@ -267,89 +347,266 @@ def get_match_statistics(match_id):
 
 @bp.route('/<int:match_id>/timeline', methods=['GET'])
 @jwt_required()
+@conditional('matches:id:{match_id}', 'match_events:match_id:{match_id}', 'statistics:match_id:{match_id}', 'teams:rewrite', 'players:rewrite')
+@query_budget(5)
 def get_match_timeline(match_id):
+    """
+    Timeline de eventos do jogo, por ordem de minuto e segundo.
+    Filtros opcionais: from_minute/to_minute para um intervalo de tempo e
+    since_event_id para que clientes em direto obtenham apenas eventos novos.
+    Jogos sem eventos registados devolvem uma timeline derivada (derived=true),
+    sem minutos.
+    """
     match = Match.query.get(match_id)
     
     if not match:
         return jsonify({'error': 'Jogo não encontrado.'}), 404
     
-    # Em uma implementação real, teríamos uma tabela separada para eventos do jogo
-    # Aqui, vamos simular alguns eventos baseados nas estatísticas
+    from_minute = request.args.get('from_minute', type=int)
+    to_minute = request.args.get('to_minute', type=int)
+    since_event_id = request.args.get('since_event_id', type=int)
     
-    # Obter todas as estatísticas do jogo
-    statistics = Statistic.query.filter_by(match_id=match_id).all()
+    home_team, away_team = get_match_teams(match)
+    teams = {match.home_team_id: home_team, match.away_team_id: away_team}
     
-    # Simular timeline de eventos
-    timeline = []
+    # Consulta pelo índice (match_id, minute), com o nome do jogador incluído
+    query = (
+        db.session.query(MatchEvent, Player.name)
+        .outerjoin(Player, Player.id == MatchEvent.player_id)
+        .filter(MatchEvent.match_id == match_id)
+    )
     
-    # Adicionar gols (simulados)
-    for stat in statistics:
-        if stat.goals > 0:
-            player = Player.query.get(stat.player_id)
-            team = Team.query.get(player.team_id)
-            
-            # Simular minutos para os gols
-            for i in range(stat.goals):
-                # Gerar um minuto aleatório dentro do tempo jogado pelo jogador
-                minute = min(90, max(1, int(stat.minutes_played * (i+1) / (stat.goals+1))))
-                
-                timeline.append({
-                    'minute': minute,
-                    'type': 'goal',
-                    'player_id': player.id,
-                    'player_name': player.name,
-                    'team_id': team.id,
-                    'team_name': team.name
-                })
-    
-    # Adicionar cartões (simulados)
-    for stat in statistics:
-        if stat.yellow_cards > 0 or stat.red_cards > 0:
-            player = Player.query.get(stat.player_id)
-            team = Team.query.get(player.team_id)
-            
-            # Simular minutos para cartões amarelos
-            for i in range(stat.yellow_cards):
-                # Gerar um minuto aleatório
-                minute = min(90, max(1, int(30 + i * 20)))
-                
-                timeline.append({
-                    'minute': minute,
-                    'type': 'yellow_card',
-                    'player_id': player.id,
-                    'player_name': player.name,
-                    'team_id': team.id,
-                    'team_name': team.name
-                })
-            
-            # Simular minutos para cartões vermelhos
-            for i in range(stat.red_cards):
-                # Gerar um minuto aleatório (geralmente mais tarde no jogo)
-                minute = min(90, max(1, int(60 + i * 15)))
-                
-                timeline.append({
-                    'minute': minute,
-                    'type': 'red_card',
-                    'player_id': player.id,
-                    'player_name': player.name,
-                    'team_id': team.id,
-                    'team_name': team.name
-                })
-    
-    # Ordenar timeline por minuto
-    timeline.sort(key=lambda x: x['minute'])
+    if from_minute is not None:
+        query = query.filter(MatchEvent.minute >= from_minute)
+    if to_minute is not None:
+        query = query.filter(MatchEvent.minute <= to_minute)
+    if since_event_id is not None:
+        query = query.filter(MatchEvent.id > since_event_id)
+    
+    events = query.order_by(MatchEvent.minute, MatchEvent.second, MatchEvent.id).all()
+    
+    timeline = []
+    for event, player_name in events:
+        team = teams.get(event.team_id)
+        timeline.append({
+            'id': event.id,
+            'minute': event.minute,
+            'second': event.second,
+            'type': event.type,
+            'player_id': event.player_id,
+            'player_name': player_name,
+            'related_player_id': event.related_player_id,
+            'team_id': event.team_id,
+            'team_name': team.name if team else None
+        })
+    
+    last_event_id = max((event.id for event, _ in events), default=since_event_id)
+    
+    # Jogos sem nenhum evento registado: timeline derivada das estatísticas e do resultado
+    derived = not events and from_minute is None and to_minute is None and since_event_id is None
+    if derived:
+        timeline = derive_timeline(match, teams)
     
     return jsonify({
         'match_id': match_id,
         'home_team': {
             'id': match.home_team_id,
-            'name': Team.query.get(match.home_team_id).name,
+            'name': home_team.name,
             'score': match.home_score
         },
         'away_team': {
             'id': match.away_team_id,
-            'name': Team.query.get(match.away_team_id).name,
+            'name': away_team.name,
             'score': match.away_score
         },
-        'timeline': timeline
+        'timeline': timeline,
+        'last_event_id': last_event_id,
+        'derived': derived
     }), 200
+
+@bp.route('/<int:match_id>/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+@query_budget(4)
+def stream_match(match_id):
+    """
+    Canal Server-Sent Events de um jogo. Envia um 'snapshot' inicial e depois
+    eventos 'score' (resultado e estado), 'statistics' (deltas por jogador e
+    totais por equipa) e 'event' (timeline). Ao voltar a ligar, o cabeçalho
+    Last-Event-ID (ou ?last_event_id=) retoma a partir do último evento
+    recebido. O token pode ser enviado em ?jwt=, já que EventSource não
+    permite cabeçalhos.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    subscriber, frames = live.hub.subscribe(match_id, last_event_id)
+    
+    if subscriber is None:
+        return jsonify({'error': 'Jogo não encontrado.'}), 404
+    
+    heartbeat = current_app.config['LIVE_HEARTBEAT_SECONDS']
+    
+    # Devolver a ligação à base de dados antes de manter o stream aberto
+    db.session.remove()
+    
+    def generate():
+        try:
+            yield b'retry: 3000\n\n'
+            yield from frames
+            while not subscriber.closed:
+                pending = subscriber.wait(heartbeat)
+                if subscriber.dropped:
+                    yield b'event: dropped\ndata: {"reason":"slow_consumer"}\n\n'
+                    return
+                if pending:
+                    yield from pending
+                else:
+                    yield b': keepalive\n\n'
+            # Frames publicados junto com o fecho (ex.: fim do jogo)
+            yield from subscriber.wait(0)
+        finally:
+            live.hub.unsubscribe(subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@bp.route('/<int:match_id>/events', methods=['POST'])
+@jwt_required()
+def create_match_events(match_id):
+    """
+    Regista um ou mais eventos do jogo ({'events': [...]} ou um único evento).
+    Os eventos são apenas acrescentados; não há edição nem remoção.
+    """
+    match = Match.query.get(match_id)
+    
+    if not match:
+        return jsonify({'error': 'Jogo não encontrado.'}), 404
+    
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or not data:
+        return jsonify({'error': 'Dados incompletos. É necessário pelo menos um evento.'}), 400
+    
+    lines = data.get('events') if 'events' in data else [data]
+    
+    if not isinstance(lines, list) or not lines:
+        return jsonify({'error': 'A lista de eventos deve conter pelo menos um evento.'}), 400
+    
+    for i, line in enumerate(lines):
+        if not isinstance(line, dict):
+            return jsonify({'error': f'Evento {i}: cada evento deve ser um objeto.'}), 400
+        for field in ('player_id', 'related_player_id'):
+            if line.get(field) is not None and not is_integer(line[field]):
+                return jsonify({'error': f'Evento {i}: {field} inválido.'}), 400
+    
+    # Validar jogadores com uma única consulta
+    player_ids = {line.get('player_id') for line in lines} | {line.get('related_player_id') for line in lines}
+    player_ids.discard(None)
+    known_players = {
+        row.id for row in Player.query.with_entities(Player.id).filter(Player.id.in_(player_ids)).all()
+    }
+    
+    events = []
+    for i, line in enumerate(lines):
+        if line.get('type') not in EVENT_TYPES:
+            return jsonify({'error': f'Evento {i}: tipo inválido. Tipos aceites: {", ".join(EVENT_TYPES)}.'}), 400
+        team_id = line.get('team_id')
+        if not is_integer(team_id) or team_id not in (match.home_team_id, match.away_team_id):
+            return jsonify({'error': f'Evento {i}: a equipa não participa neste jogo.'}), 400
+        
+        minute = line.get('minute')
+        second = line.get('second', 0)
+        if not is_integer(minute) or not 0 <= minute <= 130 or not is_integer(second) or not 0 <= second <= 59:
+            return jsonify({'error': f'Evento {i}: minuto ou segundo inválido.'}), 400
+        
+        for field in ('player_id', 'related_player_id'):
+            if line.get(field) is not None and line[field] not in known_players:
+                return jsonify({'error': f'Evento {i}: jogador não encontrado.'}), 404
+        
+        events.append(MatchEvent(
+            match_id=match_id,
+            team_id=line['team_id'],
+            player_id=line.get('player_id'),
+            related_player_id=line.get('related_player_id'),
+            type=line['type'],
+            minute=minute,
+            second=second
+        ))
+    
+    try:
+        db.session.add_all(events)
+        db.session.commit()
+        live.hub.notify(match_id)
+        
+        return jsonify({
+            'message': 'Eventos registados com sucesso!',
+            'events': [event.to_dict() for event in events]
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Erro ao registar eventos: {str(e)}'}), 500
+
+# Funções auxiliares
+
+def get_match_teams(match):
+    """Obtém as equipas da casa e visitante de um jogo numa única consulta."""
+    teams = {
+        team.id: team
+        for team in Team.query.filter(Team.id.in_([match.home_team_id, match.away_team_id])).all()
+    }
+    return teams.get(match.home_team_id), teams.get(match.away_team_id)
+
+def is_integer(value):
+    """Inteiro JSON verdadeiro (bool é subclasse de int e não conta)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def derive_timeline(match, teams):
+    """
+    Timeline aproximada para jogos sem eventos registados (anteriores à tabela
+    match_events): golos e cartões saem das estatísticas por jogador e os golos
+    em falta face ao resultado ficam sem jogador. O minuto não é conhecido.
+    """
+    team_id = db.func.coalesce(Statistic.team_id, Player.team_id)
+    rows = (
+        db.session.query(
+            Statistic.player_id,
+            Player.name,
+            team_id.label('team_id'),
+            Statistic.goals,
+            Statistic.yellow_cards,
+            Statistic.red_cards
+        )
+        .join(Player, Player.id == Statistic.player_id)
+        .filter(Statistic.match_id == match.id)
+        .filter((Statistic.goals > 0) | (Statistic.yellow_cards > 0) | (Statistic.red_cards > 0))
+        .order_by(team_id, Statistic.player_id)
+        .all()
+    )
+    
+    def entry(event_type, team, player_id=None, player_name=None):
+        return {
+            'id': None,
+            'minute': None,
+            'second': None,
+            'type': event_type,
+            'player_id': player_id,
+            'player_name': player_name,
+            'related_player_id': None,
+            'team_id': team,
+            'team_name': teams[team].name if teams.get(team) else None,
+            'derived': True
+        }
+    
+    timeline = []
+    goals_by_team = {match.home_team_id: 0, match.away_team_id: 0}
+    for row in rows:
+        for field, event_type in (('goals', 'goal'), ('yellow_cards', 'yellow_card'), ('red_cards', 'red_card')):
+            timeline.extend(entry(event_type, row.team_id, row.player_id, row.name) for _ in range(getattr(row, field) or 0))
+        if row.team_id in goals_by_team:
+            goals_by_team[row.team_id] += row.goals or 0
+    
+    # Golos do resultado sem autor nas estatísticas (ex.: jogos sem estatísticas)
+    for team, score in ((match.home_team_id, match.home_score), (match.away_team_id, match.away_score)):
+        timeline.extend(entry('goal', team) for _ in range(max(0, (score or 0) - goals_by_team[team])))
+    
+    return timeline
@@ -0,0 +1,58 @@
+import hmac
+from flask import Blueprint, Response, current_app, jsonify, request
+from src.services.metrics import registry
+
+bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+@bp.route('', methods=['GET'])
+def get_metrics():
+    """
+    Endpoint com as métricas por rota no formato de texto do Prometheus:
+    pedidos por código de resposta e histogramas de duração, instruções SQL,
+    tempo de base de dados, objetos carregados e tamanho das respostas.
+    Exige 'Authorization: Bearer <METRICS_TOKEN>' (ver check_metrics_token).
+    """
+    denied = check_metrics_token()
+    if denied:
+        return denied
+    
+    return Response(registry.render(), mimetype=PROMETHEUS_CONTENT_TYPE, headers={'Cache-Control': 'no-store'})
+
+@bp.route('/slow-queries', methods=['GET'])
+def get_slow_queries():
+    """
+    Endpoint com as instruções SQL mais lentas deste worker e os respetivos
+    parâmetros (METRICS_SLOW_QUERIES instruções acima de METRICS_SLOW_QUERY_MS).
+    Os parâmetros podem conter dados de outros utilizadores (emails, hashes
+    de palavras-passe), pelo que exige o mesmo token que /api/metrics.
+    """
+    denied = check_metrics_token()
+    if denied:
+        return denied
+    
+    return jsonify({
+        'limit': registry.slow_size,
+        'threshold_ms': registry.slow_threshold * 1000,
+        'statements': registry.slow_statements()
+    }), 200
+
+# Funções auxiliares
+
+def check_metrics_token():
+    """
+    Resposta de erro se o pedido não puder ler as métricas, ou None.
+    Sem METRICS_TOKEN definido os endpoints não existem (404), para não
+    expor rotas, tempos e parâmetros SQL sem autenticação. A comparação é
+    feita em bytes (cabeçalhos com caracteres não ASCII dão 401, não 500).
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if not current_app.config.get('METRICS_ENABLED', True) or not token:
+        return jsonify({'error': 'Métricas desativadas.'}), 404
+    
+    header = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()):
+        return jsonify({'error': 'Token de métricas inválido.'}), 401
+    
+    return None
@@ -1,12 +1,29 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models import Player, Team, Statistic
-import pandas as pd
+from src.models import Player, Team, Match, Statistic
+from src.services import ratings, player_rollup
+from src.services.stats_store import store, use_columnar
+from src.utils.pagination import paginate
+from src.utils.conditional import conditional
+from src.utils.query_budget import query_budget
 
 bp = Blueprint('player', __name__, url_prefix='/api/players')
 
+# Campos por jogo devolvidos em /statistics
+MATCH_STAT_FIELDS = [
+    'match_id', 'minutes_played', 'goals', 'assists', 'shots', 'shots_on_target',
+    'passes', 'pass_accuracy', 'tackles', 'interceptions'
+]
+# Campos usados no cálculo de /performance
+PERFORMANCE_FIELDS = [
+    'goals', 'assists', 'shots_on_target', 'tackles', 'interceptions',
+    'pass_accuracy', 'minutes_played'
+]
+
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional('players')
+@query_budget(2)
 def get_players():
     # Suporte para filtros
     team_id = request.args.get('team_id', type=int)
@@ -22,14 +39,20 @@ def get_players():
     if nationality:
         query = query.filter_by(nationality=nationality)
     
-    players = query.all()
+    try:
+        players, pagination = paginate(query, [Player.id])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
-        'players': [player.to_dict() for player in players]
+        'players': [player.to_dict() for player in players],
+        **pagination
     }), 200
 
 @bp.route('/<int:player_id>', methods=['GET'])
 @jwt_required()
+@conditional('players:id:{player_id}')
+@query_budget(2)
 def get_player(player_id):
     player = Player.query.get(player_id)
     
@@ -146,85 +169,67 @@ def delete_player(player_id):
 
 @bp.route('/<int:player_id>/statistics', methods=['GET'])
 @jwt_required()
+@conditional('players:id:{player_id}', 'statistics:player_id:{player_id}', 'matches:rewrite')
+@query_budget(4)
 def get_player_statistics(player_id):
     player = Player.query.get(player_id)
     
     if not player:
         return jsonify({'error': 'Jogador não encontrado.'}), 404
     
-    # Obter todas as estatísticas do jogador
-    statistics = Statistic.query.filter_by(player_id=player_id).all()
+    season = request.args.get('season')
+    include_matches = request.args.get('include_matches', default='true').lower() != 'false'
     
-    if not statistics:
-        return jsonify({
-            'player_id': player_id,
-            'player_name': player.name,
-            'total_matches': 0,
-            'total_minutes': 0,
-            'goals': 0,
-            'assists': 0,
-            'shots': 0,
-            'shots_on_target': 0,
-            'shot_accuracy': 0,
-            'passes': 0,
-            'pass_accuracy': 0,
-            'tackles': 0,
-            'interceptions': 0,
-            'match_statistics': []
-        }), 200
+    # Totais lidos da agregação por jogador e temporada (custo constante)
+    totals = player_rollup.summarize(player_id, season)
     
-    # Calcular estatísticas agregadas
-    total_matches = len(statistics)
-    total_minutes = sum(stat.minutes_played for stat in statistics)
-    total_goals = sum(stat.goals for stat in statistics)
-    total_assists = sum(stat.assists for stat in statistics)
-    total_shots = sum(stat.shots for stat in statistics)
-    total_shots_on_target = sum(stat.shots_on_target for stat in statistics)
-    total_passes = sum(stat.passes for stat in statistics)
-    total_passes_completed = sum(stat.passes_completed for stat in statistics)
-    total_tackles = sum(stat.tackles for stat in statistics)
-    total_interceptions = sum(stat.interceptions for stat in statistics)
-    
-    # Calcular médias e percentagens
-    shot_accuracy = (total_shots_on_target / total_shots * 100) if total_shots > 0 else 0
-    pass_accuracy = (total_passes_completed / total_passes * 100) if total_passes > 0 else 0
-    
-    # Estatísticas por jogo
+    # Estatísticas por jogo (podem ser omitidas com include_matches=false)
     match_statistics = []
-    for stat in statistics:
-        match_stat = {
-            'match_id': stat.match_id,
-            'minutes_played': stat.minutes_played,
-            'goals': stat.goals,
-            'assists': stat.assists,
-            'shots': stat.shots,
-            'shots_on_target': stat.shots_on_target,
-            'passes': stat.passes,
-            'pass_accuracy': stat.pass_accuracy,
-            'tackles': stat.tackles,
-            'interceptions': stat.interceptions
-        }
-        match_statistics.append(match_stat)
+    if include_matches and totals['matches_played'] > 0:
+        if use_columnar() and not season:
+            rows = store.rows(MATCH_STAT_FIELDS, player_id=player_id)
+            columns = {field: values.tolist() for field, values in rows.items()}
+            match_statistics = [
+                {field: columns[field][i] for field in MATCH_STAT_FIELDS}
+                for i in range(len(columns['match_id']))
+            ]
+        else:
+            query = Statistic.query.filter_by(player_id=player_id)
+            if season:
+                query = query.join(Match, Match.id == Statistic.match_id).filter(Match.season == season)
+            match_statistics = [
+                {field: getattr(stat, field) for field in MATCH_STAT_FIELDS}
+                for stat in query.order_by(Statistic.id).all()
+            ]
     
     return jsonify({
         'player_id': player_id,
         'player_name': player.name,
-        'total_matches': total_matches,
-        'total_minutes': total_minutes,
-        'goals': total_goals,
-        'assists': total_assists,
-        'shots': total_shots,
-        'shots_on_target': total_shots_on_target,
-        'shot_accuracy': shot_accuracy,
-        'passes': total_passes,
-        'pass_accuracy': pass_accuracy,
-        'tackles': total_tackles,
-        'interceptions': total_interceptions,
+        'season': season,
+        'total_matches': totals['matches_played'],
+        'total_minutes': totals['minutes_played'],
+        'goals': totals['goals'],
+        'assists': totals['assists'],
+        'shots': totals['shots'],
+        'shots_on_target': totals['shots_on_target'],
+        'shot_accuracy': totals['shot_accuracy'],
+        'passes': totals['passes'],
+        'pass_accuracy': totals['pass_accuracy'],
+        'tackles': totals['tackles'],
+        'interceptions': totals['interceptions'],
+        'goals_per_90': totals['goals_per_90'],
+        'assists_per_90': totals['assists_per_90'],
+        'shots_per_90': totals['shots_per_90'],
+        'key_passes_per_90': totals['key_passes_per_90'],
+        'tackles_per_90': totals['tackles_per_90'],
+        'interceptions_per_90': totals['interceptions_per_90'],
         'match_statistics': match_statistics
     }), 200
 
 @bp.route('/<int:player_id>/performance', methods=['GET'])
 @jwt_required()
+@conditional('players:id:{player_id}', 'statistics:player_id:{player_id}')
+@query_budget(3)
 def get_player_performance(player_id):
     player = Player.query.get(player_id)
     
@@ -232,9 +237,18 @@ def get_player_performance(player_id):
         return jsonify({'error': 'Jogador não encontrado.'}), 404
     
     # Obter todas as estatísticas do jogador
-    statistics = Statistic.query.filter_by(player_id=player_id).all()
+    if use_columnar():
+        rows = store.rows(PERFORMANCE_FIELDS, player_id=player_id)
+    else:
+        statistics = Statistic.query.filter_by(player_id=player_id).all()
+        rows = {
+            field: [getattr(stat, field) for stat in statistics]
+            for field in PERFORMANCE_FIELDS
+        }
     
-    if not statistics:
+    total_matches = len(rows['goals'])
+    
+    if total_matches == 0:
         return jsonify({
             'player_id': player_id,
             'player_name': player.name,
@@ -246,42 +260,26 @@ def get_player_performance(player_id):
     
     # Calcular rating de performance (exemplo simplificado)
     # Na prática, usaríamos algoritmos mais complexos baseados em múltiplos fatores
-    performance_scores = []
-    form = []  # últimos 5 jogos
-    
-    for stat in statistics:
-        # Cálculo simplificado de pontuação por jogo
-        score = 0
-        
-        # Contribuições ofensivas
-        score += stat.goals * 3  # Gols valem mais
-        score += stat.assists * 2
-        score += stat.shots_on_target * 0.5
-        
-        # Contribuições defensivas
-        score += stat.tackles * 0.5
-        score += stat.interceptions * 0.5
-        
-        # Contribuições de posse
-        score += (stat.pass_accuracy / 100) * 5 if stat.pass_accuracy > 0 else 0
-        
-        # Normalizar pela quantidade de minutos jogados
-        if stat.minutes_played > 0:
-            score = score / (stat.minutes_played / 90)  # Normalizar para 90 minutos
-        
-        performance_scores.append(score)
-        form.append(score)
+    performance_scores = ratings.performance_scores(
+        rows['goals'],
+        rows['assists'],
+        rows['shots_on_target'],
+        rows['tackles'],
+        rows['interceptions'],
+        rows['pass_accuracy'],
+        rows['minutes_played']
+    )
+    form = performance_scores.tolist()  # últimos 5 jogos
     
     # Calcular média de performance
-    avg_performance = sum(performance_scores) / len(performance_scores) if performance_scores else 0
+    avg_performance = float(performance_scores.mean())
     
     # Identificar pontos fortes e fracos
     strengths = []
     weaknesses = []
     
     # Exemplo de lógica para identificar pontos fortes/fracos
-    total_goals = sum(stat.goals for stat in statistics)
-    total_matches = len(statistics)
+    total_goals = sum(rows['goals'])
     goals_per_match = total_goals / total_matches if total_matches > 0 else 0
     
     if goals_per_match > 0.5 and player.position in ['Forward', 'Striker', 'Winger']:
@@ -289,13 +287,13 @@ def get_player_performance(player_id):
     elif goals_per_match < 0.1 and player.position in ['Forward', 'Striker']:
         weaknesses.append('Finalização')
     
-    total_assists = sum(stat.assists for stat in statistics)
+    total_assists = sum(rows['assists'])
     assists_per_match = total_assists / total_matches if total_matches > 0 else 0
     
     if assists_per_match > 0.3:
         strengths.append('Criação de jogadas')
     
-    avg_pass_accuracy = sum(stat.pass_accuracy for stat in statistics) / len(statistics) if statistics else 0
+    avg_pass_accuracy = sum(rows['pass_accuracy']) / total_matches
     
     if avg_pass_accuracy > 85:
         strengths.append('Precisão de passes')
@@ -0,0 +1,307 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.models import Statistic, Match, Player
+from src.services import versions, player_rollup, live, ratings, team_match_stats
+from src.utils.pagination import paginate
+from src.utils.streaming import stream_format, stream_query
+from src.utils.query_budget import query_budget
+import time
+
+bp = Blueprint('statistic', __name__, url_prefix='/api/statistics')
+
+# Colunas numéricas aceites numa linha de estatísticas
+INT_FIELDS = [
+    'minutes_played', 'goals', 'assists', 'shots', 'shots_on_target', 'key_passes',
+    'dribbles_completed', 'tackles', 'interceptions', 'clearances', 'blocks',
+    'passes', 'passes_completed', 'yellow_cards', 'red_cards', 'fouls_committed',
+    'fouls_suffered', 'saves', 'goals_conceded'
+]
+FLOAT_FIELDS = ['expected_goals']
+
+# Valores aceites para clean_sheets (texto comparado em minúsculas)
+BOOLEAN_VALUES = {True: True, False: False, 'true': True, 'false': False, '1': True, '0': False}
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+@bp.route('/', methods=['GET'])
+@jwt_required()
+@query_budget(1)
+def get_statistics():
+    """
+    Endpoint para listar estatísticas de jogadores.
+    Filtros: season, competition, team_id (equipa no jogo), match_id e player_id.
+    Com ?format=ndjson|csv (ou Accept equivalente) a resposta é escrita em streaming.
+    """
+    season = request.args.get('season')
+    competition = request.args.get('competition')
+    team_id = request.args.get('team_id', type=int)
+    match_id = request.args.get('match_id', type=int)
+    player_id = request.args.get('player_id', type=int)
+    
+    query = Statistic.query
+    
+    if season or competition:
+        query = query.join(Match, Match.id == Statistic.match_id)
+        if season:
+            query = query.filter(Match.season == season)
+        if competition:
+            query = query.filter(Match.competition == competition)
+    if team_id:
+        query = query.filter(Statistic.team_id == team_id)
+    if match_id:
+        query = query.filter(Statistic.match_id == match_id)
+    if player_id:
+        query = query.filter(Statistic.player_id == player_id)
+    
+    fmt = stream_format()
+    if fmt:
+        rows = query.with_entities(*Statistic.__table__.columns).order_by(Statistic.id)
+        return stream_query(rows, fmt, 'statistics')
+    
+    try:
+        statistics, pagination = paginate(query, [Statistic.id])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'statistics': [stat.to_dict() for stat in statistics],
+        **pagination
+    }), 200
+
+@bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_statistics():
+    """
+    Endpoint para inserir estatísticas em lote.
+    Aceita {'statistics': [...]} com linhas completas, ou a ficha de um jogo
+    {'match_id': 1, 'home': [...], 'away': [...]} (ou 'players': [...]).
+    As linhas em 'home'/'away' ficam atribuídas à equipa desse lado; as
+    restantes ao team_id indicado ou, sem ele, à equipa atual do jogador.
+    A equipa tem de ser uma das duas do jogo.
+    As linhas são validadas em conjunto e escritas numa transação por lote.
+    """
+    data = request.get_json()
+    
+    if not data or not isinstance(data, dict):
+        return jsonify({'error': 'Dados incompletos. É necessária uma lista de estatísticas.'}), 400
+    
+    groups = [(data.get('statistics') or [], {}, None)]
+    
+    # Ficha de jogo: as linhas herdam o match_id do topo e o lado do grupo
+    if data.get('match_id'):
+        groups += [
+            (data.get(group) or [], {'match_id': data['match_id']}, side)
+            for group, side in (('players', None), ('home', 'home'), ('away', 'away'))
+        ]
+    
+    lines = []
+    for group, defaults, side in groups:
+        if not isinstance(group, list) or not all(isinstance(line, dict) for line in group):
+            return jsonify({'error': 'As estatísticas devem ser uma lista de objetos.'}), 400
+        lines.extend({**defaults, **line, '_side': side} for line in group)
+    
+    if not lines:
+        return jsonify({'error': 'Dados incompletos. É necessária uma lista de estatísticas.'}), 400
+    
+    if 'batch_size' in request.args:
+        batch_size = request.args.get('batch_size', type=int)
+    else:
+        batch_size = data.get('batch_size', DEFAULT_BATCH_SIZE)
+    if not isinstance(batch_size, int) or isinstance(batch_size, bool):
+        return jsonify({'error': 'batch_size deve ser um número inteiro.'}), 400
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    
+    frame, errors = validate_statistics(lines)
+    
+    if errors:
+        return jsonify({
+            'error': 'Estatísticas inválidas.',
+            'invalid_rows': len(errors),
+            'errors': errors[:MAX_REPORTED_ERRORS]
+        }), 400
+    
+    records = frame.to_dict('records')
+    batches = []
+    started = time.perf_counter()
+    
+    from src.main import db
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        batch_started = time.perf_counter()
+        
+        try:
+            db.session.execute(Statistic.__table__.insert(), batch)
+            player_rollup.apply_rows(batch)
+            team_match_stats.refresh_matches({record['match_id'] for record in batch})
+            ratings.refresh_players({record['player_id'] for record in batch})
+            versions.bump('statistics', *versions.row_scopes('statistics', batch))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({
+                'error': f'Erro ao inserir estatísticas: {str(e)}',
+                'inserted': start,
+                'batches': batches
+            }), 500
+        
+        batches.append({
+            'batch': len(batches) + 1,
+            'rows': len(batch),
+            'seconds': round(time.perf_counter() - batch_started, 4)
+        })
+    
+    total_seconds = time.perf_counter() - started
+    
+    # Jogos seguidos em direto recebem os novos totais
+    live.hub.notify(*{record['match_id'] for record in records})
+    
+    return jsonify({
+        'message': 'Estatísticas inseridas com sucesso!',
+        'inserted': len(records),
+        'batch_size': batch_size,
+        'batches': batches,
+        'total_seconds': round(total_seconds, 4),
+        'rows_per_second': round(len(records) / total_seconds, 1) if total_seconds > 0 else None
+    }), 201
+
+# Funções auxiliares
+
+def validate_statistics(lines):
+    """
+    Valida as linhas de estatísticas de forma vetorizada.
+    Devolve o DataFrame normalizado (com pass_accuracy e conversion_rate
+    derivados) e a lista de erros por linha.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    frame = pd.DataFrame(lines)
+    errors = pd.Series('', index=frame.index)
+    
+    def flag(mask, message):
+        mask = mask & (errors == '')
+        errors[mask] = message
+    
+    # Chaves obrigatórias
+    for field in ('match_id', 'player_id'):
+        if field not in frame:
+            frame[field] = np.nan
+        raw = frame[field]
+        frame[field] = pd.to_numeric(raw, errors='coerce')
+        flag(frame[field].isna() | is_boolean(raw) | (frame[field] % 1 != 0), f'{field} em falta ou inválido.')
+    
+    # team_id é opcional (ver resolução da equipa abaixo)
+    raw = frame['team_id'] if 'team_id' in frame else pd.Series(np.nan, index=frame.index)
+    team_ids = pd.to_numeric(raw, errors='coerce')
+    flag((team_ids.isna() & raw.notna()) | is_boolean(raw) | (team_ids % 1 > 0), 'team_id inválido.')
+    
+    # Colunas numéricas: ausentes passam a zero; não numéricas, booleanas,
+    # negativas ou, nas contagens, com parte decimal são erro (nada é truncado)
+    for field in INT_FIELDS + FLOAT_FIELDS:
+        if field not in frame:
+            frame[field] = 0
+        raw = frame[field]
+        values = pd.to_numeric(raw, errors='coerce')
+        flag((values.isna() & raw.notna()) | is_boolean(raw), f'{field} deve ser numérico.')
+        flag(values < 0, f'{field} não pode ser negativo.')
+        if field in INT_FIELDS:
+            flag(values.notna() & (values % 1 != 0), f'{field} deve ser um número inteiro.')
+        frame[field] = values.fillna(0)
+    
+    flag(frame['passes_completed'] > frame['passes'], 'passes_completed não pode exceder passes.')
+    flag(frame['shots_on_target'] > frame['shots'], 'shots_on_target não pode exceder shots.')
+    flag(frame['minutes_played'] > 130, 'minutes_played acima do limite de um jogo.')
+    
+    # clean_sheets: booleano JSON ou texto true/false/1/0; ausente é False
+    if 'clean_sheets' not in frame:
+        frame['clean_sheets'] = False
+    clean_sheets = frame['clean_sheets'].map(parse_boolean)
+    flag(clean_sheets.isna(), 'clean_sheets deve ser verdadeiro ou falso.')
+    frame['clean_sheets'] = clean_sheets.fillna(False).astype(bool)
+    
+    # Linhas repetidas no próprio pedido
+    keys = frame[['match_id', 'player_id']]
+    flag(keys.duplicated(keep='first') & keys.notna().all(axis=1), 'Linha repetida para o mesmo jogo e jogador.')
+    
+    # Chaves estrangeiras e duplicados já existentes, com uma consulta por tabela
+    valid = errors == ''
+    match_ids = frame.loc[valid, 'match_id'].astype(int).unique().tolist()
+    player_ids = frame.loc[valid, 'player_id'].astype(int).unique().tolist()
+    
+    from src.main import db
+    match_teams = {
+        row.id: (row.home_team_id, row.away_team_id)
+        for row in db.session.query(Match.id, Match.home_team_id, Match.away_team_id).filter(Match.id.in_(match_ids))
+    }
+    player_teams = dict(db.session.query(Player.id, Player.team_id).filter(Player.id.in_(player_ids)))
+    existing = set(
+        db.session.query(Statistic.match_id, Statistic.player_id)
+        .filter(Statistic.match_id.in_(match_ids))
+        .all()
+    )
+    
+    flag(valid & ~frame['match_id'].isin(list(match_teams)), 'Jogo não encontrado.')
+    flag(valid & ~frame['player_id'].isin(list(player_teams)), 'Jogador não encontrado.')
+    
+    # Equipa de cada linha: o lado da ficha (home/away), o team_id indicado ou
+    # a equipa atual do jogador; tem de ser uma das equipas do jogo
+    side = frame['_side'] if '_side' in frame else pd.Series(None, index=frame.index, dtype=object)
+    home = frame['match_id'].map({match_id: teams[0] for match_id, teams in match_teams.items()})
+    away = frame['match_id'].map({match_id: teams[1] for match_id, teams in match_teams.items()})
+    team = team_ids.fillna(frame['player_id'].map(player_teams))
+    team = team.where(side != 'home', home).where(side != 'away', away)
+    flag(valid & side.notna() & team_ids.notna() & (team_ids != team), 'team_id não corresponde ao lado (home/away) da linha.')
+    flag(valid & (team != home) & (team != away), 'A equipa não participa neste jogo.')
+    frame['team_id'] = team
+    if existing:
+        pairs = pd.MultiIndex.from_frame(keys.fillna(0)).isin(list(existing))
+        flag(valid & pairs, 'Já existem estatísticas deste jogador neste jogo.')
+    
+    invalid = errors[errors != '']
+    error_list = [{'index': int(index), 'error': message} for index, message in invalid.items()]
+    
+    if error_list:
+        return frame, error_list
+    
+    # Normalizar tipos e derivar percentagens
+    for field in ['match_id', 'player_id'] + INT_FIELDS:
+        frame[field] = frame[field].astype(int)
+    for field in FLOAT_FIELDS:
+        frame[field] = frame[field].astype(float)
+    
+    passes = frame['passes'].to_numpy()
+    shots = frame['shots'].to_numpy()
+    passes_completed = frame['passes_completed'].to_numpy() * 100.0
+    goals = frame['goals'].to_numpy() * 100.0
+    frame['pass_accuracy'] = np.round(
+        np.divide(passes_completed, passes, out=np.zeros(len(frame)), where=passes > 0), 1
+    )
+    frame['conversion_rate'] = np.round(
+        np.divide(goals, shots, out=np.zeros(len(frame)), where=shots > 0), 1
+    )
+    
+    frame['team_id'] = frame['team_id'].astype(int)
+    
+    columns = ['match_id', 'player_id', 'team_id'] + INT_FIELDS + FLOAT_FIELDS + ['clean_sheets', 'pass_accuracy', 'conversion_rate']
+    return frame[columns], []
+
+def is_boolean(series):
+    """Máscara dos valores booleanos, que o pandas converteria em 0/1."""
+    return series.map(lambda value: isinstance(value, bool))
+
+def parse_boolean(value):
+    """Converte clean_sheets num booleano; devolve None se o valor não for aceite."""
+    import pandas as pd
+    
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return False
+    if isinstance(value, str):
+        value = value.strip().lower()
+    elif not isinstance(value, bool) and value in (0, 1):
+        value = bool(value)
+    try:
+        return BOOLEAN_VALUES.get(value)
+    except TypeError:
+        return None
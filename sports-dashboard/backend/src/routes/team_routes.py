@@ -1,20 +1,32 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models import Team
-import pandas as pd
+from src.services import standings
+from src.utils.pagination import paginate
+from src.utils.conditional import conditional
+from src.utils.query_budget import query_budget
 
 bp = Blueprint('team', __name__, url_prefix='/api/teams')
 
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional('teams')
+@query_budget(2)
 def get_teams():
-    teams = Team.query.all()
+    try:
+        teams, pagination = paginate(Team.query, [Team.id])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     return jsonify({
-        'teams': [team.to_dict() for team in teams]
+        'teams': [team.to_dict() for team in teams],
+        **pagination
     }), 200
 
 @bp.route('/<int:team_id>', methods=['GET'])
 @jwt_required()
+@conditional('teams:id:{team_id}')
+@query_budget(2)
 def get_team(team_id):
     team = Team.query.get(team_id)
     
@@ -71,8 +83,9 @@ def update_team(team_id):
         team.name = data['name']
     if data.get('country'):
         team.country = data['country']
-    if data.get('league'):
+    if data.get('league') and data['league'] != team.league:
         team.league = data['league']
+        standings.move_team_league(team.id, team.league)
     if 'founded_year' in data:
         team.founded_year = data['founded_year']
     if 'logo_url' in data:
@@ -110,6 +123,8 @@ def delete_team(team_id):
 
 @bp.route('/<int:team_id>/players', methods=['GET'])
 @jwt_required()
+@conditional('teams:id:{team_id}', 'players:team_id:{team_id}')
+@query_budget(3)
 def get_team_players(team_id):
     team = Team.query.get(team_id)
     
@@ -122,6 +137,8 @@ def get_team_players(team_id):
 
 @bp.route('/<int:team_id>/matches', methods=['GET'])
 @jwt_required()
+@conditional('teams:id:{team_id}', 'matches:home_team_id:{team_id}', 'matches:away_team_id:{team_id}')
+@query_budget(4)
 def get_team_matches(team_id):
     team = Team.query.get(team_id)
     
@@ -140,6 +157,8 @@ def get_team_matches(team_id):
 
 @bp.route('/<int:team_id>/statistics', methods=['GET'])
 @jwt_required()
+@conditional('teams:id:{team_id}', 'matches:home_team_id:{team_id}', 'matches:away_team_id:{team_id}')
+@query_budget(4)
 def get_team_statistics(team_id):
     team = Team.query.get(team_id)
     
@@ -179,7 +198,7 @@ def get_team_statistics(team_id):
     for match in all_matches:
         if match.status != 'completed':
             continue
-            
+        
         if match.home_team_id == team_id:
             goals_scored += match.home_score
             goals_conceded += match.away_score
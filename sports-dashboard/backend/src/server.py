@@ -0,0 +1,72 @@
+"""
+Servidor de produção (gunicorn) com vários processos e threads.
+
+Uso, a partir de sports-dashboard/backend:
+
+    python -m src.server
+
+Configuração por variáveis de ambiente:
+    BIND / PORT           endereço de escuta (por omissão 0.0.0.0:5000)
+    WEB_CONCURRENCY       número de processos (por omissão 2 x CPUs + 1, no máximo 8)
+    GUNICORN_THREADS      threads por processo (por omissão 4; >1 usa workers gthread)
+    GUNICORN_WORKER_CLASS tipo de worker (ex.: gevent para muitas ligações SSE)
+    GUNICORN_TIMEOUT      segundos até um pedido bloqueado reiniciar o worker
+    GUNICORN_MAX_REQUESTS reciclar cada worker após N pedidos (0 desativa)
+    DB_POOL_SIZE, SQLITE_* ver src.config
+
+Cada worker cria a sua aplicação (e o seu pool de ligações) depois do fork.
+Equivale a `gunicorn "src.main:create_app()"` com as mesmas opções.
+"""
+import multiprocessing
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gunicorn.app.base import BaseApplication
+from src.config import env_int
+
+def server_options():
+    """Opções do gunicorn a partir do ambiente."""
+    workers = env_int('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8))
+    threads = env_int('GUNICORN_THREADS', 4)
+    
+    return {
+        'bind': os.environ.get('BIND') or f"0.0.0.0:{os.environ.get('PORT', '5000')}",
+        'workers': max(1, workers),
+        'threads': max(1, threads),
+        # Para milhares de ligações SSE por worker: GUNICORN_WORKER_CLASS=gevent
+        'worker_class': os.environ.get('GUNICORN_WORKER_CLASS') or ('gthread' if threads > 1 else 'sync'),
+        'timeout': env_int('GUNICORN_TIMEOUT', 30),
+        'graceful_timeout': env_int('GUNICORN_GRACEFUL_TIMEOUT', 30),
+        'keepalive': env_int('GUNICORN_KEEPALIVE', 5),
+        'max_requests': env_int('GUNICORN_MAX_REQUESTS', 0),
+        'max_requests_jitter': env_int('GUNICORN_MAX_REQUESTS_JITTER', 0),
+        'accesslog': os.environ.get('GUNICORN_ACCESS_LOG', '-'),
+        'errorlog': os.environ.get('GUNICORN_ERROR_LOG', '-'),
+        'loglevel': os.environ.get('GUNICORN_LOG_LEVEL', 'info'),
+        # Sem preload: os workers não partilham ligações abertas antes do fork
+        'preload_app': False
+    }
+
+class ProductionServer(BaseApplication):
+    """Aplicação gunicorn que constrói a app Flask com create_app em cada worker."""
+    
+    def __init__(self, config=None, options=None):
+        self.config_overrides = config
+        self.options = options or server_options()
+        super().__init__()
+    
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+    
+    def load(self):
+        from src.main import create_app
+        return create_app(self.config_overrides)
+
+def main():
+    ProductionServer().run()
+
+if __name__ == '__main__':
+    main()
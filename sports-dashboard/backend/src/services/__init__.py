@@ -0,0 +1 @@
+# Serviços de dados e análise partilhados pelas rotas
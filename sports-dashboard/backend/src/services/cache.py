@@ -0,0 +1,87 @@
+from collections import OrderedDict
+import threading
+
+class VersionedCache:
+    """
+    Cache LRU em memória cujas entradas são válidas apenas para a versão
+    dos dados com que foram calculadas. Uma escrita que incremente a versão
+    torna as entradas antigas inacessíveis, que acabam por ser expulsas.
+    
+    Com maxbytes, a soma de len(valor) das entradas também é limitada
+    (valores em bytes, ex.: imagens); valores maiores que o limite não
+    ficam guardados.
+    """
+    
+    def __init__(self, name, maxsize=128, maxbytes=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key, version, compute):
+        entry_key = (key, version)
+        
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return self._entries[entry_key]
+            self.misses += 1
+        
+        value = compute()
+        
+        if self.maxbytes is not None and len(value) > self.maxbytes:
+            return value
+        
+        with self._lock:
+            if entry_key in self._entries:
+                self._bytes -= self._size(self._entries[entry_key])
+            self._entries[entry_key] = value
+            self._entries.move_to_end(entry_key)
+            self._bytes += self._size(value)
+            while len(self._entries) > self.maxsize or (self.maxbytes is not None and self._bytes > self.maxbytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._size(evicted)
+        
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def _size(self, value):
+        return len(value) if self.maxbytes is not None else 0
+    
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / requests) if requests > 0 else 0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                **({'bytes': self._bytes, 'maxbytes': self.maxbytes} if self.maxbytes is not None else {})
+            }
+
+# Registo de caches por nome, para exposição de métricas
+_caches = {}
+
+def get_cache(name, maxsize=128, maxbytes=None):
+    """Obtém (ou cria) a cache com o nome indicado."""
+    if name not in _caches:
+        _caches[name] = VersionedCache(name, maxsize=maxsize, maxbytes=maxbytes)
+    return _caches[name]
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+def clear_caches():
+    """Esvazia todas as caches (ex.: ao trocar de base de dados nos testes)."""
+    for cache in _caches.values():
+        cache.clear()
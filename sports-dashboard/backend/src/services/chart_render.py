@@ -0,0 +1,96 @@
+"""
+Desenho dos gráficos com o backend não interativo do matplotlib (Agg).
+
+Este módulo não depende da aplicação nem da base de dados: recebe dados
+simples (listas e dicionários) e devolve os bytes da imagem, para poder
+correr nos processos de renderização (ver src.services.charts).
+"""
+import io
+
+FIGURE_SIZE = (8, 4.5)
+DPI = 100
+COLORS = ('#1f77b4', '#d62728', '#2ca02c', '#ff7f0e', '#9467bd', '#8c564b')
+
+def warm_up():
+    """Inicialização de cada processo: carrega o matplotlib uma única vez."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure  # noqa: F401
+
+def render_chart(kind, data, fmt):
+    """Desenha um gráfico ('performance-trend', 'comparison-radar' ou 'league-table') em PNG ou SVG."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    
+    # Figure sem pyplot: sem estado global, seguro em várias threads
+    figure = Figure(figsize=FIGURE_SIZE, dpi=DPI)
+    RENDERERS[kind](figure, data)
+    figure.tight_layout()
+    
+    buffer = io.BytesIO()
+    # Sem metadados variáveis (data, versão) para imagens reproduzíveis
+    metadata = {'Date': None} if fmt == 'svg' else {'Software': None}
+    with matplotlib.rc_context({'svg.hashsalt': 'sports-dashboard'}):
+        figure.savefig(buffer, format=fmt, metadata=metadata)
+    return buffer.getvalue()
+
+def _performance_trend(figure, data):
+    axes = figure.add_subplot()
+    positions = range(len(data['labels']))
+    
+    for color, (name, values) in zip(COLORS, data['series'].items()):
+        axes.plot(positions, values, marker='o', color=color, label=name)
+    
+    axes.set_title(data['title'])
+    axes.set_xticks(list(positions))
+    axes.set_xticklabels(data['labels'], rotation=45, ha='right', fontsize=8)
+    axes.grid(alpha=0.3)
+    if data['series']:
+        axes.legend(fontsize=8)
+
+def _comparison_radar(figure, data):
+    import numpy as np
+    
+    metrics = data['metrics']
+    values = np.array(list(data['entities'].values()), dtype=np.float64).reshape(-1, len(metrics))
+    
+    # Cada eixo é normalizado pelo maior valor entre as entidades comparadas
+    scale = values.max(axis=0) if len(values) else np.ones(len(metrics))
+    scale[scale <= 0] = 1.0
+    normalized = values / scale
+    
+    angles = np.linspace(0, 2 * np.pi, len(metrics), endpoint=False).tolist()
+    axes = figure.add_subplot(projection='polar')
+    
+    for color, name, row in zip(COLORS, data['entities'], normalized):
+        closed = row.tolist() + row[:1].tolist()
+        axes.plot(angles + angles[:1], closed, color=color, label=name)
+        axes.fill(angles + angles[:1], closed, color=color, alpha=0.15)
+    
+    axes.set_title(data['title'])
+    axes.set_xticks(angles)
+    axes.set_xticklabels(metrics, fontsize=8)
+    axes.set_yticklabels([])
+    axes.set_ylim(0, 1)
+    axes.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1), fontsize=8)
+
+def _league_table(figure, data):
+    axes = figure.add_subplot()
+    positions = range(len(data['teams']))
+    
+    axes.barh(list(positions), data['points'], color=COLORS[0])
+    axes.set_yticks(list(positions))
+    axes.set_yticklabels(data['teams'], fontsize=8)
+    axes.invert_yaxis()
+    axes.set_xlabel('Pontos')
+    axes.set_title(data['title'])
+    
+    for position, points in zip(positions, data['points']):
+        axes.text(points, position, f' {points}', va='center', fontsize=8)
+
+RENDERERS = {
+    'performance-trend': _performance_trend,
+    'comparison-radar': _comparison_radar,
+    'league-table': _league_table
+}
@@ -0,0 +1,127 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from src.services import versions
+from src.services.cache import get_cache
+from src.services.chart_render import render_chart, warm_up
+
+# Formatos suportados e respetivo tipo MIME
+FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml'
+}
+
+class ChartBusy(Exception):
+    """Todos os processos de renderização e lugares em espera estão ocupados (ou o pool foi reiniciado)."""
+
+class ChartTimeout(Exception):
+    """A renderização excedeu CHART_TIMEOUT_SECONDS."""
+
+class ChartRenderer:
+    """
+    Renderização de gráficos num pool limitado de processos, uma instância
+    por worker.
+    
+    O desenho (CPU e GIL) corre fora das threads de pedidos, em
+    CHART_WORKERS processos criados com 'spawn' (não herdam ligações à base
+    de dados nem threads do worker). No máximo CHART_WORKERS +
+    CHART_QUEUE_SIZE gráficos ficam pendentes; acima disso o pedido é
+    recusado de imediato (ChartBusy). As imagens ficam numa cache LRU
+    limitada em bytes, com chave (tipo, parâmetros, formato) e a versão
+    dos dados; os dados só são lidos quando a imagem não está em cache.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self.rendered = 0
+        self.rejected = 0
+        self.timeouts = 0
+    
+    def render(self, kind, params, scopes, load, fmt='png'):
+        """
+        Devolve os bytes do gráfico. `load` é chamado apenas em caso de
+        falha na cache e devolve os dados a desenhar (ver chart_render).
+        """
+        config = current_app.config
+        cache = get_cache('charts', maxsize=256, maxbytes=config['CHART_CACHE_BYTES'])
+        key = (kind, tuple(sorted(params.items())), fmt)
+        
+        return cache.get_or_compute(
+            key,
+            versions.get_versions(*scopes),
+            lambda: self._render(kind, load(), fmt)
+        )
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': current_app.config['CHART_WORKERS'],
+                'rendered': self.rendered,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts
+            }
+    
+    def _render(self, kind, data, fmt):
+        config = current_app.config
+        
+        if config['CHART_WORKERS'] <= 0:
+            image = render_chart(kind, data, fmt)
+        else:
+            executor, slots = self._start()
+            if not slots.acquire(blocking=False):
+                with self._lock:
+                    self.rejected += 1
+                raise ChartBusy()
+            
+            future = executor.submit(render_chart, kind, data, fmt)
+            # O lugar só é libertado quando o processo termina o gráfico
+            future.add_done_callback(lambda _: slots.release())
+            
+            try:
+                image = future.result(timeout=config['CHART_TIMEOUT_SECONDS'])
+            except FutureTimeoutError:
+                future.cancel()
+                with self._lock:
+                    self.timeouts += 1
+                raise ChartTimeout()
+            except BrokenProcessPool:
+                # Um processo morreu (ex.: memória): o pool é recriado no pedido seguinte
+                self._reset(executor)
+                raise ChartBusy()
+        
+        with self._lock:
+            self.rendered += 1
+        return image
+    
+    def _start(self):
+        if self._executor is not None:
+            return self._executor, self._slots
+        
+        with self._lock:
+            if self._executor is None:
+                config = current_app.config
+                workers = config['CHART_WORKERS']
+                self._slots = threading.BoundedSemaphore(workers + config['CHART_QUEUE_SIZE'])
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=warm_up
+                )
+                atexit.register(self._executor.shutdown, wait=False, cancel_futures=True)
+        
+        return self._executor, self._slots
+    
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self._slots = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# Instância partilhada por worker
+renderer = ChartRenderer()
@@ -0,0 +1,284 @@
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from urllib.parse import quote
+from flask import current_app
+from src.main import db
+from src.models import Match, Statistic
+
+# Tabelas exportáveis; as estatísticas herdam a temporada e a competição do jogo
+TABLES = {
+    'matches': Match,
+    'statistics': Statistic
+}
+PARTITION_COLUMNS = ('season', 'competition')
+FORMATS = {
+    'ipc': '.arrow',
+    'parquet': '.parquet'
+}
+
+DEFAULT_CHUNK_SIZE = 10000
+# Linhas mais recentes que isto ficam para a execução seguinte (transações
+# ainda por confirmar com created_at anterior ao início da exportação)
+SETTLE_SECONDS = 5
+MANIFEST = '_manifest.json'
+# Valor de partição nulo, o mesmo que o pyarrow usa por omissão
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+def require_pyarrow():
+    """Importa o pyarrow (dependência opcional) ou falha com uma mensagem clara."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError('A exportação colunar requer o pacote pyarrow (pip install pyarrow).')
+    return pyarrow
+
+def export_root():
+    """Diretório das exportações (EXPORT_DIR ou instance/exports)."""
+    return current_app.config.get('EXPORT_DIR') or os.path.join(current_app.instance_path, 'exports')
+
+def arrow_schema(columns):
+    """Esquema Arrow a partir das colunas SQLAlchemy (tipos preservados)."""
+    pa = require_pyarrow()
+    
+    def arrow_type(column):
+        python_type = column.type.python_type
+        if python_type is bool:
+            return pa.bool_()
+        if python_type is int:
+            return pa.int64()
+        if python_type is float:
+            return pa.float64()
+        if python_type is datetime:
+            return pa.timestamp('us')
+        return pa.string()
+    
+    return pa.schema([pa.field(column.name, arrow_type(column), nullable=column.nullable) for column in columns])
+
+def export_tables(tables=None, fmt='ipc', full=False, chunk_size=DEFAULT_CHUNK_SIZE, root=None):
+    """
+    Exporta as tabelas para ficheiros colunares particionados por temporada
+    e competição (<tabela>/season=.../competition=.../part-<execução>.arrow).
+    
+    As linhas são lidas em blocos de chunk_size e escritas como record
+    batches, com um único ficheiro aberto de cada vez, pelo que a memória
+    não depende do tamanho da tabela. Por omissão a exportação é
+    incremental: só entram linhas com created_at posterior à marca da
+    execução anterior, guardada no manifesto; full=True apaga a exportação
+    da tabela e recomeça. Devolve um resumo por tabela.
+    """
+    require_pyarrow()
+    if fmt not in FORMATS:
+        raise ValueError(f'Formato inválido. Use {", ".join(FORMATS)}.')
+    
+    root = root or export_root()
+    os.makedirs(root, exist_ok=True)
+    manifest = read_manifest(root)
+    cutoff = datetime.utcnow() - timedelta(seconds=SETTLE_SECONDS)
+    
+    summary = {}
+    for table in tables or list(TABLES):
+        if table not in TABLES:
+            raise ValueError(f'Tabela desconhecida: {table}.')
+        
+        state = manifest.get(table, {})
+        if full or state.get('format', fmt) != fmt:
+            _clear(os.path.join(root, table))
+            state = {}
+        
+        watermark = datetime.fromisoformat(state['watermark']) if state.get('watermark') else None
+        run = state.get('runs', 0) + 1
+        
+        started = time.perf_counter()
+        rows, files = _export_table(table, root, fmt, run, watermark, cutoff, chunk_size)
+        
+        manifest[table] = {
+            'format': fmt,
+            'watermark': cutoff.isoformat(),
+            'runs': run,
+            'rows': state.get('rows', 0) + rows,
+            'files': state.get('files', 0) + len(files),
+            'exported_at': datetime.utcnow().isoformat()
+        }
+        # O manifesto só avança depois de todos os ficheiros da tabela escritos
+        write_manifest(root, manifest)
+        
+        summary[table] = {
+            'rows': rows,
+            'files': len(files),
+            'since': watermark.isoformat() if watermark else None,
+            'until': cutoff.isoformat(),
+            'seconds': round(time.perf_counter() - started, 4)
+        }
+    
+    return summary
+
+def open_dataset(table, root=None):
+    """
+    Conjunto de dados (pyarrow.dataset) de uma tabela exportada, com as
+    partições season e competition. Os ficheiros Arrow IPC são lidos por
+    memory-map, sem cópia para a memória do processo.
+    """
+    pa = require_pyarrow()
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+    
+    root = root or export_root()
+    manifest = read_manifest(root)
+    if table not in manifest:
+        raise LookupError(f'A tabela {table} ainda não foi exportada.')
+    
+    fmt = manifest[table]['format']
+    return ds.dataset(
+        os.path.join(root, table),
+        format='ipc' if fmt == 'ipc' else 'parquet',
+        partitioning=ds.partitioning(
+            pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]),
+            flavor='hive'
+        ),
+        filesystem=fs.LocalFileSystem(use_mmap=True)
+    )
+
+def read_table(table, columns=None, season=None, competition=None, root=None):
+    """
+    Lê uma tabela exportada (pyarrow.Table), só com as colunas pedidas e
+    apenas das partições da temporada e competição indicadas.
+    """
+    import pyarrow.dataset as ds
+    
+    dataset = open_dataset(table, root)
+    condition = None
+    for column, value in (('season', season), ('competition', competition)):
+        if value is not None:
+            expression = ds.field(column) == value
+            condition = expression if condition is None else condition & expression
+    
+    return dataset.to_table(columns=columns, filter=condition)
+
+def read_manifest(root):
+    path = os.path.join(root, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as manifest_file:
+        return json.load(manifest_file)
+
+def write_manifest(root, manifest):
+    path = os.path.join(root, MANIFEST)
+    with open(path + '.tmp', 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def _export_table(table, root, fmt, run, watermark, cutoff, chunk_size):
+    model = TABLES[table]
+    columns = [column for column in model.__table__.columns if column.name not in PARTITION_COLUMNS]
+    schema = arrow_schema(columns)
+    
+    # Ordenadas por partição: cada ficheiro é escrito de seguida e fechado
+    query = db.session.query(*columns, Match.season, Match.competition)
+    if model is not Match:
+        query = query.join(Match, Match.id == model.match_id)
+    query = query.filter(model.created_at <= cutoff)
+    if watermark is not None:
+        query = query.filter(model.created_at > watermark)
+    query = query.order_by(Match.season, Match.competition, model.id)
+    
+    writer = _PartitionWriter(os.path.join(root, table), schema, fmt, run)
+    chunk = []
+    partition = None
+    rows = 0
+    
+    try:
+        for row in query.yield_per(chunk_size):
+            key = tuple(row[-2:])
+            if key != partition or len(chunk) >= chunk_size:
+                writer.write(partition, chunk)
+                chunk = []
+                partition = key
+            chunk.append(row[:-2])
+            rows += 1
+        
+        writer.write(partition, chunk)
+        writer.close()
+    except Exception:
+        # Sem ficheiros parciais: a execução seguinte repete as mesmas linhas
+        writer.abort()
+        raise
+    
+    return rows, writer.files
+
+def _clear(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+def _partition_dir(key):
+    return os.path.join(*[
+        f'{column}={quote(str(value), safe="") if value is not None else NULL_PARTITION}'
+        for column, value in zip(PARTITION_COLUMNS, key)
+    ])
+
+class _PartitionWriter:
+    """Escreve blocos de linhas no ficheiro da partição corrente (um aberto de cada vez)."""
+    
+    def __init__(self, path, schema, fmt, run):
+        self.path = path
+        self.schema = schema
+        self.fmt = fmt
+        self.run = run
+        self.files = []
+        self._key = None
+        self._writer = None
+        self._temp = None
+    
+    def write(self, key, rows):
+        if not rows:
+            return
+        
+        import pyarrow as pa
+        
+        if key != self._key:
+            self._finish()
+            self._open(key)
+        
+        arrays = [
+            pa.array([row[i] for row in rows], type=field.type)
+            for i, field in enumerate(self.schema)
+        ]
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+    
+    def close(self):
+        self._finish()
+    
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            os.remove(self._temp)
+        for path in self.files:
+            os.remove(path)
+        self.files = []
+        self._writer = None
+    
+    def _open(self, key):
+        import pyarrow as pa
+        
+        directory = os.path.join(self.path, _partition_dir(key))
+        os.makedirs(directory, exist_ok=True)
+        self._key = key
+        self._temp = os.path.join(directory, f'.part-{self.run:05d}{FORMATS[self.fmt]}.tmp')
+        
+        if self.fmt == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self._temp, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(self._temp, self.schema)
+    
+    def _finish(self):
+        if self._writer is None:
+            return
+        
+        self._writer.close()
+        final = self._temp[:-len('.tmp')].replace('.part-', 'part-')
+        os.replace(self._temp, final)
+        self.files.append(final)
+        self._writer = None
+        self._key = None
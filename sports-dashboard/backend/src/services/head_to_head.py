@@ -0,0 +1,126 @@
+import json
+from src.main import db
+from src.models import Match, HeadToHead
+from src.services import versions
+
+# Número de resultados recentes guardados em cada par
+RECENT_RESULTS = 5
+
+def pair_key(team_a, team_b):
+    """Chave do par sem orientação: (menor id, maior id)."""
+    return (min(team_a, team_b), max(team_a, team_b))
+
+def pairs_of(*matches):
+    """Pares afetados por jogos ou snapshots (com home_team_id/away_team_id)."""
+    return {
+        pair_key(match.home_team_id, match.away_team_id)
+        for match in matches
+        if match is not None and match.home_team_id != match.away_team_id
+    }
+
+def pair_matches(team_a, team_b):
+    """Consulta dos jogos entre duas equipas, nas duas orientações."""
+    return Match.query.filter(
+        ((Match.home_team_id == team_a) & (Match.away_team_id == team_b)) |
+        ((Match.home_team_id == team_b) & (Match.away_team_id == team_a))
+    )
+
+def recompute_pairs(pairs):
+    """
+    Recalcula o resumo dos pares indicados a partir dos seus jogos
+    concluídos (poucos por par). Não faz commit: a alteração entra na
+    transação de quem escreve o jogo.
+    """
+    for low, high in pairs:
+        rows = (
+            pair_matches(low, high)
+            .with_entities(Match.id, Match.date, Match.home_team_id, Match.away_team_id, Match.home_score, Match.away_score)
+            .filter(Match.status == 'completed')
+            .order_by(Match.date.desc(), Match.id.desc())
+            .all()
+        )
+        summary = HeadToHead.query.filter_by(team_low_id=low, team_high_id=high).first()
+        
+        if not rows:
+            if summary:
+                db.session.delete(summary)
+            continue
+        
+        if not summary:
+            summary = HeadToHead(team_low_id=low, team_high_id=high)
+            db.session.add(summary)
+        
+        for field, value in _summarize(low, rows).items():
+            setattr(summary, field, value)
+
+def rebuild_head_to_head(team_ids=None):
+    """
+    Reconstrói os resumos a partir dos jogos concluídos.
+    Usado pelo comando de administração. Com team_ids (ex.: depois de uma
+    importação) apenas os pares entre essas equipas são reconstruídos.
+    Devolve o número de pares.
+    """
+    matches = (
+        db.session.query(Match.id, Match.date, Match.home_team_id, Match.away_team_id, Match.home_score, Match.away_score)
+        .filter(Match.status == 'completed', Match.home_team_id != Match.away_team_id)
+    )
+    stale = HeadToHead.query
+    
+    if team_ids is not None:
+        team_ids = list(set(team_ids))
+        matches = matches.filter(Match.home_team_id.in_(team_ids), Match.away_team_id.in_(team_ids))
+        stale = stale.filter(HeadToHead.team_low_id.in_(team_ids), HeadToHead.team_high_id.in_(team_ids))
+    
+    grouped = {}
+    for row in matches.order_by(Match.date.desc(), Match.id.desc()).yield_per(1000):
+        grouped.setdefault(pair_key(row.home_team_id, row.away_team_id), []).append(row)
+    
+    rows = [
+        {'team_low_id': low, 'team_high_id': high, **_summarize(low, pair_rows)}
+        for (low, high), pair_rows in grouped.items()
+    ]
+    
+    try:
+        stale.delete(synchronize_session=False)
+        if rows:
+            db.session.execute(HeadToHead.__table__.insert(), rows)
+        versions.rebuilt('matches', full=team_ids is None)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return len(rows)
+
+def _summarize(low, rows):
+    # rows: jogos concluídos do par, do mais recente para o mais antigo
+    summary = dict.fromkeys(('played', 'low_wins', 'high_wins', 'draws', 'low_goals', 'high_goals'), 0)
+    
+    for row in rows:
+        home_score = row.home_score or 0
+        away_score = row.away_score or 0
+        low_goals, high_goals = (home_score, away_score) if row.home_team_id == low else (away_score, home_score)
+        
+        summary['played'] += 1
+        summary['low_goals'] += low_goals
+        summary['high_goals'] += high_goals
+        if low_goals > high_goals:
+            summary['low_wins'] += 1
+        elif low_goals < high_goals:
+            summary['high_wins'] += 1
+        else:
+            summary['draws'] += 1
+    
+    summary['last_results'] = json.dumps([
+        {
+            'match_id': row.id,
+            'date': row.date.isoformat(),
+            'home_team_id': row.home_team_id,
+            'away_team_id': row.away_team_id,
+            'home_score': row.home_score or 0,
+            'away_score': row.away_score or 0
+        }
+        for row in rows[:RECENT_RESULTS]
+    ])
+    summary['last_match_date'] = rows[0].date
+    return summary
@@ -0,0 +1,482 @@
+import time
+from sqlalchemy import bindparam, func, tuple_
+from src.main import db
+from src.models import Team, Player, Match, Statistic
+from src.services import versions
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 20000
+MAX_REPORTED_ERRORS = 100
+MODES = ('insert', 'upsert')
+MATCH_STATUSES = ('scheduled', 'live', 'completed', 'postponed', 'cancelled')
+
+# Chave natural de cada entidade (usada para encontrar linhas existentes)
+ENTITIES = {
+    'teams': (Team, ('name', 'country')),
+    'players': (Player, ('name', 'team_id')),
+    'matches': (Match, ('home_team_id', 'away_team_id', 'date'))
+}
+
+def read_chunks(source, fmt, chunk_size):
+    """
+    Lê um ficheiro CSV ou Excel em blocos de chunk_size linhas (DataFrames
+    de texto, com o índice da linha no ficheiro). O pandas não lê Excel em
+    streaming: a folha é lida de uma vez e processada em blocos.
+    """
+    import pandas as pd
+    
+    if fmt == 'csv':
+        reader = pd.read_csv(source, chunksize=chunk_size, dtype=str, keep_default_na=False)
+        for chunk in reader:
+            yield _normalize(chunk)
+        return
+    
+    try:
+        frame = pd.read_excel(source, dtype=str, keep_default_na=False)
+    except ImportError:
+        raise RuntimeError('A leitura de ficheiros Excel requer o pacote openpyxl (pip install openpyxl).')
+    
+    frame = _normalize(frame)
+    for start in range(0, len(frame), chunk_size):
+        yield frame.iloc[start:start + chunk_size]
+
+def import_file(entity, source, fmt='csv', mode='insert', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Importa equipas, jogadores ou jogos a partir de um ficheiro.
+    
+    Cada bloco é validado de forma vetorizada, as chaves estrangeiras (nomes
+    de equipas) e as linhas já existentes são resolvidas com uma consulta
+    por bloco, e as linhas são escritas numa transação por bloco (inserções
+    e, em modo 'upsert', atualizações em lote). Linhas inválidas são
+    ignoradas e reportadas. No fim são atualizadas as tabelas derivadas
+    (classificação, confrontos diretos, agregações) das temporadas e
+    equipas tocadas. Se um bloco falhar, os anteriores ficam gravados e as
+    tabelas derivadas são atualizadas para eles; o erro vai no resumo.
+    Devolve o resumo.
+    """
+    if entity not in ENTITIES:
+        raise ValueError(f'Entidade inválida. Use {", ".join(ENTITIES)}.')
+    if mode not in MODES:
+        raise ValueError(f'Modo inválido. Use {", ".join(MODES)}.')
+    if fmt not in ('csv', 'excel'):
+        raise ValueError('Formato inválido. Use csv ou excel.')
+    
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+    summary = {
+        'entity': entity,
+        'mode': mode,
+        'rows': 0,
+        'inserted': 0,
+        'updated': 0,
+        'invalid': 0,
+        'chunks': [],
+        'errors': []
+    }
+    updated_ids = []
+    touched = {'seasons': set(), 'teams': set()}
+    started = time.perf_counter()
+    chunks = read_chunks(source, fmt, chunk_size)
+    
+    while True:
+        chunk_started = time.perf_counter()
+        
+        # Qualquer falha (leitura, validação ou escrita) interrompe a
+        # importação; os blocos já gravados seguem para refresh_derived
+        try:
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            records, errors = PREPARE[entity](chunk)
+            inserts, updates, duplicates = _split_existing(entity, records, mode)
+            errors.extend(duplicates)
+            chunk_touched = _touched(entity, inserts, updates)
+            _write(entity, inserts, updates)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if not summary['chunks'] and isinstance(e, (ValueError, RuntimeError)):
+                raise
+            summary['error'] = (
+                f'Erro ao importar o bloco {len(summary["chunks"]) + 1}: {str(e)}. '
+                f'Blocos anteriores gravados: {len(summary["chunks"])}.'
+            )
+            break
+        
+        updated_ids.extend(row['id'] for row in updates)
+        for key, values in chunk_touched.items():
+            touched[key] |= values
+        summary['rows'] += len(chunk)
+        summary['inserted'] += len(inserts)
+        summary['updated'] += len(updates)
+        summary['invalid'] += len(errors)
+        remaining = MAX_REPORTED_ERRORS - len(summary['errors'])
+        summary['errors'].extend(sorted(errors, key=lambda error: error['index'])[:max(remaining, 0)])
+        summary['chunks'].append({
+            'chunk': len(summary['chunks']) + 1,
+            'rows': len(chunk),
+            'seconds': round(time.perf_counter() - chunk_started, 4)
+        })
+    
+    if summary['inserted'] or summary['updated']:
+        try:
+            summary['refreshed'] = refresh_derived(entity, updated_ids, touched)
+        except Exception as e:
+            summary['error'] = f'Erro ao atualizar as tabelas derivadas: {str(e)}'
+    
+    total_seconds = time.perf_counter() - started
+    summary['total_seconds'] = round(total_seconds, 4)
+    summary['rows_per_second'] = round(summary['rows'] / total_seconds, 1) if total_seconds > 0 else None
+    return summary
+
+def refresh_derived(entity, updated_ids, touched):
+    """
+    Atualiza as tabelas derivadas depois de uma importação, com uma
+    reconstrução limitada às temporadas e equipas tocadas (touched, ver
+    _touched) em vez de uma atualização por linha.
+    Devolve a lista do que foi atualizado.
+    """
+    from src.services import head_to_head, live, player_rollup, standings, team_match_stats
+    
+    refreshed = []
+    
+    if entity == 'teams' and updated_ids:
+        # A liga de equipas existentes pode ter mudado
+        standings.rebuild_standings(team_ids=updated_ids)
+        refreshed.append('standings')
+    
+    if entity == 'matches':
+        standings.rebuild_standings(seasons=touched['seasons'], team_ids=touched['teams'])
+        head_to_head.rebuild_head_to_head(team_ids=touched['teams'])
+        refreshed.extend(['standings', 'head_to_head'])
+        
+        if updated_ids:
+            # Jogos reescritos: temporada e estado afetam agregações e box scores
+            player_ids = [
+                row.player_id
+                for row in db.session.query(Statistic.player_id).distinct().filter(Statistic.match_id.in_(updated_ids))
+            ]
+            try:
+                team_match_stats.refresh_matches(updated_ids)
+                if player_ids:
+                    player_rollup.rebuild_player_season_stats(player_ids, commit=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            live.hub.notify(*updated_ids)
+            refreshed.extend(['team_match_stats', 'player_season_stats'])
+    
+    return refreshed
+
+# Preparação de cada entidade: DataFrame de texto -> (registos, erros)
+
+def _prepare_teams(frame):
+    checker = _Checker(frame, Team)
+    name = checker.text('name', required=True)
+    country = checker.text('country', required=True)
+    league = checker.text('league', required=True)
+    founded_year = checker.integer('founded_year')
+    logo_url = checker.text('logo_url')
+    checker.duplicated([name, country])
+    
+    return checker.records({
+        'name': name,
+        'country': country,
+        'league': league,
+        'founded_year': founded_year,
+        'logo_url': logo_url
+    })
+
+def _prepare_players(frame):
+    checker = _Checker(frame, Player)
+    name = checker.text('name', required=True)
+    position = checker.text('position', required=True)
+    nationality = checker.text('nationality', required=True)
+    team_id = checker.team('team')
+    birth_date = checker.date('birth_date')
+    height = checker.number('height')
+    weight = checker.number('weight')
+    jersey_number = checker.integer('jersey_number')
+    photo_url = checker.text('photo_url')
+    checker.duplicated([name, team_id])
+    
+    return checker.records({
+        'name': name,
+        'position': position,
+        'nationality': nationality,
+        'team_id': team_id,
+        'birth_date': birth_date,
+        'height': height,
+        'weight': weight,
+        'jersey_number': jersey_number,
+        'photo_url': photo_url
+    })
+
+def _prepare_matches(frame):
+    checker = _Checker(frame, Match)
+    date = checker.datetime('date', required=True)
+    home_team_id = checker.team('home_team')
+    away_team_id = checker.team('away_team')
+    season = checker.text('season', required=True)
+    competition = checker.text('competition', required=True)
+    home_score = checker.integer('home_score')
+    away_score = checker.integer('away_score')
+    venue = checker.text('venue')
+    status = checker.text('status')
+    checker.flag(status.notna() & ~status.isin(MATCH_STATUSES), f'status inválido. Valores aceites: {", ".join(MATCH_STATUSES)}.')
+    checker.flag(home_team_id.notna() & (home_team_id == away_team_id), 'A equipa da casa e a visitante não podem ser a mesma.')
+    checker.duplicated([home_team_id, away_team_id, date])
+    
+    return checker.records({
+        'date': date,
+        'home_team_id': home_team_id,
+        'away_team_id': away_team_id,
+        'home_score': home_score,
+        'away_score': away_score,
+        'season': season,
+        'competition': competition,
+        'venue': venue,
+        'status': status
+    })
+
+PREPARE = {
+    'teams': _prepare_teams,
+    'players': _prepare_players,
+    'matches': _prepare_matches
+}
+
+class _Checker:
+    """Validação vetorizada de um bloco: converte colunas e acumula um erro por linha."""
+    
+    def __init__(self, frame, model):
+        import pandas as pd
+        
+        self.frame = frame
+        self.model = model
+        self.errors = pd.Series('', index=frame.index)
+    
+    def flag(self, mask, message):
+        mask = mask.fillna(False).astype(bool) & (self.errors == '')
+        self.errors[mask] = message
+    
+    def raw(self, column):
+        import pandas as pd
+        
+        if column not in self.frame:
+            return pd.Series([None] * len(self.frame), index=self.frame.index, dtype=object)
+        values = self.frame[column].astype(str).str.strip()
+        return values.where(values != '', None)
+    
+    def text(self, column, required=False):
+        values = self.raw(column)
+        if required:
+            self.flag(values.isna(), f'{column} em falta.')
+        
+        length = getattr(self.model.__table__.columns[column].type, 'length', None)
+        if length:
+            self.flag(values.str.len() > length, f'{column} excede {length} caracteres.')
+        return values
+    
+    def number(self, column):
+        import pandas as pd
+        
+        raw = self.raw(column)
+        values = pd.to_numeric(raw, errors='coerce')
+        self.flag(values.isna() & raw.notna(), f'{column} deve ser numérico.')
+        self.flag(values < 0, f'{column} não pode ser negativo.')
+        return values
+    
+    def integer(self, column):
+        values = self.number(column)
+        self.flag(values.notna() & (values % 1 != 0), f'{column} deve ser um número inteiro.')
+        return values.round().astype('Int64')
+    
+    def datetime(self, column, required=False):
+        import pandas as pd
+        
+        raw = self.raw(column)
+        values = pd.to_datetime(raw, errors='coerce')
+        if required:
+            self.flag(raw.isna(), f'{column} em falta.')
+        self.flag(values.isna() & raw.notna(), f'{column} não é uma data válida.')
+        return values
+    
+    def date(self, column):
+        return self.datetime(column).dt.date
+    
+    def team(self, prefix):
+        """
+        Resolve a equipa de cada linha a partir de '<prefix>_id' ou do nome
+        em '<prefix>' (com '<prefix>_country' opcional para desambiguar),
+        com uma única consulta para todos os nomes do bloco.
+        """
+        import pandas as pd
+        
+        ids = self.number(f'{prefix}_id')
+        names = self.raw(prefix)
+        countries = self.raw(f'{prefix}_country')
+        
+        wanted_ids = ids.dropna().astype(int).unique().tolist()
+        wanted_names = names[ids.isna()].dropna().unique().tolist()
+        
+        by_name = {}
+        known_ids = set()
+        if wanted_ids or wanted_names:
+            rows = db.session.query(Team.id, Team.name, Team.country).filter(
+                Team.id.in_(wanted_ids) | Team.name.in_(wanted_names)
+            )
+            for team_id, name, country in rows:
+                known_ids.add(team_id)
+                by_name.setdefault(name, []).append((team_id, country))
+        
+        def resolve(index):
+            if pd.notna(ids[index]):
+                return int(ids[index]) if int(ids[index]) in known_ids else -1
+            candidates = by_name.get(names[index], [])
+            if pd.notna(countries[index]):
+                candidates = [candidate for candidate in candidates if candidate[1] == countries[index]]
+            if len(candidates) > 1:
+                return -2
+            return candidates[0][0] if candidates else -1
+        
+        resolved = pd.Series(
+            [resolve(index) if pd.notna(ids[index]) or pd.notna(names[index]) else None for index in self.frame.index],
+            index=self.frame.index,
+            dtype='Int64'
+        )
+        self.flag(resolved.isna(), f'{prefix} ou {prefix}_id em falta.')
+        self.flag(resolved == -1, f'Equipa não encontrada ({prefix}).')
+        self.flag(resolved == -2, f'Nome de equipa ambíguo ({prefix}); indique {prefix}_country ou {prefix}_id.')
+        return resolved.where((resolved > 0).fillna(False))
+    
+    def duplicated(self, keys):
+        import pandas as pd
+        
+        frame = pd.concat(keys, axis=1)
+        self.flag(frame.duplicated(keep='first') & frame.notna().all(axis=1), 'Linha repetida no ficheiro.')
+    
+    def records(self, columns):
+        """Registos válidos (tipos Python, com a linha em '_index') e lista de erros [{'index', 'error'}]."""
+        import pandas as pd
+        
+        valid = self.errors == ''
+        records = []
+        if valid.any():
+            frame = pd.DataFrame(columns)[valid].astype(object)
+            frame = frame.where(frame.notna(), None)
+            for index, record in zip(frame.index, frame.to_dict('records')):
+                records.append({'_index': int(index), **{field: _python(value) for field, value in record.items()}})
+        
+        invalid = self.errors[~valid]
+        errors = [{'index': int(index), 'error': message} for index, message in invalid.items()]
+        return records, errors
+
+def _python(value):
+    # Converter escalares do pandas/NumPy para tipos aceites pelo driver
+    if value is None:
+        return None
+    if hasattr(value, 'to_pydatetime'):
+        return value.to_pydatetime()
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+def _normalize(frame):
+    frame.columns = [str(column).strip().lower() for column in frame.columns]
+    return frame
+
+def _split_existing(entity, records, mode):
+    """
+    Separa os registos em inserções e atualizações procurando as chaves
+    naturais já existentes numa única consulta. Em modo 'insert' as linhas
+    existentes são reportadas como erro.
+    """
+    model, key = ENTITIES[entity]
+    if not records:
+        return [], [], []
+    
+    columns = [getattr(model, field) for field in key]
+    keys = {tuple(record[field] for field in key) for record in records}
+    
+    existing = {
+        tuple(row[1:]): row[0]
+        for row in db.session.query(model.id, *columns).filter(tuple_(*columns).in_(list(keys)))
+    }
+    
+    inserts, updates, errors = [], [], []
+    for record in records:
+        index = record.pop('_index')
+        record_key = tuple(record[field] for field in key)
+        if record_key not in existing:
+            inserts.append(_with_defaults(model, record))
+        elif mode == 'upsert':
+            updates.append({**record, 'id': existing[record_key]})
+        else:
+            errors.append({'index': index, 'error': 'Já existe um registo com a mesma chave.'})
+    
+    return inserts, updates, errors
+
+def _with_defaults(model, record):
+    # Valores em falta numa linha nova recebem o default do modelo
+    # (ex.: status 'scheduled'), como na criação pela API
+    values = dict(record)
+    for field, value in record.items():
+        default = model.__table__.columns[field].default
+        if value is None and default is not None and default.is_scalar:
+            values[field] = default.arg
+    return values
+
+def _touched(entity, inserts, updates):
+    """
+    Temporadas e equipas afetadas por um bloco de jogos, incluindo a
+    temporada anterior dos jogos atualizados (a equipa faz parte da chave
+    e não muda numa atualização).
+    """
+    touched = {'seasons': set(), 'teams': set()}
+    if entity != 'matches':
+        return touched
+    
+    for record in inserts + updates:
+        touched['teams'].update((record['home_team_id'], record['away_team_id']))
+        if record['season'] is not None:
+            touched['seasons'].add(record['season'])
+    
+    if updates:
+        touched['seasons'].update(
+            row.season
+            for row in db.session.query(Match.season).distinct().filter(Match.id.in_([row['id'] for row in updates]))
+        )
+    
+    return touched
+
+def _write(entity, inserts, updates):
+    """Escreve um bloco na transação corrente e incrementa as versões dos dados."""
+    model, _ = ENTITIES[entity]
+    table = model.__table__
+    
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+    
+    if updates:
+        # Células vazias mantêm o valor existente; os parâmetros levam o tipo
+        # da coluna para serem convertidos como numa inserção (ex.: datas)
+        fields = [field for field in updates[0] if field != 'id']
+        statement = (
+            table.update()
+            .where(table.c.id == bindparam('_id'))
+            .values({
+                field: func.coalesce(bindparam(f'_{field}', type_=table.c[field].type), table.c[field])
+                for field in fields
+            })
+        )
+        db.session.execute(statement, [
+            {f'_{field}': value for field, value in row.items()}
+            for row in updates
+        ])
+    
+    # Escritas em Core não passam pelo listener de versões do ORM
+    scopes = versions.row_scopes(table.name, inserts + updates)
+    if updates:
+        scopes.add(f'{table.name}:rewrite')
+    if inserts or updates:
+        versions.bump(table.name, *scopes)
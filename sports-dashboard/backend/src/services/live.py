@@ -0,0 +1,347 @@
+from collections import deque
+import itertools
+import json
+import threading
+import time
+import uuid
+from flask import current_app
+from src.main import db
+from src.models import Match, Statistic, MatchEvent
+from src.services import versions
+
+# Campos por jogador enviados nos deltas de estatísticas
+LIVE_STAT_FIELDS = (
+    'minutes_played', 'goals', 'assists', 'shots', 'shots_on_target', 'passes',
+    'passes_completed', 'tackles', 'interceptions', 'yellow_cards', 'red_cards'
+)
+# Campos do jogo enviados nos eventos 'score'
+LIVE_MATCH_FIELDS = ('home_team_id', 'away_team_id', 'home_score', 'away_score', 'status')
+
+def match_scopes(match_id):
+    """Âmbitos de versão que, ao mudar, geram eventos para um jogo."""
+    return (
+        f'matches:id:{match_id}',
+        f'statistics:match_id:{match_id}',
+        f'match_events:match_id:{match_id}'
+    )
+
+class MatchState:
+    """Último estado conhecido de um jogo, usado para calcular deltas."""
+    
+    def __init__(self, version, match, players, last_event_id):
+        self.version = version
+        self.match = match
+        self.players = players
+        self.last_event_id = last_event_id
+    
+    def team_totals(self):
+        totals = {}
+        for row in self.players.values():
+            team = totals.setdefault(row['team_id'], dict.fromkeys(LIVE_STAT_FIELDS, 0))
+            for field in LIVE_STAT_FIELDS:
+                team[field] += row[field] or 0
+        return totals
+    
+    def snapshot(self):
+        return {
+            'match': self.match,
+            'teams': self.team_totals(),
+            'players': list(self.players.values()),
+            'last_event_id': self.last_event_id
+        }
+
+def load_state(match_id, version=None, since_event_id=None):
+    """
+    Lê o estado atual de um jogo (precisa de contexto da aplicação).
+    Devolve (estado, eventos novos desde since_event_id) ou (None, []).
+    """
+    if version is None:
+        version = versions.get_versions(*match_scopes(match_id))
+    
+    match = Match.query.get(match_id)
+    if not match:
+        return None, []
+    
+    rows = (
+        db.session.query(Statistic.player_id, Statistic.team_id, *[getattr(Statistic, field) for field in LIVE_STAT_FIELDS])
+        .filter(Statistic.match_id == match_id)
+        .all()
+    )
+    players = {
+        row[0]: {'player_id': row[0], 'team_id': row[1], **dict(zip(LIVE_STAT_FIELDS, row[2:]))}
+        for row in rows
+    }
+    
+    events = []
+    if since_event_id is not None:
+        events = [
+            event.to_dict()
+            for event in MatchEvent.query
+            .filter(MatchEvent.match_id == match_id, MatchEvent.id > since_event_id)
+            .order_by(MatchEvent.id)
+        ]
+        last_event_id = max([since_event_id] + [event['id'] for event in events])
+    else:
+        last_event_id = db.session.query(db.func.max(MatchEvent.id)).filter(MatchEvent.match_id == match_id).scalar() or 0
+    
+    state = MatchState(
+        version,
+        {'id': match.id, **{field: getattr(match, field) for field in LIVE_MATCH_FIELDS}},
+        players,
+        last_event_id
+    )
+    return state, events
+
+def diff_states(old, new, events):
+    """Eventos a publicar entre dois estados: (tipo, dados)."""
+    changes = []
+    match_id = new.match['id']
+    
+    if old.match != new.match:
+        changes.append(('score', new.match))
+    
+    for event in events:
+        changes.append(('event', {'match_id': match_id, **event}))
+    
+    players = []
+    for player_id, row in new.players.items():
+        previous = old.players.get(player_id)
+        changed = {
+            field: row[field] for field in LIVE_STAT_FIELDS
+            if previous is None or previous[field] != row[field]
+        }
+        if changed:
+            players.append({'player_id': player_id, 'team_id': row['team_id'], 'changes': changed})
+    
+    removed = [player_id for player_id in old.players if player_id not in new.players]
+    if players or removed:
+        changes.append(('statistics', {
+            'match_id': match_id,
+            'players': players,
+            'removed_players': removed,
+            'teams': new.team_totals()
+        }))
+    
+    return changes
+
+class Subscriber:
+    """
+    Ligação SSE de um cliente: fila limitada de frames já codificados.
+    Se a fila encher (cliente lento) o subscritor é descartado e deve
+    voltar a ligar com Last-Event-ID.
+    """
+    
+    def __init__(self, match_id, maxsize):
+        self.match_id = match_id
+        self.maxsize = maxsize
+        self.dropped = False
+        self.closed = False
+        self._frames = deque()
+        self._ready = threading.Event()
+    
+    def push(self, frame):
+        if len(self._frames) >= self.maxsize:
+            self.dropped = True
+        else:
+            self._frames.append(frame)
+        self._ready.set()
+        return not self.dropped
+    
+    def close(self):
+        self.closed = True
+        self._ready.set()
+    
+    def wait(self, timeout):
+        """Espera por frames novos; devolve a lista (vazia se expirou)."""
+        self._ready.wait(timeout)
+        self._ready.clear()
+        frames = []
+        while self._frames:
+            frames.append(self._frames.popleft())
+        return frames
+
+class Topic:
+    def __init__(self, state, ring_size, first_sequence):
+        self.state = state
+        self.subscribers = set()
+        self.history = deque(maxlen=ring_size)
+        # Último número visto mínimo para retomar só com o buffer
+        self.resumable_from = first_sequence
+
+class LiveHub:
+    """
+    Distribuição de eventos de jogos em direto, uma instância por worker.
+    
+    As escritas chamam notify(), que acorda a thread de sincronização; esta
+    também verifica periodicamente (LIVE_POLL_SECONDS) as versões dos jogos
+    subscritos numa única consulta, o que propaga escritas feitas noutros
+    workers. Cada alteração é codificada uma vez e copiada para a fila de
+    cada subscritor. Os últimos eventos de cada jogo ficam num buffer
+    circular para retomar ligações com Last-Event-ID.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._topics = {}
+        self._token = uuid.uuid4().hex[:8]
+        self._sequence = itertools.count(1)
+        self._last_sequence = 0
+        self._wake = threading.Event()
+        self._thread = None
+        self._app = None
+        self.published = 0
+        self.dropped = 0
+    
+    def subscribe(self, match_id, last_event_id=None):
+        """
+        Regista um subscritor (em contexto de pedido). Devolve
+        (subscritor, frames iniciais) ou (None, []) se o jogo não existir.
+        Os frames iniciais são os eventos em falta desde last_event_id ou,
+        se não for possível retomar, um 'snapshot' com o estado completo.
+        """
+        self._start()
+        config = current_app.config
+        
+        with self._lock:
+            topic = self._topics.get(match_id)
+        
+        if topic is None:
+            state, _ = load_state(match_id)
+            if state is None:
+                return None, []
+            with self._lock:
+                topic = self._topics.get(match_id)
+                if topic is None:
+                    topic = Topic(state, config['LIVE_RING_SIZE'], self._last_sequence + 1)
+                    self._topics[match_id] = topic
+        
+        subscriber = Subscriber(match_id, config['LIVE_QUEUE_SIZE'])
+        
+        with self._lock:
+            # A sincronização pode ter removido o tópico entretanto
+            topic = self._topics.setdefault(match_id, topic)
+            topic.subscribers.add(subscriber)
+            frames = self._replay(topic, last_event_id)
+            if frames is None:
+                frames = [self._frame(self._last_sequence, 'snapshot', topic.state.snapshot())]
+            if topic.state.match['status'] == 'completed':
+                subscriber.close()
+        
+        return subscriber, frames
+    
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            topic = self._topics.get(subscriber.match_id)
+            if topic:
+                topic.subscribers.discard(subscriber)
+    
+    def notify(self, *match_ids):
+        """Sinaliza escritas em jogos; a sincronização corre de imediato."""
+        with self._lock:
+            subscribed = any(match_id in self._topics for match_id in match_ids)
+        if subscribed:
+            self._wake.set()
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'matches': len(self._topics),
+                'subscribers': sum(len(topic.subscribers) for topic in self._topics.values()),
+                'published': self.published,
+                'dropped': self.dropped
+            }
+    
+    def sync(self):
+        """Compara as versões dos jogos subscritos e publica os deltas."""
+        with self._lock:
+            for match_id in [match_id for match_id, topic in self._topics.items() if not topic.subscribers]:
+                del self._topics[match_id]
+            current = {match_id: topic.state for match_id, topic in self._topics.items()}
+        
+        if not current:
+            return
+        
+        scopes = [scope for match_id in current for scope in match_scopes(match_id)]
+        values = versions.get_versions(*scopes)
+        
+        for i, (match_id, old) in enumerate(current.items()):
+            version = values[i * 3:i * 3 + 3]
+            if version == old.version:
+                continue
+            
+            new, events = load_state(match_id, version, since_event_id=old.last_event_id)
+            if new is None:
+                # Jogo removido: terminar as ligações
+                new = MatchState(version, {**old.match, 'status': 'deleted'}, {}, old.last_event_id)
+            
+            self._publish(match_id, new, diff_states(old, new, events))
+    
+    def _publish(self, match_id, state, changes):
+        with self._lock:
+            topic = self._topics.get(match_id)
+            if topic is None:
+                return
+            topic.state = state
+            finished = state.match['status'] in ('completed', 'deleted')
+            
+            for kind, data in changes:
+                sequence = next(self._sequence)
+                self._last_sequence = sequence
+                frame = self._frame(sequence, kind, data)
+                
+                if len(topic.history) == topic.history.maxlen:
+                    topic.resumable_from = topic.history[0][0]
+                topic.history.append((sequence, frame))
+                self.published += 1
+                
+                for subscriber in list(topic.subscribers):
+                    if not subscriber.push(frame):
+                        topic.subscribers.discard(subscriber)
+                        self.dropped += 1
+            
+            if finished:
+                for subscriber in topic.subscribers:
+                    subscriber.close()
+    
+    def _replay(self, topic, last_event_id):
+        # Devolve os frames em falta, ou None se o ID não pertence a este
+        # worker ou já saiu do buffer circular
+        if not last_event_id:
+            return None
+        
+        token, _, sequence = last_event_id.partition('-')
+        if token != self._token or not sequence.isdigit():
+            return None
+        
+        sequence = int(sequence)
+        if sequence < topic.resumable_from or sequence > self._last_sequence:
+            return None
+        
+        return [frame for number, frame in topic.history if number > sequence]
+    
+    def _frame(self, sequence, kind, data):
+        payload = json.dumps(data, default=str, separators=(',', ':'))
+        return f'id: {self._token}-{sequence}\nevent: {kind}\ndata: {payload}\n\n'.encode('utf-8')
+    
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._app = current_app._get_current_object()
+                self._thread = threading.Thread(target=self._run, name='live-hub', daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            self._wake.wait(self._app.config['LIVE_POLL_SECONDS'])
+            self._wake.clear()
+            try:
+                with self._app.app_context():
+                    self.sync()
+            except Exception:
+                self._app.logger.exception('Erro ao sincronizar jogos em direto')
+                time.sleep(1)
+
+# Instância partilhada por worker
+hub = LiveHub()
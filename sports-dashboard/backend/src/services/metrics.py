@@ -0,0 +1,246 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Limites dos histogramas (fixos: a memória não cresce com o número de pedidos)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Métricas por pedido: (nome, descrição, limites)
+HISTOGRAMS = (
+    ('http_request_duration_seconds', 'Duração dos pedidos HTTP até à resposta.', DURATION_BUCKETS),
+    ('http_request_sql_statements', 'Instruções SQL executadas por pedido.', STATEMENT_BUCKETS),
+    ('http_request_db_seconds', 'Tempo gasto na base de dados por pedido.', DURATION_BUCKETS),
+    ('http_request_rows_hydrated', 'Objetos ORM carregados por pedido.', ROW_BUCKETS),
+    ('http_response_size_bytes', 'Tamanho do corpo das respostas (sem streaming).', BYTE_BUCKETS)
+)
+
+# Parâmetros das instruções lentas são truncados no registo
+MAX_PARAMETERS_LENGTH = 500
+
+logger = logging.getLogger(__name__)
+
+class Histogram:
+    """Histograma de limites fixos com soma e contagem (formato Prometheus)."""
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def cumulative(self):
+        """Pares (limite, contagem acumulada), terminando em +Inf."""
+        return list(zip(self.buckets + (float('inf'),), itertools.accumulate(self.counts)))
+
+class RequestMetrics:
+    """Contadores de um pedido, preenchidos pelos eventos do SQLAlchemy."""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+class MetricsRegistry:
+    """
+    Métricas agregadas por rota (endpoint do Flask) e método, uma instância
+    por processo. O número de séries é limitado pelo número de rotas: pedidos
+    sem rota (404) ficam todos em 'unmatched'. Com vários workers cada um
+    expõe as suas métricas.
+    
+    Opcionalmente guarda as slow_size instruções mais lentas acima de
+    slow_threshold segundos, com os parâmetros, e regista-as no log.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._requests = {}
+        self._slow = []
+        self._sequence = itertools.count()
+        self.slow_size = 0
+        self.slow_threshold = 0.0
+    
+    def configure(self, slow_size, slow_threshold):
+        with self._lock:
+            self.slow_size = slow_size
+            self.slow_threshold = slow_threshold
+            self._slow = heapq.nlargest(slow_size, self._slow)
+            heapq.heapify(self._slow)
+    
+    def observe(self, endpoint, method, status, values):
+        """Regista um pedido: values tem um valor (ou None) por histograma."""
+        with self._lock:
+            series = self._series.get((endpoint, method))
+            if series is None:
+                series = [Histogram(buckets) for _, _, buckets in HISTOGRAMS]
+                self._series[(endpoint, method)] = series
+            for histogram, value in zip(series, values):
+                if value is not None:
+                    histogram.observe(value)
+            
+            key = (endpoint, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+    
+    def record_statement(self, seconds, statement, parameters, endpoint):
+        """Considera uma instrução para a lista das mais lentas; devolve True se entrou."""
+        if not self.slow_size or seconds < self.slow_threshold:
+            return False
+        
+        entry = (seconds, next(self._sequence), {
+            'seconds': round(seconds, 6),
+            'statement': statement,
+            'parameters': _truncate(repr(parameters)),
+            'endpoint': endpoint,
+            'at': time.time()
+        })
+        with self._lock:
+            if len(self._slow) < self.slow_size:
+                heapq.heappush(self._slow, entry)
+                return True
+            if entry[0] > self._slow[0][0]:
+                heapq.heapreplace(self._slow, entry)
+                return True
+        return False
+    
+    def slow_statements(self):
+        with self._lock:
+            return [entry[2] for entry in sorted(self._slow, reverse=True)]
+    
+    def reset(self):
+        with self._lock:
+            self._series = {}
+            self._requests = {}
+            self._slow = []
+    
+    def render(self):
+        """Exposição em texto no formato do Prometheus (versão 0.0.4)."""
+        with self._lock:
+            series = {key: [_copy(histogram) for histogram in histograms] for key, histograms in self._series.items()}
+            requests = dict(self._requests)
+        
+        lines = [
+            '# HELP http_requests_total Pedidos HTTP por rota, método e código de resposta.',
+            '# TYPE http_requests_total counter'
+        ]
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}')
+        
+        for i, (name, description, _) in enumerate(HISTOGRAMS):
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} histogram')
+            for (endpoint, method), histograms in sorted(series.items()):
+                histogram = histograms[i]
+                for bound, count in histogram.cumulative():
+                    labels = _labels(endpoint=endpoint, method=method, le=_number(bound))
+                    lines.append(f'{name}_bucket{labels} {count}')
+                labels = _labels(endpoint=endpoint, method=method)
+                lines.append(f'{name}_sum{labels} {_number(histogram.sum)}')
+                lines.append(f'{name}_count{labels} {histogram.count}')
+        
+        return '\n'.join(lines) + '\n'
+
+def init_app(app):
+    """Liga a recolha de métricas aos pedidos da aplicação (METRICS_ENABLED)."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    
+    registry.configure(app.config.get('METRICS_SLOW_QUERIES', 0), app.config.get('METRICS_SLOW_QUERY_MS', 100) / 1000)
+    register_listeners()
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+def register_listeners():
+    """Conta instruções, tempo de base de dados e objetos carregados em todos os engines."""
+    from src.main import db
+    
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    if not event.contains(db.Model, 'load', _on_load):
+        event.listen(db.Model, 'load', _on_load, propagate=True)
+
+def _current():
+    # Contadores do pedido corrente (None fora de pedidos, ex.: threads de fundo)
+    return g.get('_request_metrics') if has_app_context() else None
+
+def _before_request():
+    g._request_metrics = RequestMetrics()
+
+def _after_request(response):
+    metrics = g.pop('_request_metrics', None)
+    if metrics is None:
+        return response
+    
+    # Em respostas em streaming a duração vai até ao envio dos cabeçalhos
+    size = None if response.is_streamed else response.calculate_content_length()
+    registry.observe(
+        request.url_rule.endpoint if request.url_rule else 'unmatched',
+        request.method,
+        response.status_code,
+        (time.perf_counter() - metrics.started, metrics.statements, metrics.db_seconds, metrics.rows, size)
+    )
+    return response
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is None:
+        return
+    
+    seconds = time.perf_counter() - started
+    metrics = _current()
+    if metrics is not None:
+        metrics.statements += 1
+        metrics.db_seconds += seconds
+    
+    if registry.slow_size and seconds >= registry.slow_threshold:
+        endpoint = request.endpoint if metrics is not None else None
+        if registry.record_statement(seconds, statement, parameters, endpoint):
+            logger.warning('Instrução SQL lenta (%.1f ms, %s): %s %s', seconds * 1000, endpoint, statement, _truncate(repr(parameters)))
+
+def _on_load(target, context):
+    metrics = _current()
+    if metrics is not None:
+        metrics.rows += 1
+
+def _copy(histogram):
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.sum = histogram.sum
+    copy.count = histogram.count
+    return copy
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _truncate(text):
+    return text if len(text) <= MAX_PARAMETERS_LENGTH else text[:MAX_PARAMETERS_LENGTH] + '...'
+
+# Instância partilhada por processo
+registry = MetricsRegistry()
@@ -0,0 +1,195 @@
+from collections import defaultdict
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from src.main import db
+from src.models import Match, Statistic, PlayerSeasonStat
+from src.services import versions
+
+# Colunas de statistics somadas na agregação por jogador e temporada
+SUM_FIELDS = (
+    'minutes_played', 'goals', 'assists', 'shots', 'shots_on_target',
+    'key_passes', 'passes', 'passes_completed', 'tackles', 'interceptions',
+    'yellow_cards', 'red_cards'
+)
+PER_90_FIELDS = ('goals', 'assists', 'shots', 'key_passes', 'tackles', 'interceptions')
+
+def derive(totals):
+    """Calcula percentagens e taxas por 90 minutos a partir de totais."""
+    shots = totals['shots']
+    passes = totals['passes']
+    minutes = totals['minutes_played']
+    
+    derived = {
+        'shot_accuracy': (totals['shots_on_target'] / shots * 100) if shots > 0 else 0,
+        'pass_accuracy': (totals['passes_completed'] / passes * 100) if passes > 0 else 0,
+        'conversion_rate': (totals['goals'] / shots * 100) if shots > 0 else 0
+    }
+    for field in PER_90_FIELDS:
+        derived[f'{field}_per_90'] = (totals[field] / minutes * 90) if minutes > 0 else 0
+    
+    return derived
+
+def summarize(player_id, season=None):
+    """
+    Totais e valores derivados de um jogador, somando as linhas da agregação
+    (uma por temporada). O custo não depende do número de jogos disputados.
+    """
+    return summarize_many([player_id], season)[player_id]
+
+def summarize_many(player_ids, season=None):
+    """
+    Totais e valores derivados de vários jogadores numa só consulta agrupada
+    por jogador. Jogadores sem linhas na agregação ficam com totais a zero.
+    """
+    query = db.session.query(
+        PlayerSeasonStat.player_id,
+        db.func.sum(PlayerSeasonStat.matches_played),
+        *[db.func.sum(getattr(PlayerSeasonStat, field)) for field in SUM_FIELDS]
+    ).filter(PlayerSeasonStat.player_id.in_(player_ids))
+    
+    if season:
+        query = query.filter(PlayerSeasonStat.season == season)
+    
+    rows = {row[0]: row[1:] for row in query.group_by(PlayerSeasonStat.player_id).all()}
+    
+    summaries = {}
+    for player_id in player_ids:
+        row = rows.get(player_id) or (0,) * (len(SUM_FIELDS) + 1)
+        totals = dict(zip(SUM_FIELDS, row[1:]))
+        totals['matches_played'] = row[0]
+        totals.update(derive(totals))
+        summaries[player_id] = totals
+    
+    return summaries
+
+def apply_rows(rows, sign=1):
+    """
+    Aplica à agregação linhas de estatísticas escritas fora do ORM
+    (por exemplo, inserções em lote). Cada linha é um dicionário com
+    player_id, match_id e as colunas de SUM_FIELDS.
+    """
+    changes = [(row['player_id'], row['match_id'], row, sign) for row in rows]
+    with db.session.no_autoflush:
+        _apply_changes(db.session, changes)
+
+def rebuild_player_season_stats(player_ids=None, commit=True):
+    """
+    Reconstrói a agregação a partir da tabela statistics, para todos os
+    jogadores ou apenas para os indicados. Devolve o número de linhas escritas.
+    """
+    query = (
+        db.session.query(
+            Statistic.player_id,
+            Match.season,
+            db.func.count(Statistic.id),
+            *[db.func.coalesce(db.func.sum(getattr(Statistic, field)), 0) for field in SUM_FIELDS]
+        )
+        .join(Match, Match.id == Statistic.match_id)
+        .group_by(Statistic.player_id, Match.season)
+    )
+    delete = PlayerSeasonStat.query
+    
+    if player_ids is not None:
+        query = query.filter(Statistic.player_id.in_(player_ids))
+        delete = delete.filter(PlayerSeasonStat.player_id.in_(player_ids))
+    
+    rows = []
+    for player_id, season, matches_played, *sums in query.all():
+        row = dict(zip(SUM_FIELDS, sums))
+        row.update(derive(row))
+        row.update({'player_id': player_id, 'season': season, 'matches_played': matches_played})
+        rows.append(row)
+    
+    try:
+        delete.delete(synchronize_session=False)
+        if rows:
+            db.session.execute(PlayerSeasonStat.__table__.insert(), rows)
+        versions.rebuilt('statistics', full=player_ids is None)
+        if commit:
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return len(rows)
+
+def _apply_changes(session, changes):
+    # Resolver a temporada de cada jogo numa única consulta
+    match_ids = {match_id for _, match_id, _, _ in changes}
+    seasons = dict(
+        session.query(Match.id, Match.season).filter(Match.id.in_(match_ids)).all()
+    )
+    
+    # Acumular deltas por (jogador, temporada) antes de tocar na agregação
+    deltas = defaultdict(lambda: dict.fromkeys(SUM_FIELDS + ('matches_played',), 0))
+    for player_id, match_id, values, sign in changes:
+        season = seasons.get(match_id)
+        if season is None:
+            continue
+        
+        delta = deltas[(player_id, season)]
+        delta['matches_played'] += sign
+        for field in SUM_FIELDS:
+            delta[field] += sign * (values.get(field) or 0)
+    
+    if not deltas:
+        return
+    
+    player_ids = {player_id for player_id, _ in deltas}
+    existing = {
+        (row.player_id, row.season): row
+        for row in session.query(PlayerSeasonStat).filter(PlayerSeasonStat.player_id.in_(player_ids))
+    }
+    
+    for (player_id, season), delta in deltas.items():
+        row = existing.get((player_id, season))
+        if row is None:
+            row = PlayerSeasonStat(player_id=player_id, season=season, **dict.fromkeys(SUM_FIELDS + ('matches_played',), 0))
+            session.add(row)
+        
+        row.matches_played += delta['matches_played']
+        for field in SUM_FIELDS:
+            setattr(row, field, getattr(row, field) + delta[field])
+        
+        totals = {field: getattr(row, field) for field in SUM_FIELDS}
+        for field, value in derive(totals).items():
+            setattr(row, field, value)
+
+def _values(stat, committed=False):
+    values = {}
+    for field in ('player_id', 'match_id') + SUM_FIELDS:
+        history = inspect(stat).attrs[field].history
+        if committed and history.deleted:
+            values[field] = history.deleted[0]
+        else:
+            values[field] = getattr(stat, field)
+    return values
+
+def _before_flush(session, flush_context, instances):
+    changes = []
+    
+    for obj in session.new:
+        if isinstance(obj, Statistic):
+            values = _values(obj)
+            changes.append((values['player_id'], values['match_id'], values, 1))
+    
+    for obj in session.dirty:
+        if isinstance(obj, Statistic) and session.is_modified(obj):
+            old = _values(obj, committed=True)
+            new = _values(obj)
+            changes.append((old['player_id'], old['match_id'], old, -1))
+            changes.append((new['player_id'], new['match_id'], new, 1))
+    
+    for obj in session.deleted:
+        if isinstance(obj, Statistic):
+            old = _values(obj, committed=True)
+            changes.append((old['player_id'], old['match_id'], old, -1))
+    
+    if changes:
+        with session.no_autoflush:
+            _apply_changes(session, changes)
+
+def register_listeners():
+    """Mantém a agregação atualizada em cada flush que escreva estatísticas."""
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
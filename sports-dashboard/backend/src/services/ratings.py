@@ -0,0 +1,220 @@
+from itertools import chain
+from sqlalchemy import bindparam, event, inspect, select
+from sqlalchemy.orm import Session
+from src.main import db
+from src.models import Match, Player, Statistic, PlayerMatchRating
+from src.services import versions
+
+# Número de jogos na média móvel do rating
+ROLLING_WINDOW = 5
+
+def performance_scores(goals, assists, shots_on_target, tackles, interceptions, pass_accuracy, minutes_played):
+    """
+    Pontuação por jogo usada em /performance, calculada de forma vetorizada.
+    Aceita escalares ou arrays NumPy (uma posição por linha de estatísticas).
+    """
+    import numpy as np
+    
+    goals = np.asarray(goals, dtype=np.float64)
+    pass_accuracy = np.asarray(pass_accuracy, dtype=np.float64)
+    minutes_played = np.asarray(minutes_played, dtype=np.float64)
+    
+    # Contribuições ofensivas
+    score = goals * 3 + np.asarray(assists) * 2 + np.asarray(shots_on_target) * 0.5
+    
+    # Contribuições defensivas
+    score = score + np.asarray(tackles) * 0.5 + np.asarray(interceptions) * 0.5
+    
+    # Contribuições de posse
+    score = score + np.where(pass_accuracy > 0, pass_accuracy / 100 * 5, 0)
+    
+    # Normalizar para 90 minutos
+    safe_minutes = np.where(minutes_played > 0, minutes_played, 90)
+    return np.where(minutes_played > 0, score / (safe_minutes / 90), score)
+
+def refresh_players(player_ids, connection=None):
+    """
+    Calcula, numa passagem vetorizada, o rating das linhas de estatísticas
+    ainda sem rating dos jogadores indicados e recalcula a média móvel
+    desses jogadores. O custo depende das carreiras dos jogadores, não do
+    tamanho da tabela. Usa Core na ligação da transação corrente (não faz
+    commit), pelo que pode correr dentro de um flush. Devolve o número de
+    ratings novos.
+    """
+    player_ids = sorted({player_id for player_id in player_ids if player_id is not None})
+    if not player_ids:
+        return 0
+    
+    connection = connection or db.session.connection()
+    rated = score_statistics(connection, Statistic.player_id.in_(player_ids))
+    update_rolling_ratings(player_ids, connection)
+    return rated
+
+def score_statistics(connection, *criteria):
+    """Insere o rating das linhas de estatísticas sem rating que satisfazem os critérios."""
+    stats_table = Statistic.__table__
+    table = PlayerMatchRating.__table__
+    
+    rows = connection.execute(
+        select(
+            stats_table.c.id,
+            stats_table.c.player_id,
+            stats_table.c.match_id,
+            stats_table.c.goals,
+            stats_table.c.assists,
+            stats_table.c.shots_on_target,
+            stats_table.c.tackles,
+            stats_table.c.interceptions,
+            stats_table.c.pass_accuracy,
+            stats_table.c.minutes_played
+        )
+        .select_from(stats_table.outerjoin(table, table.c.statistic_id == stats_table.c.id))
+        .where(table.c.id.is_(None), *criteria)
+    ).all()
+    
+    if not rows:
+        return 0
+    
+    import numpy as np
+    
+    # Valores nulos contam como zero
+    matrix = np.nan_to_num(np.array(rows, dtype=np.float64))
+    scores = performance_scores(*(matrix[:, i] for i in range(3, 10)))
+    
+    ids = matrix[:, 0].astype(np.int64).tolist()
+    player_ids = matrix[:, 1].astype(np.int64).tolist()
+    match_ids = matrix[:, 2].astype(np.int64).tolist()
+    
+    connection.execute(table.insert(), [
+        {'statistic_id': stat_id, 'player_id': player_id, 'match_id': match_id, 'rating': score}
+        for stat_id, player_id, match_id, score in zip(ids, player_ids, match_ids, scores.tolist())
+    ])
+    return len(rows)
+
+def update_rolling_ratings(player_ids, connection=None):
+    """
+    Recalcula a média móvel (por data do jogo) dos jogadores indicados.
+    Só as linhas cujo valor muda são escritas: um jogo novo no fim da
+    carreira altera apenas a sua própria média.
+    """
+    connection = connection or db.session.connection()
+    table = PlayerMatchRating.__table__
+    matches_table = Match.__table__
+    
+    rows = connection.execute(
+        select(table.c.id, table.c.player_id, table.c.rating, table.c.rolling_rating)
+        .select_from(table.join(matches_table, matches_table.c.id == table.c.match_id))
+        .where(table.c.player_id.in_(list(player_ids)))
+        .order_by(table.c.player_id, matches_table.c.date, table.c.id)
+    ).all()
+    
+    if not rows:
+        return
+    
+    import numpy as np
+    import pandas as pd
+    
+    frame = pd.DataFrame(rows, columns=['id', 'player_id', 'rating', 'stored'])
+    frame['rolling_rating'] = (
+        frame.groupby('player_id')['rating']
+        .rolling(ROLLING_WINDOW, min_periods=1)
+        .mean()
+        .reset_index(level=0, drop=True)
+    )
+    stored = frame['stored'].astype(np.float64)
+    changed = frame[stored.isna() | ~np.isclose(stored.fillna(0), frame['rolling_rating'])]
+    
+    if changed.empty:
+        return
+    
+    statement = (
+        table.update()
+        .where(table.c.id == bindparam('rating_id'))
+        .values(rolling_rating=bindparam('rolling'))
+    )
+    connection.execute(
+        statement,
+        [
+            {'rating_id': rating_id, 'rolling': rolling}
+            for rating_id, rolling in zip(changed['id'].tolist(), changed['rolling_rating'].tolist())
+        ]
+    )
+
+def rebuild_ratings():
+    """Apaga e recalcula todos os ratings. Devolve o número de ratings escritos."""
+    try:
+        connection = db.session.connection()
+        connection.execute(PlayerMatchRating.__table__.delete())
+        rated = score_statistics(connection)
+        
+        player_ids = [row.id for row in db.session.query(Player.id)]
+        for start in range(0, len(player_ids), 500):
+            update_rolling_ratings(player_ids[start:start + 500], connection)
+        versions.rebuilt('statistics')
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return rated
+
+def _before_flush(session, flush_context, instances):
+    # Estatísticas alteradas ou removidas perdem o rating (a linha removida
+    # sai antes do DELETE, pela chave estrangeira); o rating é recalculado
+    # e a média móvel dos jogadores, incluindo o anterior de uma linha que
+    # mudou de jogador, atualizada em _after_flush
+    statistic_ids = set()
+    player_ids = session.info.setdefault('ratings_players', set())
+    for obj in chain(session.dirty, session.deleted):
+        if isinstance(obj, Statistic) and (obj in session.deleted or session.is_modified(obj)):
+            statistic_ids.add(obj.id)
+            player_ids.add(obj.player_id)
+    
+    statistic_ids.discard(None)
+    if statistic_ids:
+        table = PlayerMatchRating.__table__
+        connection = session.connection()
+        player_ids.update(
+            row.player_id
+            for row in connection.execute(select(table.c.player_id).where(table.c.statistic_id.in_(statistic_ids)))
+        )
+        connection.execute(table.delete().where(table.c.statistic_id.in_(statistic_ids)))
+
+def _after_flush(session, flush_context):
+    # Jogadores com estatísticas novas, alteradas ou removidas e, quando a
+    # data de um jogo muda, os jogadores desse jogo (a média móvel segue a
+    # ordem das datas)
+    player_ids = session.info.pop('ratings_players', set())
+    match_ids = set()
+    for obj in chain(session.new, session.dirty):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, Statistic):
+            player_ids.add(obj.player_id)
+        elif isinstance(obj, Match) and obj in session.dirty and inspect(obj).attrs['date'].history.has_changes():
+            match_ids.add(obj.id)
+    
+    connection = session.connection()
+    if match_ids:
+        table = PlayerMatchRating.__table__
+        player_ids.update(
+            row.player_id
+            for row in connection.execute(
+                select(table.c.player_id).distinct().where(table.c.match_id.in_(match_ids))
+            )
+        )
+    
+    if player_ids:
+        refresh_players(player_ids, connection)
+
+def _after_rollback(session):
+    session.info.pop('ratings_players', None)
+
+def register_listeners():
+    """Mantém os ratings e as médias móveis atualizados a cada flush de estatísticas ou jogos."""
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+    if not event.contains(Session, 'after_rollback', _after_rollback):
+        event.listen(Session, 'after_rollback', _after_rollback)
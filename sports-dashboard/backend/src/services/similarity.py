@@ -0,0 +1,199 @@
+import threading
+from datetime import timedelta
+from src.main import db
+from src.models import Player, PlayerSeasonStat
+from src.services import versions
+from src.services.player_rollup import SUM_FIELDS, derive
+
+# Componentes do vetor de cada jogador (valores por 90 minutos e percentagem)
+FEATURES = (
+    'goals_per_90', 'assists_per_90', 'shots_per_90', 'key_passes_per_90',
+    'tackles_per_90', 'interceptions_per_90', 'pass_accuracy'
+)
+# Jogadores com menos minutos ficam fora do índice (taxas pouco fiáveis)
+MIN_MINUTES = 90
+# Margem ao reler linhas alteradas, para transações que terminam fora de ordem
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+class SimilarityIndex:
+    """
+    Índice de vizinhos mais próximos sobre vetores por 90 minutos,
+    padronizados (z-score) com a média e o desvio de todos os jogadores
+    elegíveis. Os totais vêm da agregação por jogador e temporada.
+    
+    A atualização é incremental: quando as estatísticas ou os jogadores
+    mudam, só são relidos os jogadores com linhas da agregação alteradas
+    desde a última passagem (updated_at); reescritas de estatísticas ou de
+    jogadores forçam um recarregamento completo. As distâncias são
+    calculadas de uma vez para todos os candidatos com NumPy.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Esquece a cópia carregada; a próxima leitura recarrega tudo."""
+        with self._lock:
+            self._data = None
+            self._version = None
+            self._watermark = None
+    
+    def refresh(self):
+        """Sincroniza o índice com a base de dados se as versões mudaram."""
+        version = versions.get_versions('statistics', 'players', 'statistics:rewrite', 'players:rewrite')
+        
+        if version == self._version:
+            return self._data
+        
+        with self._lock:
+            if version == self._version:
+                return self._data
+            
+            if self._data is None or version[2:] != self._version[2:]:
+                rows = self._load()
+                data = self._build(self._empty(), rows)
+            else:
+                rows = self._load(self._watermark - WATERMARK_OVERLAP)
+                data = self._build(self._data, rows)
+            
+            if rows:
+                latest = max(row['updated_at'] for row in rows)
+                self._watermark = max(self._watermark, latest) if self._watermark else latest
+            self._data = data
+            self._version = version
+        
+        return self._data
+    
+    def similar(self, player_id, k=10, position=None):
+        """
+        Devolve (vetor do jogador, [(player_id, distância, vetor), ...]) com
+        os k jogadores mais próximos, opcionalmente de uma posição; ou
+        (None, []) se o jogador não estiver no índice. Os vetores são
+        dicionários com os valores não padronizados de FEATURES.
+        """
+        import numpy as np
+        
+        data = self.refresh()
+        row = data['rows'].get(player_id)
+        if row is None or not data['eligible'][row]:
+            return None, []
+        
+        target = dict(zip(FEATURES, data['features'][row].tolist()))
+        
+        mask = data['eligible'].copy()
+        mask[row] = False
+        if position:
+            mask &= data['positions'] == position.lower()
+        
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return target, []
+        
+        distances = np.sqrt(((data['scaled'][candidates] - data['scaled'][row]) ** 2).sum(axis=1))
+        
+        # Seleção parcial dos k menores e ordenação só desses (desempate por id)
+        k = min(k, len(candidates))
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.lexsort((data['ids'][candidates[nearest]], distances[nearest]))]
+        
+        return target, [
+            (
+                int(data['ids'][candidates[i]]),
+                float(distances[i]),
+                dict(zip(FEATURES, data['features'][candidates[i]].tolist()))
+            )
+            for i in nearest
+        ]
+    
+    def _load(self, since=None):
+        # Totais de todas as temporadas de cada jogador, numa consulta agrupada
+        query = (
+            db.session.query(
+                PlayerSeasonStat.player_id,
+                Player.position,
+                db.func.max(PlayerSeasonStat.updated_at),
+                *[db.func.coalesce(db.func.sum(getattr(PlayerSeasonStat, field)), 0) for field in SUM_FIELDS]
+            )
+            .join(Player, Player.id == PlayerSeasonStat.player_id)
+            .group_by(PlayerSeasonStat.player_id, Player.position)
+        )
+        
+        if since is not None:
+            changed = (
+                db.session.query(PlayerSeasonStat.player_id)
+                .filter(PlayerSeasonStat.updated_at >= since)
+            )
+            query = query.filter(PlayerSeasonStat.player_id.in_(changed))
+        
+        rows = []
+        for player_id, position, updated_at, *sums in query.all():
+            totals = dict(zip(SUM_FIELDS, sums))
+            derived = derive(totals)
+            rows.append({
+                'player_id': player_id,
+                'position': (position or '').lower(),
+                'minutes': totals['minutes_played'],
+                'updated_at': updated_at,
+                'features': [derived[feature] for feature in FEATURES]
+            })
+        return rows
+    
+    def _build(self, previous, rows):
+        import numpy as np
+        
+        ids = previous['ids'].copy()
+        positions = previous['positions'].copy()
+        minutes = previous['minutes'].copy()
+        features = previous['features'].copy()
+        index = dict(previous['rows'])
+        
+        new_rows = [row for row in rows if row['player_id'] not in index]
+        for row in rows:
+            i = index.get(row['player_id'])
+            if i is not None:
+                positions[i] = row['position']
+                minutes[i] = row['minutes']
+                features[i] = row['features']
+        
+        if new_rows:
+            start = len(ids)
+            ids = np.concatenate([ids, np.array([row['player_id'] for row in new_rows], dtype=np.int64)])
+            positions = np.concatenate([positions, np.array([row['position'] for row in new_rows], dtype=object)])
+            minutes = np.concatenate([minutes, np.array([row['minutes'] for row in new_rows], dtype=np.float64)])
+            features = np.vstack([features, np.array([row['features'] for row in new_rows], dtype=np.float64)])
+            for offset, row in enumerate(new_rows):
+                index[row['player_id']] = start + offset
+        
+        # Padronizar com a média e o desvio dos jogadores elegíveis
+        eligible = minutes >= MIN_MINUTES
+        scaled = np.zeros_like(features)
+        if eligible.any():
+            mean = features[eligible].mean(axis=0)
+            std = features[eligible].std(axis=0)
+            std[std == 0] = 1.0
+            scaled = (features - mean) / std
+        
+        return {
+            'ids': ids,
+            'positions': positions,
+            'minutes': minutes,
+            'features': features,
+            'scaled': scaled,
+            'eligible': eligible,
+            'rows': index
+        }
+    
+    def _empty(self):
+        import numpy as np
+        
+        return {
+            'ids': np.empty(0, dtype=np.int64),
+            'positions': np.empty(0, dtype=object),
+            'minutes': np.empty(0, dtype=np.float64),
+            'features': np.empty((0, len(FEATURES)), dtype=np.float64),
+            'rows': {}
+        }
+
+# Instância partilhada por processo
+index = SimilarityIndex()
@@ -0,0 +1,169 @@
+from collections import namedtuple
+from src.main import db
+from src.models import Team, Match, Standing
+from src.services import versions
+
+# Estado de um jogo relevante para a classificação (usado para desfazer a
+# contribuição antiga de um jogo antes de o atualizar)
+MatchResult = namedtuple('MatchResult', [
+    'home_team_id', 'away_team_id', 'season', 'home_score', 'away_score', 'status'
+])
+
+def snapshot_match(match):
+    """Guarda os campos de um jogo que afetam a classificação."""
+    return MatchResult(
+        match.home_team_id,
+        match.away_team_id,
+        match.season,
+        match.home_score or 0,
+        match.away_score or 0,
+        match.status
+    )
+
+def apply_match(match, sign=1):
+    """
+    Soma (sign=1) ou subtrai (sign=-1) a contribuição de um jogo à
+    classificação materializada. Apenas jogos concluídos contam.
+    Não faz commit: a alteração entra na transação de quem chama.
+    """
+    if match is None or match.status != 'completed':
+        return
+    
+    leagues = dict(
+        db.session.query(Team.id, Team.league)
+        .filter(Team.id.in_([match.home_team_id, match.away_team_id]))
+        .all()
+    )
+    home_score = match.home_score or 0
+    away_score = match.away_score or 0
+    
+    sides = (
+        (match.home_team_id, home_score, away_score),
+        (match.away_team_id, away_score, home_score)
+    )
+    for team_id, goals_for, goals_against in sides:
+        league = leagues.get(team_id)
+        if league is None:
+            continue
+        
+        standing = _get_or_create(league, match.season, team_id)
+        standing.played += sign
+        standing.goals_for += sign * goals_for
+        standing.goals_against += sign * goals_against
+        standing.goal_difference = standing.goals_for - standing.goals_against
+        
+        if goals_for > goals_against:
+            standing.wins += sign
+        elif goals_for == goals_against:
+            standing.draws += sign
+        else:
+            standing.losses += sign
+        
+        # Calcular pontos (3 por vitória, 1 por empate)
+        standing.points = standing.wins * 3 + standing.draws
+
+def revert_match(match):
+    """Remove a contribuição de um jogo (ou de um snapshot) da classificação."""
+    apply_match(match, sign=-1)
+
+def move_team_league(team_id, league):
+    """Acompanha a mudança de liga de uma equipa nas linhas já materializadas."""
+    Standing.query.filter_by(team_id=team_id).update(
+        {'league': league}, synchronize_session=False
+    )
+
+def rebuild_standings(seasons=None, team_ids=None):
+    """
+    Reconstrói a classificação a partir dos jogos concluídos.
+    Usado pelo comando de administração para corrigir divergências.
+    Com seasons e/ou team_ids (ex.: depois de uma importação) apenas as
+    linhas dessas temporadas e equipas são reconstruídas.
+    Devolve o número de linhas escritas.
+    """
+    leagues = db.session.query(Team.id, Team.league)
+    matches = (
+        db.session.query(
+            Match.home_team_id,
+            Match.away_team_id,
+            Match.season,
+            Match.home_score,
+            Match.away_score
+        )
+        .filter(Match.status == 'completed')
+    )
+    stale = Standing.query
+    
+    if seasons is not None:
+        matches = matches.filter(Match.season.in_(list(seasons)))
+        stale = stale.filter(Standing.season.in_(list(seasons)))
+    if team_ids is not None:
+        team_ids = set(team_ids)
+        leagues = leagues.filter(Team.id.in_(list(team_ids)))
+        matches = matches.filter(Match.home_team_id.in_(list(team_ids)) | Match.away_team_id.in_(list(team_ids)))
+        stale = stale.filter(Standing.team_id.in_(list(team_ids)))
+    
+    leagues = dict(leagues.all())
+    
+    table = {}
+    for match in matches.yield_per(1000):
+        home_score = match.home_score or 0
+        away_score = match.away_score or 0
+        sides = (
+            (match.home_team_id, home_score, away_score),
+            (match.away_team_id, away_score, home_score)
+        )
+        for team_id, goals_for, goals_against in sides:
+            league = leagues.get(team_id)
+            if league is None:
+                continue
+            
+            row = table.setdefault((league, match.season, team_id), _empty_row(league, match.season, team_id))
+            row['played'] += 1
+            row['goals_for'] += goals_for
+            row['goals_against'] += goals_against
+            if goals_for > goals_against:
+                row['wins'] += 1
+            elif goals_for == goals_against:
+                row['draws'] += 1
+            else:
+                row['losses'] += 1
+    
+    for row in table.values():
+        row['goal_difference'] = row['goals_for'] - row['goals_against']
+        row['points'] = row['wins'] * 3 + row['draws']
+    
+    try:
+        stale.delete(synchronize_session=False)
+        if table:
+            db.session.execute(Standing.__table__.insert(), list(table.values()))
+        versions.rebuilt('teams', 'matches', full=seasons is None and team_ids is None)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return len(table)
+
+def _empty_row(league, season, team_id):
+    return {
+        'league': league,
+        'season': season,
+        'team_id': team_id,
+        'played': 0,
+        'wins': 0,
+        'draws': 0,
+        'losses': 0,
+        'goals_for': 0,
+        'goals_against': 0,
+        'goal_difference': 0,
+        'points': 0
+    }
+
+def _get_or_create(league, season, team_id):
+    standing = Standing.query.filter_by(league=league, season=season, team_id=team_id).first()
+    
+    if not standing:
+        standing = Standing(**_empty_row(league, season, team_id))
+        db.session.add(standing)
+    
+    return standing
@@ -0,0 +1,171 @@
+import threading
+from flask import current_app, g, has_request_context
+from src.main import db
+from src.models import Statistic
+from src.services import versions
+
+# Colunas numéricas da tabela statistics guardadas em memória
+INT_COLUMNS = (
+    'minutes_played', 'goals', 'assists', 'shots', 'shots_on_target',
+    'key_passes', 'dribbles_completed', 'tackles', 'interceptions',
+    'clearances', 'blocks', 'passes', 'passes_completed', 'yellow_cards',
+    'red_cards', 'fouls_committed', 'fouls_suffered', 'saves',
+    'goals_conceded', 'clean_sheets'
+)
+FLOAT_COLUMNS = ('pass_accuracy', 'expected_goals', 'conversion_rate')
+KEY_COLUMNS = ('id', 'player_id', 'match_id', 'team_id')
+
+def use_columnar():
+    """Indica se as rotas devem ler do armazenamento colunar (STATS_BACKEND)."""
+    return current_app.config.get('STATS_BACKEND') == 'columnar'
+
+class StatisticsStore:
+    """
+    Cópia colunar da tabela statistics em arrays NumPy, com as chaves
+    player_id, match_id e team_id (equipa do jogador à data do jogo).
+    
+    A cópia é atualizada de forma incremental: novas linhas (id maior que o
+    último carregado) são acrescentadas; alterações ou remoções de
+    estatísticas forçam um recarregamento completo. O NumPy só é importado
+    na primeira utilização.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Esquece a cópia carregada; a próxima leitura recarrega tudo."""
+        with self._lock:
+            self._data = None
+            self._last_id = 0
+            self._version = None
+    
+    def refresh(self):
+        """
+        Sincroniza a cópia com a base de dados se as versões mudaram. Num
+        pedido as versões são lidas uma só vez, mesmo com várias leituras.
+        """
+        if has_request_context() and '_stats_store_data' in g:
+            return g._stats_store_data
+        
+        data = self._sync()
+        if has_request_context():
+            g._stats_store_data = data
+        return data
+    
+    def _sync(self):
+        version = versions.get_versions('statistics', 'statistics:rewrite')
+        
+        if version == self._version:
+            return self._data
+        
+        with self._lock:
+            if version == self._version:
+                return self._data
+            
+            if self._version is None or version[1:] != self._version[1:]:
+                self._data = self._load(0)
+            else:
+                import numpy as np
+                new_rows = self._load(self._last_id)
+                self._data = {
+                    column: np.concatenate([self._data[column], new_rows[column]])
+                    for column in self._data
+                }
+            
+            if len(self._data['id']) > 0:
+                self._last_id = int(self._data['id'][-1])
+            else:
+                self._last_id = 0
+            self._version = version
+        
+        return self._data
+    
+    def totals(self, columns, **filters):
+        """
+        Soma as colunas indicadas nas linhas que satisfazem os filtros
+        (player_id, match_id ou team_id). Inclui 'count' com o número de linhas.
+        """
+        data = self.refresh()
+        mask = self._mask(data, filters)
+        
+        result = {column: data[column][mask].sum().item() for column in columns}
+        result['count'] = int(mask.sum())
+        return result
+    
+    def rows(self, columns, **filters):
+        """Devolve as linhas filtradas, por ordem de id, como arrays por coluna."""
+        data = self.refresh()
+        mask = self._mask(data, filters)
+        return {column: data[column][mask] for column in columns}
+    
+    def group_sum(self, by, columns, **filters):
+        """
+        Agrupa as linhas filtradas pela chave 'by' e soma as colunas.
+        Devolve {chave: {coluna: soma, 'count': n}}.
+        """
+        import numpy as np
+        
+        data = self.refresh()
+        mask = self._mask(data, filters)
+        
+        keys, inverse, counts = np.unique(data[by][mask], return_inverse=True, return_counts=True)
+        sums = {
+            column: np.bincount(inverse, weights=data[column][mask], minlength=len(keys))
+            for column in columns
+        }
+        
+        groups = {}
+        for i, key in enumerate(keys.tolist()):
+            group = {}
+            for column in columns:
+                value = sums[column][i]
+                group[column] = int(value) if column in INT_COLUMNS else float(value)
+            group['count'] = int(counts[i])
+            groups[key] = group
+        return groups
+    
+    def _mask(self, data, filters):
+        import numpy as np
+        
+        mask = np.ones(len(data['id']), dtype=bool)
+        for column, value in filters.items():
+            if value is not None:
+                mask &= data[column] == value
+        return mask
+    
+    def _load(self, min_id):
+        stat_columns = [getattr(Statistic, column) for column in INT_COLUMNS + FLOAT_COLUMNS]
+        rows = (
+            db.session.query(Statistic.id, Statistic.player_id, Statistic.match_id, Statistic.team_id, *stat_columns)
+            .filter(Statistic.id > min_id)
+            .order_by(Statistic.id)
+            .all()
+        )
+        
+        if not rows:
+            return self._empty()
+        
+        import numpy as np
+        
+        # Valores nulos passam a zero, tal como os defaults do modelo
+        matrix = np.nan_to_num(np.array(rows, dtype=np.float64))
+        
+        data = {}
+        for i, column in enumerate(KEY_COLUMNS + INT_COLUMNS):
+            data[column] = matrix[:, i].astype(np.int64)
+        offset = len(KEY_COLUMNS) + len(INT_COLUMNS)
+        for i, column in enumerate(FLOAT_COLUMNS):
+            data[column] = matrix[:, offset + i]
+        return data
+    
+    def _empty(self):
+        import numpy as np
+        
+        data = {column: np.empty(0, dtype=np.int64) for column in KEY_COLUMNS + INT_COLUMNS}
+        data.update({column: np.empty(0, dtype=np.float64) for column in FLOAT_COLUMNS})
+        return data
+
+# Instância partilhada por processo
+store = StatisticsStore()
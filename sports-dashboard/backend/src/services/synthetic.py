@@ -0,0 +1,349 @@
+import time
+from datetime import date, datetime, timedelta
+from src.main import db
+from src.models import Team, Player, Match, Statistic, MatchEvent
+from src.services import versions
+
+# Composição do plantel e do onze por posição
+SQUAD = (('Goalkeeper', 3), ('Defender', 7), ('Midfielder', 7), ('Forward', 5))
+LINEUP = {'Goalkeeper': 1, 'Defender': 4, 'Midfielder': 4, 'Forward': 2}
+SUBSTITUTES = 3
+
+# Médias por 90 minutos de cada posição (distribuições de Poisson)
+RATES = {
+    'goals':              {'Goalkeeper': 0.0,  'Defender': 0.05, 'Midfielder': 0.12, 'Forward': 0.45},
+    'assists':            {'Goalkeeper': 0.0,  'Defender': 0.05, 'Midfielder': 0.15, 'Forward': 0.2},
+    'shots':              {'Goalkeeper': 0.0,  'Defender': 0.4,  'Midfielder': 1.2,  'Forward': 2.8},
+    'key_passes':         {'Goalkeeper': 0.05, 'Defender': 0.4,  'Midfielder': 1.4,  'Forward': 1.0},
+    'dribbles_completed': {'Goalkeeper': 0.0,  'Defender': 0.4,  'Midfielder': 1.2,  'Forward': 1.6},
+    'tackles':            {'Goalkeeper': 0.05, 'Defender': 2.2,  'Midfielder': 1.8,  'Forward': 0.6},
+    'interceptions':      {'Goalkeeper': 0.1,  'Defender': 1.6,  'Midfielder': 1.1,  'Forward': 0.3},
+    'clearances':         {'Goalkeeper': 0.8,  'Defender': 3.5,  'Midfielder': 0.8,  'Forward': 0.3},
+    'blocks':             {'Goalkeeper': 0.0,  'Defender': 0.6,  'Midfielder': 0.3,  'Forward': 0.1},
+    'passes':             {'Goalkeeper': 28.0, 'Defender': 52.0, 'Midfielder': 58.0, 'Forward': 28.0},
+    'yellow_cards':       {'Goalkeeper': 0.03, 'Defender': 0.22, 'Midfielder': 0.2,  'Forward': 0.12},
+    'red_cards':          {'Goalkeeper': 0.0,  'Defender': 0.01, 'Midfielder': 0.01, 'Forward': 0.005},
+    'fouls_committed':    {'Goalkeeper': 0.05, 'Defender': 1.2,  'Midfielder': 1.1,  'Forward': 1.0},
+    'fouls_suffered':     {'Goalkeeper': 0.1,  'Defender': 0.7,  'Midfielder': 1.2,  'Forward': 1.5},
+    'saves':              {'Goalkeeper': 3.0,  'Defender': 0.0,  'Midfielder': 0.0,  'Forward': 0.0}
+}
+PASS_ACCURACY = {'Goalkeeper': 0.7, 'Defender': 0.85, 'Midfielder': 0.84, 'Forward': 0.74}
+
+COUNTRIES = ('Portugal', 'Spain', 'England', 'Italy', 'Germany', 'France', 'Netherlands', 'Belgium', 'Brazil', 'Argentina')
+CITIES = (
+    'Porto', 'Lisboa', 'Braga', 'Faro', 'Aveiro', 'Coimbra', 'Leiria', 'Viseu', 'Évora', 'Setúbal',
+    'Madrid', 'Sevilha', 'Valência', 'Bilbau', 'Vigo', 'Milão', 'Turim', 'Nápoles', 'Roma', 'Génova',
+    'Lyon', 'Lille', 'Nantes', 'Munique', 'Colónia', 'Leeds', 'Bristol', 'Gante', 'Utrecht', 'Santos'
+)
+CLUB_SUFFIXES = ('FC', 'United', 'Atlético', 'Sporting', 'City', 'Athletic', 'Real', 'Académica')
+FIRST_NAMES = (
+    'João', 'Pedro', 'Rui', 'Tiago', 'André', 'Diogo', 'Nuno', 'Bruno', 'Luís', 'Miguel',
+    'Carlos', 'Pablo', 'Marco', 'Luca', 'Jonas', 'Tom', 'Hugo', 'Léo', 'Mateus', 'Rafael'
+)
+LAST_NAMES = (
+    'Silva', 'Santos', 'Ferreira', 'Costa', 'Oliveira', 'Martins', 'Sousa', 'Gomes', 'Lopes', 'Pereira',
+    'García', 'Rossi', 'Müller', 'Dubois', 'Smith', 'Jansen', 'Peeters', 'Moreira', 'Alves', 'Ribeiro'
+)
+
+def generate(leagues=10, teams_per_league=20, seasons=10, first_season=2015, scheduled_rounds=2,
+             squad_size=22, seed=42, events=True, reset=False):
+    """
+    Preenche teams, players, matches e statistics com dados sintéticos
+    determinísticos (a mesma seed gera sempre os mesmos dados).
+    
+    Cada liga joga um campeonato a duas voltas por temporada; todos os
+    jogos são concluídos com estatísticas completas por jogador, exceto as
+    últimas scheduled_rounds jornadas da temporada mais recente, que ficam
+    agendadas. Os resultados são a soma dos golos dos jogadores. As linhas
+    são escritas com Core, uma transação por liga e temporada, e as tabelas
+    derivadas são reconstruídas no fim. Devolve o resumo com as contagens.
+    """
+    import numpy as np
+    
+    if teams_per_league < 2 or teams_per_league % 2:
+        raise ValueError('teams_per_league deve ser par e maior ou igual a 2.')
+    
+    if reset:
+        db.drop_all()
+        db.create_all()
+    elif db.session.query(Team.id).first() is not None:
+        raise RuntimeError('A base de dados já tem equipas; use reset para a recriar.')
+    
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    squad_size = max(squad_size, sum(count for _, count in SQUAD))
+    
+    team_ids = _insert_teams(rng, leagues, teams_per_league)
+    squads = _insert_players(rng, team_ids, squad_size, first_season)
+    # Força relativa de cada equipa (multiplica as médias ofensivas)
+    strength = dict(zip(
+        [team_id for league_teams in team_ids for team_id in league_teams],
+        rng.lognormal(0.0, 0.2, size=leagues * teams_per_league).tolist()
+    ))
+    
+    summary = {'teams': leagues * teams_per_league, 'players': 0, 'matches': 0, 'statistics': 0, 'match_events': 0}
+    summary['players'] = sum(sum(len(ids) for ids in squad.values()) for squad in squads.values())
+    
+    for league, league_teams in enumerate(team_ids):
+        for offset in range(seasons):
+            year = first_season + offset
+            scheduled = scheduled_rounds if offset == seasons - 1 else 0
+            counts = _insert_season(rng, f'Liga {league + 1}', year, league_teams, squads, strength, scheduled, events)
+            for table, count in counts.items():
+                summary[table] += count
+    
+    # Escritas em Core: invalidar tudo o que depende destas tabelas
+    versions.bump(*[f'{table}:rewrite' for table in versions.TRACKED_TABLES], *versions.TRACKED_TABLES)
+    db.session.commit()
+    
+    summary['rebuilt'] = rebuild_derived()
+    summary['seed'] = seed
+    summary['seconds'] = round(time.perf_counter() - started, 2)
+    return summary
+
+def rebuild_derived():
+    """Reconstrói as tabelas derivadas depois de uma carga em Core."""
+    from src.services import head_to_head, player_rollup, ratings, standings, team_match_stats
+    
+    rebuilt = {}
+    for name, rebuild in (
+        ('standings', standings.rebuild_standings),
+        ('head_to_head', head_to_head.rebuild_head_to_head),
+        ('player_season_stats', player_rollup.rebuild_player_season_stats),
+        ('team_match_stats', team_match_stats.rebuild_team_match_stats),
+        ('player_ratings', ratings.rebuild_ratings)
+    ):
+        rebuilt[name] = rebuild()
+    return rebuilt
+
+def round_robin(team_ids):
+    """Jornadas de um campeonato a duas voltas (método do círculo): [[(casa, fora), ...], ...]."""
+    teams = list(team_ids)
+    half = len(teams) // 2
+    rounds = []
+    for number in range(len(teams) - 1):
+        pairs = [(teams[i], teams[-1 - i]) for i in range(half)]
+        # Alternar o visitado para equilibrar jogos em casa
+        rounds.append([pair if number % 2 else pair[::-1] for pair in pairs])
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return rounds + [[(away, home) for home, away in games] for games in rounds]
+
+def _insert_teams(rng, leagues, teams_per_league):
+    rows = []
+    for league in range(leagues):
+        country = COUNTRIES[league % len(COUNTRIES)]
+        for number in range(teams_per_league):
+            index = league * teams_per_league + number
+            rows.append({
+                'name': f'{CITIES[index % len(CITIES)]} {CLUB_SUFFIXES[(index // len(CITIES)) % len(CLUB_SUFFIXES)]} {index + 1}',
+                'country': country,
+                'league': f'Liga {league + 1}',
+                'founded_year': int(rng.integers(1880, 2000))
+            })
+    
+    db.session.execute(Team.__table__.insert(), rows)
+    db.session.commit()
+    
+    ids = [row.id for row in db.session.query(Team.id).order_by(Team.id)]
+    return [ids[i:i + teams_per_league] for i in range(0, len(ids), teams_per_league)]
+
+def _insert_players(rng, team_ids, squad_size, first_season):
+    positions = [position for position, count in SQUAD for _ in range(count)]
+    positions += [('Defender', 'Midfielder', 'Forward')[i % 3] for i in range(squad_size - len(positions))]
+    
+    rows = []
+    for league_teams in team_ids:
+        for team_id in league_teams:
+            for number, position in enumerate(positions, start=1):
+                rows.append({
+                    'name': f'{FIRST_NAMES[rng.integers(len(FIRST_NAMES))]} {LAST_NAMES[rng.integers(len(LAST_NAMES))]} {team_id}-{number}',
+                    'position': position,
+                    'nationality': COUNTRIES[rng.integers(len(COUNTRIES))],
+                    'birth_date': date(first_season - int(rng.integers(18, 36)), int(rng.integers(1, 13)), int(rng.integers(1, 29))),
+                    'height': round(float(rng.normal(181, 6)), 1),
+                    'weight': round(float(rng.normal(76, 6)), 1),
+                    'jersey_number': number,
+                    'team_id': team_id
+                })
+    
+    db.session.execute(Player.__table__.insert(), rows)
+    db.session.commit()
+    
+    squads = {}
+    for player_id, team_id, position in db.session.query(Player.id, Player.team_id, Player.position).order_by(Player.id):
+        squads.setdefault(team_id, {}).setdefault(position, []).append(player_id)
+    return squads
+
+def _lineup(rng, squad):
+    """
+    Onze inicial e suplentes utilizados: [(player_id, posição, minutos,
+    minuto de entrada, player_id substituído)].
+    """
+    starters = []
+    for position, count in LINEUP.items():
+        for player_id in rng.choice(squad[position], size=count, replace=False).tolist():
+            starters.append([player_id, position, 90, 0, None])
+    
+    used = {row[0] for row in starters}
+    bench = [(player_id, position) for position in ('Defender', 'Midfielder', 'Forward') for player_id in squad[position] if player_id not in used]
+    
+    substitutes = []
+    replaced = rng.choice(range(1, len(starters)), size=SUBSTITUTES, replace=False).tolist()
+    for slot, pick in zip(replaced, rng.choice(len(bench), size=SUBSTITUTES, replace=False).tolist()):
+        minute = int(rng.integers(55, 86))
+        starters[slot][2] = minute
+        substitutes.append([bench[pick][0], bench[pick][1], 90 - minute, minute, starters[slot][0]])
+    return starters + substitutes
+
+def _insert_season(rng, league, year, team_ids, squads, strength, scheduled_rounds, events):
+    import numpy as np
+    
+    season = f'{year}-{year + 1}'
+    rounds = round_robin(team_ids)
+    kickoff = datetime(year, 8, 1, 15, 0)
+    # Primeiro sábado da temporada
+    kickoff += timedelta(days=(5 - kickoff.weekday()) % 7)
+    
+    fixtures = []
+    for number, games in enumerate(rounds):
+        completed = number < len(rounds) - scheduled_rounds
+        for slot, (home, away) in enumerate(games):
+            fixtures.append((kickoff + timedelta(weeks=number, hours=2 * (slot % 3)), home, away, completed))
+    
+    # Linhas de estatísticas de todos os jogos concluídos, geradas em bloco
+    lines = []
+    for index, (_, home, away, completed) in enumerate(fixtures):
+        if not completed:
+            continue
+        for team_id, is_home in ((home, True), (away, False)):
+            # Vantagem de jogar em casa nas médias ofensivas
+            attack = strength[team_id] * (1.1 if is_home else 0.9)
+            for player_id, position, minutes, start, replaced in _lineup(rng, squads[team_id]):
+                lines.append((index, team_id, player_id, position, minutes, attack, start, replaced))
+    
+    count = len(lines)
+    positions = [line[3] for line in lines]
+    minutes = np.array([line[4] for line in lines], dtype=np.float64)
+    attack = np.array([line[5] for line in lines])
+    share = minutes / 90.0
+    
+    values = {'minutes_played': minutes.astype(np.int64)}
+    for field, rates in RATES.items():
+        mean = np.array([rates[position] for position in positions]) * share
+        if field in ('goals', 'assists', 'shots', 'key_passes'):
+            mean = mean * attack
+        values[field] = rng.poisson(mean) if count else np.zeros(0, dtype=np.int64)
+    
+    # Coerência entre colunas: remates >= remates enquadrados >= golos
+    values['shots'] = np.maximum(values['shots'], values['goals'])
+    values['shots_on_target'] = values['goals'] + rng.binomial(values['shots'] - values['goals'], 0.35)
+    accuracy = np.clip(np.array([PASS_ACCURACY[position] for position in positions]) + rng.normal(0, 0.05, count), 0.4, 1.0)
+    values['passes_completed'] = rng.binomial(values['passes'], accuracy)
+    values['expected_goals'] = np.round(values['shots'] * 0.09 + values['shots_on_target'] * 0.06, 2)
+    
+    # Resultado de cada jogo e golos sofridos pelos guarda-redes
+    scores = {}
+    for line, goals in zip(lines, values['goals'].tolist()):
+        scores[(line[0], line[1])] = scores.get((line[0], line[1]), 0) + goals
+    opponent = {}
+    for index, (_, home, away, completed) in enumerate(fixtures):
+        opponent[(index, home)] = scores.get((index, away), 0)
+        opponent[(index, away)] = scores.get((index, home), 0)
+    
+    goalkeeper = np.array([position == 'Goalkeeper' for position in positions])
+    conceded = np.array([opponent[(line[0], line[1])] for line in lines], dtype=np.int64)
+    values['goals_conceded'] = np.where(goalkeeper, conceded, 0)
+    values['clean_sheets'] = goalkeeper & (conceded == 0) & (minutes >= 90)
+    
+    passes = values['passes'].astype(np.float64)
+    shots = values['shots'].astype(np.float64)
+    values['pass_accuracy'] = np.round(np.divide(values['passes_completed'] * 100.0, passes, out=np.zeros(count), where=passes > 0), 1)
+    values['conversion_rate'] = np.round(np.divide(values['goals'] * 100.0, shots, out=np.zeros(count), where=shots > 0), 1)
+    
+    try:
+        db.session.execute(Match.__table__.insert(), [
+            {
+                'date': when,
+                'home_team_id': home,
+                'away_team_id': away,
+                'home_score': scores.get((index, home), 0) if completed else 0,
+                'away_score': scores.get((index, away), 0) if completed else 0,
+                'season': season,
+                'competition': league,
+                'venue': f'Estádio {home}',
+                'status': 'completed' if completed else 'scheduled'
+            }
+            for index, (when, home, away, completed) in enumerate(fixtures)
+        ])
+        # Os ids são atribuídos pela ordem de inserção
+        match_ids = [
+            row.id for row in db.session.query(Match.id)
+            .filter(Match.competition == league, Match.season == season)
+            .order_by(Match.id)
+        ]
+        
+        columns = {field: array.tolist() for field, array in values.items()}
+        statistics = []
+        for i, line in enumerate(lines):
+            row = {field: column[i] for field, column in columns.items()}
+            row['match_id'] = match_ids[line[0]]
+            row['player_id'] = line[2]
+            row['team_id'] = line[1]
+            statistics.append(row)
+        if statistics:
+            db.session.execute(Statistic.__table__.insert(), statistics)
+        
+        timeline = _events(rng, lines, columns, match_ids) if events else []
+        if timeline:
+            db.session.execute(MatchEvent.__table__.insert(), timeline)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return {'matches': len(fixtures), 'statistics': len(statistics), 'match_events': len(timeline)}
+
+def _events(rng, lines, columns, match_ids):
+    # Substituições, golos (com assistência de um colega) e cartões, em
+    # minutos aleatórios enquanto o jogador esteve em campo
+    teammates = {}
+    for i, line in enumerate(lines):
+        teammates.setdefault((line[0], line[1]), []).append(i)
+    
+    timeline = []
+    for i, line in enumerate(lines):
+        index, team_id, player_id, start, replaced = line[0], line[1], line[2], line[6], line[7]
+        played = max(columns['minutes_played'][i], 1)
+        if replaced is not None:
+            timeline.append({
+                'match_id': match_ids[index],
+                'team_id': team_id,
+                'player_id': player_id,
+                'related_player_id': replaced,
+                'type': 'substitution',
+                'minute': start,
+                'second': 0
+            })
+        for _ in range(columns['goals'][i]):
+            others = [j for j in teammates[(index, team_id)] if j != i and columns['assists'][j] > 0]
+            timeline.append({
+                'match_id': match_ids[index],
+                'team_id': team_id,
+                'player_id': player_id,
+                'related_player_id': lines[others[rng.integers(len(others))]][2] if others else None,
+                'type': 'goal',
+                'minute': start + int(rng.integers(1, played + 1)),
+                'second': int(rng.integers(0, 60))
+            })
+        for card in ('yellow_card', 'red_card'):
+            for _ in range(columns[f'{card}s'][i]):
+                timeline.append({
+                    'match_id': match_ids[index],
+                    'team_id': team_id,
+                    'player_id': player_id,
+                    'related_player_id': None,
+                    'type': card,
+                    'minute': start + int(rng.integers(1, played + 1)),
+                    'second': int(rng.integers(0, 60))
+                })
+    return timeline
@@ -0,0 +1,206 @@
+from itertools import chain
+from sqlalchemy import event, func, inspect, select, text
+from sqlalchemy.orm import Session
+from src.main import db
+from src.models import Match, Player, Statistic, TeamMatchStat
+from src.services import versions
+
+# Colunas de statistics somadas no box score de cada equipa
+BOX_SCORE_FIELDS = ('passes', 'passes_completed', 'shots', 'shots_on_target')
+
+def possession_split(home_passes, away_passes):
+    """Posse de bola (%) estimada pela quota de passes; (None, None) sem passes."""
+    total_passes = home_passes + away_passes
+    if total_passes <= 0:
+        return None, None
+    
+    home_possession = round(home_passes / total_passes * 100, 1)
+    return home_possession, round(100 - home_possession, 1)
+
+def pass_accuracy(passes, passes_completed):
+    """Precisão de passes (%); None sem passes."""
+    if passes <= 0:
+        return None
+    return round(passes_completed / passes * 100, 1)
+
+def refresh_matches(match_ids, connection=None):
+    """
+    Recalcula o box score por equipa dos jogos indicados. Só jogos
+    concluídos e com estatísticas têm linhas; as restantes são removidas.
+    Usa Core na ligação da transação corrente (não faz commit), pelo que
+    pode correr dentro de um flush.
+    """
+    match_ids = sorted({match_id for match_id in match_ids if match_id is not None})
+    if not match_ids:
+        return
+    
+    connection = connection or db.session.connection()
+    matches_table = Match.__table__
+    stats_table = Statistic.__table__
+    table = TeamMatchStat.__table__
+    
+    matches = {
+        row.id: row
+        for row in connection.execute(
+            select(matches_table.c.id, matches_table.c.home_team_id, matches_table.c.away_team_id, matches_table.c.season)
+            .where(matches_table.c.id.in_(match_ids), matches_table.c.status == 'completed')
+        )
+    }
+    
+    totals = {}
+    if matches:
+        # Cada linha conta para a equipa registada na escrita (à data do jogo)
+        rows = connection.execute(
+            select(
+                stats_table.c.match_id,
+                stats_table.c.team_id,
+                *[func.coalesce(func.sum(stats_table.c[field]), 0) for field in BOX_SCORE_FIELDS]
+            )
+            .where(stats_table.c.match_id.in_(list(matches)))
+            .group_by(stats_table.c.match_id, stats_table.c.team_id)
+        )
+        for match_id, team_id, *sums in rows:
+            totals[(match_id, team_id)] = dict(zip(BOX_SCORE_FIELDS, sums))
+    
+    records = []
+    for match_id, match in matches.items():
+        # Sem estatísticas, ou jogo inválido de uma equipa contra si própria
+        if match.home_team_id == match.away_team_id or not any(key[0] == match_id for key in totals):
+            continue
+        
+        empty = dict.fromkeys(BOX_SCORE_FIELDS, 0)
+        home = totals.get((match_id, match.home_team_id), empty)
+        away = totals.get((match_id, match.away_team_id), empty)
+        home_possession, away_possession = possession_split(home['passes'], away['passes'])
+        
+        for team_id, is_home, box, possession in (
+            (match.home_team_id, True, home, home_possession),
+            (match.away_team_id, False, away, away_possession)
+        ):
+            records.append({
+                'match_id': match_id,
+                'team_id': team_id,
+                'is_home': is_home,
+                'season': match.season,
+                **box,
+                'possession': possession,
+                'pass_accuracy': pass_accuracy(box['passes'], box['passes_completed'])
+            })
+    
+    connection.execute(table.delete().where(table.c.match_id.in_(match_ids)))
+    if records:
+        connection.execute(table.insert(), records)
+
+def rebuild_team_match_stats():
+    """
+    Recalcula o box score de todos os jogos. Estatísticas sem equipa
+    registada (anteriores à coluna statistics.team_id) ficam com a equipa
+    atual do jogador. Devolve o número de linhas.
+    """
+    try:
+        backfill_statistic_teams()
+        db.session.execute(TeamMatchStat.__table__.delete())
+        match_ids = [row.id for row in db.session.query(Match.id).filter(Match.status == 'completed')]
+        for start in range(0, len(match_ids), 500):
+            refresh_matches(match_ids[start:start + 500])
+        rows = TeamMatchStat.query.count()
+        versions.rebuilt('matches', 'statistics')
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return rows
+
+def backfill_statistic_teams():
+    """
+    Acrescenta a coluna statistics.team_id e os seus índices a bases de
+    dados criadas antes dela e preenche as linhas sem equipa com a equipa
+    atual do jogador (a melhor informação disponível). Não faz commit.
+    """
+    engine = db.engine
+    if 'team_id' not in {column['name'] for column in inspect(engine).get_columns('statistics')}:
+        db.session.execute(text('ALTER TABLE statistics ADD COLUMN team_id INTEGER REFERENCES teams (id)'))
+    for index in Statistic.__table__.indexes:
+        index.create(db.session.connection(), checkfirst=True)
+    
+    stats_table = Statistic.__table__
+    players_table = Player.__table__
+    db.session.execute(
+        stats_table.update()
+        .where(stats_table.c.team_id.is_(None))
+        .values(team_id=select(players_table.c.team_id).where(players_table.c.id == stats_table.c.player_id).scalar_subquery())
+    )
+
+def _before_flush(session, flush_context, instances):
+    # Estatísticas novas, ou que mudaram de jogador, ficam atribuídas à
+    # equipa atual do jogador; mais tarde uma transferência não as altera.
+    # A equipa (atribuída ou indicada) tem de ser uma das duas do jogo
+    written = [
+        obj for obj in chain(session.new, session.dirty)
+        if isinstance(obj, Statistic) and (
+            obj in session.new
+            or any(inspect(obj).attrs[field].history.has_changes() for field in ('player_id', 'match_id', 'team_id'))
+        )
+    ]
+    pending = [
+        obj for obj in written
+        if obj.player_id is not None and (
+            (obj in session.new and obj.team_id is None)
+            or (obj in session.dirty and inspect(obj).attrs['player_id'].history.has_changes()
+                and not inspect(obj).attrs['team_id'].history.has_changes())
+        )
+    ]
+    if pending:
+        players_table = Player.__table__
+        teams = dict(session.connection().execute(
+            select(players_table.c.id, players_table.c.team_id)
+            .where(players_table.c.id.in_({obj.player_id for obj in pending}))
+        ).all())
+        for obj in pending:
+            obj.team_id = teams.get(obj.player_id)
+    
+    if written:
+        matches_table = Match.__table__
+        match_teams = {
+            row.id: (row.home_team_id, row.away_team_id)
+            for row in session.connection().execute(
+                select(matches_table.c.id, matches_table.c.home_team_id, matches_table.c.away_team_id)
+                .where(matches_table.c.id.in_({obj.match_id for obj in written if obj.match_id is not None}))
+            )
+        }
+        for obj in written:
+            # Jogo ainda por inserir, ligado pela relação
+            match = obj.__dict__.get('match')
+            sides = match_teams.get(obj.match_id) or ((match.home_team_id, match.away_team_id) if match else None)
+            if sides and obj.team_id not in sides:
+                raise ValueError(f'A equipa {obj.team_id} não participa no jogo {obj.match_id}.')
+    
+    # Linhas de jogos removidos saem antes do DELETE (chave estrangeira)
+    match_ids = {obj.id for obj in session.deleted if isinstance(obj, Match)}
+    if match_ids:
+        table = TeamMatchStat.__table__
+        session.connection().execute(table.delete().where(table.c.match_id.in_(match_ids)))
+
+def _after_flush(session, flush_context):
+    # Jogos cujo box score pode ter mudado: estatísticas escritas (jogo
+    # antigo e novo) e jogos criados ou alterados
+    match_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, Statistic):
+            match_ids.add(obj.match_id)
+            match_ids.update(inspect(obj).attrs['match_id'].history.deleted or [])
+        elif isinstance(obj, Match) and obj not in session.deleted:
+            match_ids.add(obj.id)
+    
+    if match_ids:
+        refresh_matches(match_ids, session.connection())
+
+def register_listeners():
+    """Mantém o box score por equipa atualizado a cada flush de jogos ou estatísticas."""
+    if not event.contains(Session, 'before_flush', _before_flush):
+        event.listen(Session, 'before_flush', _before_flush)
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
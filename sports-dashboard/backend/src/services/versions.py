@@ -0,0 +1,129 @@
+from itertools import chain
+from sqlalchemy import bindparam, event, inspect, select
+from sqlalchemy.orm import Session
+from src.main import db
+from src.models import DataVersion
+
+# Tabelas cujas escritas invalidam caches e respostas derivadas
+TRACKED_TABLES = ('teams', 'players', 'matches', 'statistics', 'match_events')
+
+# Colunas que dão origem a versões por entidade, ex.: 'players:team_id:3'
+# (qualquer escrita em jogadores da equipa 3) ou 'matches:id:7'
+ENTITY_COLUMNS = {
+    'teams': ('id',),
+    'players': ('id', 'team_id'),
+    'matches': ('id', 'home_team_id', 'away_team_id'),
+    'statistics': ('player_id', 'match_id'),
+    'match_events': ('match_id',)
+}
+
+# Âmbito incrementado por cada reconstrução completa de tabelas derivadas;
+# entra em todas as ETags de @conditional (utils.conditional)
+REBUILD_SCOPE = 'rebuild'
+
+def bump(*scopes, session=None):
+    """
+    Incrementa a versão de cada âmbito na transação corrente.
+    Escritas feitas pelo ORM são contadas automaticamente; caminhos que
+    escrevem diretamente com Core (inserções em lote) devem chamar esta função.
+    O número de instruções não depende do número de âmbitos.
+    """
+    connection = (session or db.session).connection()
+    table = DataVersion.__table__
+    scopes = sorted(set(scopes))
+    
+    existing = set(connection.execute(
+        select(table.c.scope).where(table.c.scope.in_(scopes))
+    ).scalars())
+    
+    if existing:
+        connection.execute(
+            table.update()
+            .where(table.c.scope == bindparam('target'))
+            .values(version=table.c.version + 1),
+            [{'target': scope} for scope in sorted(existing)]
+        )
+    missing = [scope for scope in scopes if scope not in existing]
+    if missing:
+        connection.execute(table.insert(), [{'scope': scope, 'version': 1} for scope in missing])
+
+def rebuilt(*scopes, full=True, session=None):
+    """
+    Incrementa as versões depois de reconstruir tabelas derivadas, na
+    transação corrente. scopes são os âmbitos globais das tabelas de origem
+    (caches de análises e gráficos, cópias em memória). Uma reconstrução
+    completa incrementa também REBUILD_SCOPE, porque as versões por entidade
+    (ex.: 'teams:id:3') não são enumeradas e as ETags ficariam válidas.
+    """
+    bump(*scopes, *((REBUILD_SCOPE,) if full else ()), session=session)
+
+def entity_scope(table, column, value):
+    """Nome do âmbito de versão de uma entidade (ex.: 'matches:id:7')."""
+    return f'{table}:{column}:{value}'
+
+def row_scopes(table, rows):
+    """
+    Âmbitos por entidade afetados por linhas escritas fora do ORM
+    (dicionários com as colunas de ENTITY_COLUMNS).
+    """
+    return {
+        entity_scope(table, column, row[column])
+        for row in rows
+        for column in ENTITY_COLUMNS.get(table, ())
+        if row.get(column) is not None
+    }
+
+def set_version(scope, version, session=None):
+    """Regista um valor de versão (ex.: a versão de origem já processada)."""
+    connection = (session or db.session).connection()
+    table = DataVersion.__table__
+    
+    result = connection.execute(
+        table.update().where(table.c.scope == scope).values(version=version)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(scope=scope, version=version))
+
+def get_versions(*scopes):
+    """Devolve as versões atuais dos âmbitos pedidos, pela mesma ordem."""
+    rows = dict(
+        db.session.query(DataVersion.scope, DataVersion.version)
+        .filter(DataVersion.scope.in_(scopes))
+        .all()
+    )
+    return tuple(rows.get(scope, 0) for scope in scopes)
+
+def _object_scopes(obj, table, include_old=False):
+    scopes = {table}
+    for column in ENTITY_COLUMNS.get(table, ()):
+        values = [getattr(obj, column)]
+        if include_old:
+            values.extend(inspect(obj).attrs[column].history.deleted or [])
+        scopes.update(entity_scope(table, column, value) for value in values if value is not None)
+    return scopes
+
+def _after_flush(session, flush_context):
+    # Neste ponto new/dirty/deleted ainda refletem o que foi escrito no flush.
+    # Alterações e remoções incrementam também '<tabela>:rewrite', o que permite
+    # a quem mantém cópias incrementais distinguir simples inserções. Cada
+    # escrita incrementa ainda as versões das entidades tocadas (valores antigos
+    # e novos), usadas pelas ETags das rotas de detalhe.
+    scopes = set()
+    for obj in session.new:
+        table = getattr(obj, '__tablename__', None)
+        if table in TRACKED_TABLES:
+            scopes.update(_object_scopes(obj, table))
+    
+    for obj in chain(session.dirty, session.deleted):
+        table = getattr(obj, '__tablename__', None)
+        if table in TRACKED_TABLES and (obj in session.deleted or session.is_modified(obj)):
+            scopes.update(_object_scopes(obj, table, include_old=True))
+            scopes.add(f'{table}:rewrite')
+    
+    if scopes:
+        bump(*scopes, session=session)
+
+def register_listeners():
+    """Liga a contagem de versões aos flushes de todas as sessões."""
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
@@ -0,0 +1 @@
+# Funções utilitárias partilhadas pelas rotas
@@ -0,0 +1,42 @@
+import hashlib
+from functools import wraps
+from flask import make_response, request
+from src.services import versions
+
+# Respostas privadas (autenticadas) que o cliente deve sempre revalidar
+CACHE_CONTROL = 'private, no-cache'
+
+def conditional(*scopes):
+    """
+    Pedidos condicionais (ETag / If-None-Match) para rotas de leitura.
+    
+    A ETag deriva das versões dos âmbitos indicados (ver services.versions),
+    do caminho com a query string e do cabeçalho Accept. Os âmbitos podem
+    usar argumentos da rota, ex.: 'matches:id:{match_id}'; o âmbito das
+    reconstruções (versions.REBUILD_SCOPE) entra sempre. Se o cliente já
+    tem a representação atual recebe 304 depois de uma única leitura de
+    data_versions, sem executar a vista.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            resolved = [scope.format(**kwargs) for scope in scopes] + [versions.REBUILD_SCOPE]
+            etag = compute_etag(versions.get_versions(*resolved))
+            
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
+def compute_etag(version):
+    """ETag da representação pedida para um tuplo de versões."""
+    key = '|'.join([request.full_path, request.headers.get('Accept', ''), repr(version)])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:32]
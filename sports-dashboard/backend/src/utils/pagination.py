@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+from flask import request
+from sqlalchemy import literal, tuple_, DateTime
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+def encode_cursor(values):
+    """Codifica os valores da chave de ordenação num cursor opaco."""
+    payload = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor, columns):
+    """Descodifica um cursor; levanta ValueError se for inválido."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise ValueError('Cursor inválido.')
+    
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Cursor inválido.')
+    
+    decoded = []
+    for column, value in zip(columns, values):
+        if isinstance(column.type, DateTime):
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise ValueError('Cursor inválido.')
+        decoded.append(value)
+    return decoded
+
+def paginate(query, columns, descending=False):
+    """
+    Paginação por chave (keyset) sobre as colunas indicadas, que devem
+    identificar cada linha de forma única (ex.: data e id).
+    Lê 'limit', 'cursor' e 'include_total' dos argumentos do pedido.
+    Ao contrário de OFFSET, o custo de uma página não depende da sua posição.
+    Devolve (itens, metadados de paginação); levanta ValueError se o cursor for inválido.
+    """
+    limit = request.args.get('limit', default=DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, MAX_LIMIT))
+    cursor = request.args.get('cursor')
+    include_total = request.args.get('include_total', default='false').lower() == 'true'
+    
+    pagination = {'limit': limit}
+    
+    if include_total:
+        pagination['total'] = query.order_by(None).count()
+    
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.filter(_after(columns, values, descending))
+    
+    order = [column.desc() if descending else column.asc() for column in columns]
+    items = query.order_by(*order).limit(limit + 1).all()
+    
+    has_more = len(items) > limit
+    items = items[:limit]
+    
+    pagination['next_cursor'] = (
+        encode_cursor([getattr(items[-1], column.key) for column in columns])
+        if has_more else None
+    )
+    
+    return items, pagination
+
+def _after(columns, values, descending):
+    # (c1, c2, ...) estritamente depois de (v1, v2, ...) na ordem pedida.
+    # A comparação de tuplos deixa o planeador saltar pelo índice até ao
+    # cursor; a forma expandida (c1 < v1 OR (c1 = v1 AND ...)) percorria o
+    # índice desde o início, tornando as páginas tardias mais caras
+    key = tuple_(*columns)
+    cursor = tuple_(*[literal(value, column.type) for column, value in zip(columns, values)])
+    return key < cursor if descending else key > cursor
@@ -0,0 +1,103 @@
+import re
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Listas de parâmetros (IN, VALUES) reduzidas a um só marcador: a forma da
+# instrução não depende do número de valores
+PARAMETER_LIST = re.compile(r'\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)')
+REPEATED_VALUES = re.compile(r'(\(\?\))(?:\s*,\s*\(\?\))+')
+WHITESPACE = re.compile(r'\s+')
+
+MODES = ('off', 'warn', 'raise')
+
+class QueryBudgetExceeded(Exception):
+    """Uma rota executou mais instruções SQL do que o orçamento declarado."""
+
+def query_budget(limit):
+    """
+    Declara o número máximo de instruções SQL de uma rota, contando tudo o
+    que corre no pedido (incluindo a leitura de versões do @conditional).
+    Em modo 'raise' (testes) exceder o orçamento faz o pedido falhar; em
+    'warn' (desenvolvimento) fica no log. O orçamento deve ser constante:
+    uma rota cujo número de consultas cresce com as linhas tem um N+1.
+    """
+    def decorator(view):
+        # Os decoradores com functools.wraps copiam o atributo para fora
+        view.query_budget = limit
+        return view
+    return decorator
+
+def statement_shape(statement):
+    """Forma normalizada de uma instrução SQL (listas de parâmetros colapsadas)."""
+    shape = WHITESPACE.sub(' ', statement).strip()
+    shape = PARAMETER_LIST.sub('(?)', shape)
+    return REPEATED_VALUES.sub(r'\1', shape)
+
+def budget_mode(app):
+    """Modo configurado (QUERY_BUDGET_MODE) ou, por omissão, 'raise' em testes e 'warn' em debug."""
+    mode = app.config.get('QUERY_BUDGET_MODE')
+    if mode is None:
+        mode = 'raise' if app.testing else 'warn' if app.debug else 'off'
+    if mode not in MODES:
+        raise ValueError(f'QUERY_BUDGET_MODE inválido. Use {", ".join(MODES)}.')
+    return mode
+
+def init_app(app):
+    """
+    Regista as instruções SQL de cada pedido (modos 'warn' e 'raise').
+    No fim do pedido assinala instruções com a mesma forma repetidas pelo
+    menos QUERY_REPEAT_THRESHOLD vezes (sinal de N+1) e verifica o orçamento
+    declarado com @query_budget. As respostas levam os cabeçalhos
+    X-Query-Count e, se houver repetições, X-Query-Repeats.
+    """
+    if budget_mode(app) == 'off':
+        return
+    
+    if not event.contains(Engine, 'before_cursor_execute', _record):
+        event.listen(Engine, 'before_cursor_execute', _record)
+    app.before_request(_start)
+    app.after_request(_check)
+
+def repeated_shapes(statements, threshold):
+    """Formas executadas pelo menos threshold vezes: [(forma, vezes)], mais repetidas primeiro."""
+    counts = Counter(statement_shape(statement) for statement in statements)
+    return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        statements = g.get('_query_log')
+        if statements is not None:
+            statements.append(statement)
+
+def _start():
+    g._query_log = []
+
+def _check(response):
+    statements = g.pop('_query_log', None)
+    if statements is None:
+        return response
+    
+    app = current_app
+    mode = budget_mode(app)
+    repeats = repeated_shapes(statements, app.config.get('QUERY_REPEAT_THRESHOLD', 5))
+    
+    # Em respostas em streaming só conta as instruções anteriores ao envio
+    response.headers['X-Query-Count'] = str(len(statements))
+    if repeats:
+        response.headers['X-Query-Repeats'] = str(sum(count for _, count in repeats))
+        for shape, count in repeats:
+            app.logger.warning('Possível N+1 em %s: %d× %s', request.endpoint, count, shape)
+    
+    view = app.view_functions.get(request.endpoint)
+    limit = getattr(view, 'query_budget', None)
+    if limit is not None and len(statements) > limit:
+        message = f'{request.method} {request.path} ({request.endpoint}) executou {len(statements)} instruções SQL; orçamento: {limit}.'
+        if repeats:
+            message += ' Repetidas: ' + '; '.join(f'{count}× {shape}' for shape, count in repeats)
+        if mode == 'raise':
+            raise QueryBudgetExceeded(message)
+        app.logger.warning(message)
+    
+    return response
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from flask import Response, request, stream_with_context
+
+# Número de linhas lidas da base de dados de cada vez
+YIELD_PER = 1000
+
+def stream_format():
+    """
+    Formato de streaming pedido pelo cliente ('ndjson' ou 'csv'), via
+    ?format= ou cabeçalho Accept. Devolve None para a resposta JSON habitual.
+    """
+    fmt = request.args.get('format', '').lower()
+    if fmt in ('ndjson', 'csv'):
+        return fmt
+    
+    accept = request.headers.get('Accept', '')
+    if 'application/x-ndjson' in accept:
+        return 'ndjson'
+    if 'text/csv' in accept:
+        return 'csv'
+    return None
+
+def stream_query(query, fmt, filename):
+    """
+    Escreve as linhas de uma consulta à medida que são lidas, em NDJSON ou CSV.
+    A consulta deve devolver linhas de colunas (with_entities), não objetos ORM,
+    para que a memória do worker fique constante seja qual for o tamanho.
+    """
+    columns = [column['name'] for column in query.column_descriptions]
+    
+    def generate_ndjson():
+        for row in query.yield_per(YIELD_PER):
+            yield json.dumps(dict(zip(columns, map(_serialize, row)))) + '\n'
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        
+        for i, row in enumerate(query.yield_per(YIELD_PER), start=1):
+            writer.writerow([_serialize(value) for value in row])
+            # Enviar em blocos para não fazer um write por linha
+            if i % YIELD_PER == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        
+        yield buffer.getvalue()
+    
+    if fmt == 'csv':
+        response = Response(stream_with_context(generate_csv()), mimetype='text/csv')
+        response.headers['Content-Disposition'] = f'attachment; filename={filename}.csv'
+    else:
+        response = Response(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson')
+    
+    return response
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
@@ -0,0 +1,99 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contextlib import contextmanager
+from datetime import datetime
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from src.config import TestingConfig
+from src.main import create_app, db
+
+@pytest.fixture
+def app():
+    """Aplicação com TestingConfig (SQLite em memória, orçamentos de consultas em modo 'raise')."""
+    from src.services.cache import clear_caches
+    from src.services.similarity import index
+    from src.services.stats_store import store
+    
+    # Caches e cópias em memória são por processo: cada teste tem uma base de dados nova
+    clear_caches()
+    store.reset()
+    index.reset()
+    
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Cliente de teste autenticado com um token JWT."""
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity=1)}'
+    # O primeiro pedido corre o create_all de before_first_request
+    client.get('/')
+    return client
+
+@contextmanager
+def count_queries():
+    """Regista as instruções SQL executadas dentro do bloco (lista de strings)."""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+def create_match(players_per_team, season='2022-2023', competition='Liga Teste', status='completed'):
+    """
+    Cria duas equipas com players_per_team jogadores cada, um jogo entre
+    elas com estatísticas de todos os jogadores e um golo e um cartão por
+    equipa na timeline. Devolve o jogo.
+    """
+    from src.models import Team, Player, Match, Statistic, MatchEvent
+    
+    teams = [
+        Team(name=f'Equipa {i} ({players_per_team})', country='Portugal', league=competition)
+        for i in (1, 2)
+    ]
+    db.session.add_all(teams)
+    db.session.flush()
+    
+    rosters = []
+    for team in teams:
+        roster = [
+            Player(name=f'Jogador {team.id}-{n}', position='Midfielder', nationality='Portugal', team_id=team.id)
+            for n in range(players_per_team)
+        ]
+        db.session.add_all(roster)
+        rosters.append(roster)
+    db.session.flush()
+    
+    match = Match(
+        date=datetime(2023, 1, 1 + players_per_team % 28, 15), home_team_id=teams[0].id, away_team_id=teams[1].id,
+        home_score=1, away_score=1, season=season, competition=competition, status=status
+    )
+    db.session.add(match)
+    db.session.flush()
+    
+    for roster in rosters:
+        for n, player in enumerate(roster):
+            db.session.add(Statistic(
+                match_id=match.id, player_id=player.id, minutes_played=90, goals=1 if n == 0 else 0,
+                shots=2, shots_on_target=1, passes=40, passes_completed=32, tackles=2
+            ))
+    
+    for team, roster in zip(teams, rosters):
+        db.session.add(MatchEvent(match_id=match.id, team_id=team.id, player_id=roster[0].id, type='goal', minute=30))
+        db.session.add(MatchEvent(match_id=match.id, team_id=team.id, player_id=roster[-1].id, type='yellow_card', minute=60))
+    
+    db.session.commit()
+    return match
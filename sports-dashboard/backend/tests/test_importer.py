@@ -0,0 +1,81 @@
+import io
+from conftest import count_queries, create_match
+from src.models import HeadToHead, Match, Standing
+from src.services import importer
+from src.services.head_to_head import rebuild_head_to_head
+from src.services.standings import rebuild_standings
+
+COLUMNS = 'date,home_team_id,away_team_id,season,competition,home_score,away_score,status'
+
+def csv_file(*rows):
+    return io.StringIO('\n'.join([COLUMNS, *rows]) + '\n')
+
+def derived_tables():
+    standings = {
+        (row.league, row.season, row.team_id): (row.played, row.wins, row.draws, row.losses, row.points)
+        for row in Standing.query
+    }
+    pairs = {
+        (row.team_low_id, row.team_high_id): (row.played, row.low_wins, row.high_wins, row.draws, row.last_results)
+        for row in HeadToHead.query
+    }
+    return standings, pairs
+
+def setup_league():
+    first = create_match(players_per_team=1)
+    second = create_match(players_per_team=2)
+    rebuild_standings()
+    rebuild_head_to_head()
+    return first, second
+
+def test_match_import_refreshes_only_touched_rows(app):
+    first, second = setup_league()
+    home, away = first.home_team_id, first.away_team_id
+    source = csv_file(
+        f'2023-08-01 15:00,{home},{away},2023-2024,Liga Teste,3,0,completed',
+        f'2023-09-01 15:00,{away},{home},2023-2024,Liga Teste,1,1,completed',
+        f'{first.date:%Y-%m-%d %H:%M},{home},{away},2021-2022,Liga Teste,,,'
+    )
+    
+    with count_queries() as statements:
+        summary = importer.import_file('matches', source, mode='upsert')
+    
+    assert 'error' not in summary
+    assert (summary['inserted'], summary['updated']) == (2, 1)
+    deletes = [statement for statement in statements if statement.startswith('DELETE')]
+    assert deletes and all('WHERE' in statement for statement in deletes)
+    
+    # O resultado é o mesmo de uma reconstrução completa, incluindo a
+    # temporada antiga do jogo atualizado, que deixa de ter linhas
+    imported = derived_tables()
+    rebuild_standings()
+    rebuild_head_to_head()
+    assert imported == derived_tables()
+    assert not Standing.query.filter_by(season='2022-2023', team_id=home).count()
+    assert Standing.query.filter_by(season='2022-2023', team_id=second.home_team_id).count() == 1
+
+def test_failed_chunk_keeps_derived_tables_of_committed_chunks(app, monkeypatch):
+    first, _ = setup_league()
+    home, away = first.home_team_id, first.away_team_id
+    source = csv_file(
+        f'2023-08-01 15:00,{home},{away},2023-2024,Liga Teste,2,0,completed',
+        f'2023-09-01 15:00,{away},{home},2023-2024,Liga Teste,1,0,completed'
+    )
+    
+    write = importer._write
+    calls = []
+    def failing_write(entity, inserts, updates):
+        calls.append(entity)
+        if len(calls) == 2:
+            raise RuntimeError('disco cheio')
+        write(entity, inserts, updates)
+    monkeypatch.setattr(importer, '_write', failing_write)
+    
+    summary = importer.import_file('matches', source, chunk_size=1)
+    
+    assert 'disco cheio' in summary['error']
+    assert summary['inserted'] == 1
+    assert summary['refreshed'] == ['standings', 'head_to_head']
+    assert Match.query.filter_by(season='2023-2024').count() == 1
+    standing = Standing.query.filter_by(season='2023-2024', team_id=home).one()
+    assert (standing.played, standing.wins) == (1, 1)
@@ -0,0 +1,78 @@
+import pytest
+from conftest import create_match
+from src.main import db
+from src.models import MatchEvent, Player
+
+def events_url(match):
+    return f'/api/matches/{match.id}/events'
+
+@pytest.mark.parametrize('body', [
+    [{'type': 'goal'}],
+    {'events': []},
+    {'events': {'type': 'goal'}},
+    {'events': ['goal']},
+    {'events': [{'type': 'goal'}, 42]},
+])
+def test_malformed_bodies_are_rejected(client, body):
+    match = create_match(players_per_team=1)
+    
+    response = client.post(events_url(match), json=body)
+    
+    assert response.status_code == 400
+    assert MatchEvent.query.filter_by(match_id=match.id).count() == 4
+
+@pytest.mark.parametrize('field, value', [
+    ('minute', True),
+    ('second', False),
+    ('team_id', True),
+    ('player_id', {'id': 1}),
+])
+def test_boolean_and_non_integer_values_are_rejected(client, field, value):
+    match = create_match(players_per_team=1)
+    event = {'type': 'shot', 'team_id': match.home_team_id, 'minute': 10, 'second': 0}
+    event[field] = value
+    
+    response = client.post(events_url(match), json={'events': [event]})
+    
+    assert response.status_code == 400
+
+def test_valid_events_are_stored(client):
+    match = create_match(players_per_team=1)
+    player = Player.query.filter_by(team_id=match.home_team_id).first()
+    
+    response = client.post(events_url(match), json={'events': [
+        {'type': 'shot', 'team_id': match.home_team_id, 'player_id': player.id, 'minute': 12},
+        {'type': 'shot_on_target', 'team_id': match.away_team_id, 'minute': 80, 'second': 5},
+    ]})
+    
+    assert response.status_code == 201
+    assert len(response.get_json()['events']) == 2
+
+def test_timeline_is_derived_for_matches_without_events(client):
+    match = create_match(players_per_team=2)
+    MatchEvent.query.filter_by(match_id=match.id).delete()
+    match.away_score = 2
+    db.session.commit()
+    
+    data = client.get(f'/api/matches/{match.id}/timeline').get_json()
+    
+    assert data['derived'] is True
+    goals = [event for event in data['timeline'] if event['type'] == 'goal']
+    home = [event for event in goals if event['team_id'] == match.home_team_id]
+    away = [event for event in goals if event['team_id'] == match.away_team_id]
+    # Um golo por equipa nas estatísticas e um golo visitante só no resultado
+    assert len(home) == 1 and home[0]['player_name']
+    assert sorted(event['player_id'] is None for event in away) == [False, True]
+    assert all(event['minute'] is None for event in data['timeline'])
+    
+    # Filtros de minuto ou polling incremental não inventam eventos
+    data = client.get(f'/api/matches/{match.id}/timeline?since_event_id=0').get_json()
+    assert data['timeline'] == [] and data['derived'] is False
+
+def test_timeline_with_events_is_not_derived(client):
+    match = create_match(players_per_team=2)
+    
+    data = client.get(f'/api/matches/{match.id}/timeline').get_json()
+    
+    assert data['derived'] is False
+    assert all(event['id'] for event in data['timeline'])
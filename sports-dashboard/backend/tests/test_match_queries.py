@@ -0,0 +1,46 @@
+import pytest
+from conftest import count_queries, create_match
+
+# O número de instruções SQL das rotas de um jogo não pode crescer com o plantel
+ROUTES = ('/api/matches/{id}', '/api/matches/{id}/statistics', '/api/matches/{id}/timeline')
+
+def request_count(client, url):
+    with count_queries() as statements:
+        response = client.get(url)
+    assert response.status_code == 200, response.get_json()
+    return len(statements), response.get_json()
+
+@pytest.mark.parametrize('backend', ['sql', 'columnar'])
+@pytest.mark.parametrize('route', ROUTES)
+def test_query_count_does_not_grow_with_roster(app, client, route, backend):
+    app.config['STATS_BACKEND'] = backend
+    small = create_match(players_per_team=2)
+    large = create_match(players_per_team=30)
+    
+    # Primeiro pedido a cada jogo com as caches e a cópia colunar por carregar
+    for match in (small, large):
+        client.get(route.format(id=match.id))
+    
+    small_count, _ = request_count(client, route.format(id=small.id))
+    large_count, _ = request_count(client, route.format(id=large.id))
+    
+    assert small_count == large_count
+
+def test_match_statistics_cover_whole_roster(client):
+    match = create_match(players_per_team=30)
+    
+    _, data = request_count(client, f'/api/matches/{match.id}/statistics')
+    
+    teams = [stat['team_id'] for stat in data['player_statistics']]
+    assert teams.count(data['home_team']['id']) == 30
+    assert teams.count(data['away_team']['id']) == 30
+    assert data['home_team']['statistics']['passes'] == 30 * 40
+
+def test_timeline_lists_events_in_order(client):
+    match = create_match(players_per_team=30)
+    
+    _, data = request_count(client, f'/api/matches/{match.id}/timeline')
+    
+    minutes = [event['minute'] for event in data['timeline']]
+    assert minutes == sorted(minutes)
+    assert len(minutes) == 4
@@ -0,0 +1,33 @@
+def test_metrics_are_hidden_without_token(app, client):
+    app.config['METRICS_TOKEN'] = None
+    
+    assert client.get('/api/metrics').status_code == 404
+
+def test_metrics_require_configured_token(app, client):
+    app.config['METRICS_TOKEN'] = 'segredo'
+    
+    assert client.get('/api/metrics').status_code == 401
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer outro'}).status_code == 401
+    
+    response = client.get('/api/metrics', headers={'Authorization': 'Bearer segredo'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+def test_non_ascii_authorization_is_refused(app, client):
+    app.config['METRICS_TOKEN'] = 'segredo'
+    
+    response = client.get('/api/metrics', headers={'Authorization': 'Bearer sécret'.encode('utf-8').decode('latin-1')})
+    
+    assert response.status_code == 401
+
+def test_slow_queries_require_metrics_token(app, client):
+    # O cliente de testes envia um JWT válido, que não chega
+    app.config['METRICS_TOKEN'] = None
+    assert client.get('/api/metrics/slow-queries').status_code == 404
+    
+    app.config['METRICS_TOKEN'] = 'segredo'
+    assert client.get('/api/metrics/slow-queries').status_code == 401
+    
+    response = client.get('/api/metrics/slow-queries', headers={'Authorization': 'Bearer segredo'})
+    assert response.status_code == 200
+    assert 'statements' in response.get_json()
@@ -0,0 +1,93 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from conftest import create_match
+from src.main import db
+from src.models import Player
+from src.utils.query_budget import QueryBudgetExceeded, query_budget, statement_shape
+
+# Um pedido por rota com @query_budget; ao acrescentar um orçamento acrescenta-se aqui o URL
+BUDGET_URLS = {
+    'team.get_teams': '/api/teams/',
+    'team.get_team': '/api/teams/{team1}',
+    'team.get_team_players': '/api/teams/{team1}/players',
+    'team.get_team_matches': '/api/teams/{team1}/matches',
+    'team.get_team_statistics': '/api/teams/{team1}/statistics',
+    'player.get_players': '/api/players/?team_id={team1}',
+    'player.get_player': '/api/players/{player1}',
+    'player.get_player_statistics': '/api/players/{player1}/statistics',
+    'player.get_player_performance': '/api/players/{player1}/performance',
+    'match.get_matches': '/api/matches/?season={season}',
+    'match.get_match': '/api/matches/{match}',
+    'match.get_match_statistics': '/api/matches/{match}/statistics',
+    'match.get_match_timeline': '/api/matches/{match}/timeline',
+    'match.stream_match': '/api/matches/{match}/stream',
+    'analytics.get_dashboard_data': '/api/analytics/dashboard',
+    'analytics.compare_teams': '/api/analytics/team-comparison?team1_id={team1}&team2_id={team2}',
+    'analytics.compare_players': '/api/analytics/player-comparison?ids={player_ids}',
+    'analytics.get_similar_players': '/api/analytics/similar-players?player_id={player1}',
+    'analytics.get_league_table': '/api/analytics/league-table?league={league}&season={season}',
+    'analytics.get_ratings_leaderboard': '/api/analytics/ratings?season={season}',
+    'analytics.get_performance_trends': '/api/analytics/performance-trends?player_id={player1}',
+    'statistic.get_statistics': '/api/statistics/?match_id={match}',
+    'charts.performance_trends_chart': '/api/charts/performance-trends?team_id={team1}&format=svg',
+    'charts.comparison_radar_chart': '/api/charts/comparison-radar?player1_id={player1}&player2_id={player2}&format=svg',
+    'charts.league_table_chart': '/api/charts/league-table?league={league}&season={season}&format=svg'
+}
+
+@pytest.fixture
+def ids(app):
+    create_match(players_per_team=2)
+    match = create_match(players_per_team=30)
+    players = [player.id for player in Player.query.filter_by(team_id=match.home_team_id).order_by(Player.id)]
+    return {
+        'match': match.id,
+        'team1': match.home_team_id,
+        'team2': match.away_team_id,
+        'player1': players[0],
+        'player2': players[1],
+        'player_ids': ','.join(map(str, players)),
+        'league': match.competition,
+        'season': match.season
+    }
+
+def budgeted_endpoints(app):
+    return sorted(endpoint for endpoint, view in app.view_functions.items() if hasattr(view, 'query_budget'))
+
+def test_every_budget_has_a_url(app):
+    assert budgeted_endpoints(app) == sorted(BUDGET_URLS)
+
+@pytest.mark.parametrize('backend', ['sql', 'columnar'])
+def test_routes_stay_within_budget(app, client, ids, backend):
+    # Em TestingConfig o modo é 'raise': exceder o orçamento faz o pedido falhar
+    app.config['STATS_BACKEND'] = backend
+    
+    for endpoint in budgeted_endpoints(app):
+        url = BUDGET_URLS[endpoint].format(**ids)
+        limit = app.view_functions[endpoint].query_budget
+        
+        # Primeiro pedido com as caches frias, segundo a quente
+        for _ in range(2):
+            response = client.get(url)
+            response.close()
+            assert response.status_code == 200, (url, response.get_data(as_text=True)[:200])
+            assert int(response.headers['X-Query-Count']) <= limit, url
+            assert 'X-Query-Repeats' not in response.headers, url
+
+def test_per_row_loop_exceeds_budget(app):
+    @app.route('/test/n-plus-one')
+    @query_budget(3)
+    def n_plus_one():
+        return {'names': [Player.query.get(player_id).name for player_id, in db.session.query(Player.id)]}
+    
+    create_match(players_per_team=5)
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity=1)}'
+    
+    with pytest.raises(QueryBudgetExceeded) as error:
+        client.get('/test/n-plus-one')
+    
+    assert 'Repetidas: 10×' in str(error.value)
+
+def test_statement_shape_collapses_parameter_lists():
+    assert statement_shape('SELECT * FROM players WHERE id IN (?, ?, ?)') == 'SELECT * FROM players WHERE id IN (?)'
+    assert statement_shape('INSERT INTO t (a, b) VALUES (?), (?), (?)') == 'INSERT INTO t (a, b) VALUES (?)'
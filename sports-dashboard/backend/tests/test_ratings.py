@@ -0,0 +1,104 @@
+from datetime import datetime
+import pytest
+from conftest import count_queries, create_match
+from src.main import db
+from src.models import Match, Player, PlayerMatchRating, Statistic, Team
+from src.services.ratings import rebuild_ratings
+
+def ratings_snapshot():
+    return {
+        row.statistic_id: (row.player_id, row.match_id, round(row.rating, 6), round(row.rolling_rating, 6))
+        for row in PlayerMatchRating.query
+    }
+
+def assert_matches_rebuild():
+    incremental = ratings_snapshot()
+    rebuild_ratings()
+    assert incremental == ratings_snapshot()
+
+@pytest.fixture
+def matches(app):
+    first = create_match(players_per_team=3)
+    second = Match(
+        date=datetime(2023, 2, 1, 15), home_team_id=first.away_team_id, away_team_id=first.home_team_id,
+        home_score=2, away_score=0, season=first.season, competition=first.competition, status='completed'
+    )
+    db.session.add(second)
+    db.session.commit()
+    return first, second
+
+def test_statistics_are_rated_on_write(matches):
+    assert PlayerMatchRating.query.count() == Statistic.query.count()
+    assert_matches_rebuild()
+
+def test_leaderboard_does_not_write(client, matches):
+    with count_queries() as statements:
+        response = client.get('/api/analytics/ratings')
+    
+    assert response.status_code == 200
+    assert len(response.get_json()['leaderboard']) == 6
+    assert all(statement.lstrip().upper().startswith('SELECT') for statement in statements)
+
+def test_bulk_insert_rates_new_rows(client, matches):
+    first, second = matches
+    players = Player.query.filter(Player.team_id.in_([first.home_team_id, first.away_team_id])).all()
+    
+    response = client.post('/api/statistics/bulk', json={'statistics': [
+        {'match_id': second.id, 'player_id': player.id, 'minutes_played': 90, 'goals': 1, 'passes': 10, 'passes_completed': 9}
+        for player in players
+    ]})
+    
+    assert response.status_code == 201, response.get_json()
+    assert PlayerMatchRating.query.count() == Statistic.query.count()
+    assert_matches_rebuild()
+
+def test_edits_and_deletes_rescore(client, matches):
+    first, second = matches
+    players = Player.query.filter_by(team_id=first.home_team_id).order_by(Player.id).all()
+    for player in players:
+        db.session.add(Statistic(match_id=second.id, player_id=player.id, minutes_played=90, goals=0, tackles=4))
+    db.session.commit()
+    
+    edited = Statistic.query.filter_by(match_id=first.id, player_id=players[0].id).one()
+    edited.goals = 3
+    db.session.delete(Statistic.query.filter_by(match_id=second.id, player_id=players[1].id).one())
+    # Linha atribuída a outro jogador: os dois têm a média móvel recalculada
+    moved = Statistic.query.filter_by(match_id=second.id, player_id=players[2].id).one()
+    moved.player_id = Player.query.filter_by(team_id=first.away_team_id).order_by(Player.id).first().id
+    db.session.commit()
+    
+    assert PlayerMatchRating.query.count() == Statistic.query.count()
+    assert_matches_rebuild()
+
+def test_match_date_change_reorders_rolling_ratings(matches):
+    first, second = matches
+    player = Player.query.filter_by(team_id=first.home_team_id).order_by(Player.id).first()
+    db.session.add(Statistic(match_id=second.id, player_id=player.id, minutes_played=90, goals=0))
+    db.session.commit()
+    
+    rolling = dict(db.session.query(PlayerMatchRating.match_id, PlayerMatchRating.rolling_rating).filter_by(player_id=player.id))
+    
+    # O segundo jogo passa a ser anterior ao primeiro
+    second.date = datetime(2022, 12, 1, 15)
+    db.session.commit()
+    
+    reordered = dict(db.session.query(PlayerMatchRating.match_id, PlayerMatchRating.rolling_rating).filter_by(player_id=player.id))
+    assert reordered != rolling
+    assert_matches_rebuild()
+
+def test_leaderboard_league_uses_team_at_match_time(client, matches):
+    first, _ = matches
+    abroad = Team(name='Clube estrangeiro', country='Espanha', league='Liga Estrangeira')
+    db.session.add(abroad)
+    db.session.flush()
+    player = Player.query.filter_by(team_id=first.home_team_id).first()
+    player.team_id = abroad.id
+    db.session.commit()
+    
+    def listed(league):
+        data = client.get(f'/api/analytics/ratings?league={league}').get_json()
+        return {row['player_id'] for row in data['leaderboard']}
+    
+    # Os ratings continuam na liga em que foram obtidos
+    assert player.id in listed(first.competition)
+    assert player.id not in listed('Liga Estrangeira')
@@ -0,0 +1,42 @@
+import pytest
+from conftest import create_match
+from src.services import head_to_head, player_rollup, ratings, standings, team_match_stats
+
+REBUILDS = {
+    'standings': standings.rebuild_standings,
+    'head_to_head': head_to_head.rebuild_head_to_head,
+    'player_season_stats': player_rollup.rebuild_player_season_stats,
+    'team_match_stats': team_match_stats.rebuild_team_match_stats,
+    'ratings': ratings.rebuild_ratings
+}
+
+@pytest.mark.parametrize('name', REBUILDS)
+def test_rebuild_invalidates_etags(client, name):
+    match = create_match(players_per_team=2)
+    player_id = match.statistics[0].player_id
+    urls = [
+        '/api/analytics/league-table?league=Liga Teste&season=2022-2023',
+        '/api/analytics/dashboard',
+        f'/api/teams/{match.home_team_id}/statistics',
+        f'/api/players/{player_id}/statistics',
+        f'/api/matches/{match.id}/statistics'
+    ]
+    etags = {url: client.get(url).headers['ETag'] for url in urls}
+    
+    REBUILDS[name]()
+    
+    # Depois da reconstrução nenhum cliente recebe 304 com a representação antiga
+    for url, etag in etags.items():
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 200, url
+
+def test_scoped_rebuild_keeps_entity_etags(client):
+    match = create_match(players_per_team=2)
+    team_url = f'/api/teams/{match.home_team_id}/statistics'
+    table_url = '/api/analytics/league-table?league=Liga Teste&season=2022-2023'
+    etags = {url: client.get(url).headers['ETag'] for url in (team_url, table_url)}
+    
+    # Reconstruções parciais (importações) só incrementam os âmbitos globais
+    standings.rebuild_standings(team_ids=[match.home_team_id])
+    
+    assert client.get(team_url, headers={'If-None-Match': etags[team_url]}).status_code == 304
+    assert client.get(table_url, headers={'If-None-Match': etags[table_url]}).status_code == 200
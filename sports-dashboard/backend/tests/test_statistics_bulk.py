@@ -0,0 +1,120 @@
+import pytest
+from conftest import create_match
+from src.main import db
+from src.models import Match, Player, Statistic, Team
+
+@pytest.fixture
+def slot(app):
+    """Um jogo e um jogador ainda sem estatísticas nesse jogo."""
+    match = create_match(players_per_team=2)
+    player = Player.query.filter_by(team_id=match.home_team_id).first()
+    Statistic.query.filter_by(match_id=match.id, player_id=player.id).delete()
+    db.session.commit()
+    return {'match_id': match.id, 'player_id': player.id}
+
+def post_line(client, line):
+    return client.post('/api/statistics/bulk', json={'statistics': [line]})
+
+@pytest.mark.parametrize('body', [
+    [{'match_id': 1, 'player_id': 1}],
+    {'statistics': {'match_id': 1, 'player_id': 1}},
+    {'statistics': [1, 2]},
+    {'match_id': 1, 'home': 'player'},
+])
+def test_malformed_bodies_are_rejected(client, body):
+    response = client.post('/api/statistics/bulk', json=body)
+    
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('value, expected', [
+    (True, True), (False, False), ('false', False), ('True', True), ('0', False), (1, True), (None, False)
+])
+def test_clean_sheets_are_parsed(client, slot, value, expected):
+    response = post_line(client, {**slot, 'clean_sheets': value})
+    
+    assert response.status_code == 201
+    assert Statistic.query.filter_by(**slot).one().clean_sheets is expected
+
+@pytest.mark.parametrize('value', ['no', 'sim', 2, 0.5, [True]])
+def test_invalid_clean_sheets_are_rejected(client, slot, value):
+    response = post_line(client, {**slot, 'clean_sheets': value})
+    
+    assert response.status_code == 400
+    assert 'clean_sheets' in response.get_json()['errors'][0]['error']
+
+@pytest.mark.parametrize('line', [
+    {'goals': 1.7},
+    {'passes': '40.5'},
+    {'tackles': True},
+    {'player_id': 1.5},
+])
+def test_fractional_and_boolean_counts_are_rejected(client, slot, line):
+    response = post_line(client, {**slot, **line})
+    
+    assert response.status_code == 400
+    assert Statistic.query.filter_by(match_id=slot['match_id'], player_id=slot['player_id']).count() == 0
+
+def test_whole_numbers_are_accepted(client, slot):
+    response = post_line(client, {**slot, 'goals': 2.0, 'passes': '40', 'passes_completed': 30, 'expected_goals': 0.7})
+    
+    assert response.status_code == 201
+    stat = Statistic.query.filter_by(**slot).one()
+    assert (stat.goals, stat.passes, stat.expected_goals) == (2, 40, 0.7)
+
+def transfer(player_id):
+    """Muda o jogador para uma equipa que não participa no jogo."""
+    other = Team(name='Terceira equipa', country='Portugal', league='Liga Teste')
+    db.session.add(other)
+    db.session.flush()
+    Player.query.get(player_id).team_id = other.id
+    db.session.commit()
+    return other.id
+
+def test_box_score_sides_set_the_team(client, slot):
+    match = Match.query.get(slot['match_id'])
+    transfer(slot['player_id'])
+    
+    response = client.post('/api/statistics/bulk', json={
+        'match_id': match.id, 'home': [{'player_id': slot['player_id'], 'passes': 10, 'passes_completed': 5}]
+    })
+    
+    assert response.status_code == 201
+    assert Statistic.query.filter_by(**slot).one().team_id == match.home_team_id
+    data = client.get(f'/api/matches/{match.id}/statistics').get_json()
+    row = next(stat for stat in data['player_statistics'] if stat['player_id'] == slot['player_id'])
+    assert row['team_name'] == data['home_team']['name']
+
+@pytest.mark.parametrize('explicit', [False, True])
+def test_rows_for_teams_outside_the_match_are_rejected(client, slot, explicit):
+    # Equipa atual do jogador (por omissão) ou indicada em team_id
+    other = transfer(slot['player_id'])
+    line = {**slot, 'team_id': other} if explicit else slot
+    
+    response = post_line(client, line)
+    
+    assert response.status_code == 400
+    assert response.get_json()['errors'][0]['error'] == 'A equipa não participa neste jogo.'
+
+def test_explicit_team_must_match_box_score_side(client, slot):
+    match = Match.query.get(slot['match_id'])
+    
+    response = client.post('/api/statistics/bulk', json={
+        'match_id': match.id, 'away': [{'player_id': slot['player_id'], 'team_id': match.home_team_id}]
+    })
+    
+    assert response.status_code == 400
+    
+    response = post_line(client, {**slot, 'team_id': match.away_team_id})
+    assert response.status_code == 201
+    assert Statistic.query.filter_by(**slot).one().team_id == match.away_team_id
+
+@pytest.mark.parametrize('url, body', [
+    ('/api/statistics/bulk', {'batch_size': '10'}),
+    ('/api/statistics/bulk', {'batch_size': 2.5}),
+    ('/api/statistics/bulk?batch_size=dez', {}),
+])
+def test_invalid_batch_size_is_rejected(client, slot, url, body):
+    response = client.post(url, json={'statistics': [slot], **body})
+    
+    assert response.status_code == 400
+    assert 'batch_size' in response.get_json()['error']
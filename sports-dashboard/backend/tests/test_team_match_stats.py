@@ -0,0 +1,102 @@
+import pytest
+from conftest import count_queries, create_match
+from src.main import db
+from src.models import Player, Statistic, Team, TeamMatchStat
+from src.services.team_match_stats import rebuild_team_match_stats
+
+def box_scores():
+    return {
+        (row.match_id, row.team_id): (row.passes, row.passes_completed, row.possession, row.pass_accuracy)
+        for row in TeamMatchStat.query
+    }
+
+def test_statistics_keep_team_at_match_time(client):
+    match = create_match(players_per_team=3)
+    player = Player.query.filter_by(team_id=match.home_team_id).first()
+    before = box_scores()
+    
+    other = Team(name='Outra equipa', country='Portugal', league='Liga Teste')
+    db.session.add(other)
+    db.session.commit()
+    
+    with count_queries() as statements:
+        response = client.put(f'/api/players/{player.id}', json={'team_id': other.id})
+    assert response.status_code == 200
+    
+    # A transferência não lê as estatísticas do jogador nem recalcula box scores
+    assert not any('statistics' in statement or 'team_match_stats' in statement for statement in statements)
+    assert {stat.team_id for stat in Statistic.query.filter_by(player_id=player.id)} == {match.home_team_id}
+    assert box_scores() == before
+    
+    response = client.get(f'/api/matches/{match.id}/statistics')
+    home = response.get_json()['home_team']
+    assert home['statistics']['passes'] == 3 * 40
+
+def test_new_statistics_take_current_team(client):
+    match = create_match(players_per_team=2)
+    player = Player.query.filter_by(team_id=match.away_team_id).first()
+    stat = Statistic.query.filter_by(match_id=match.id, player_id=player.id).one()
+    db.session.delete(stat)
+    db.session.commit()
+    
+    response = client.post('/api/statistics/bulk', json={'statistics': [
+        {'match_id': match.id, 'player_id': player.id, 'minutes_played': 90, 'passes': 40, 'passes_completed': 32}
+    ]})
+    assert response.status_code == 201, response.get_json()
+    
+    assert Statistic.query.filter_by(match_id=match.id, player_id=player.id).one().team_id == match.away_team_id
+    assert Statistic.query.filter(Statistic.team_id.is_(None)).count() == 0
+
+def test_incremental_box_scores_match_rebuild(client):
+    match = create_match(players_per_team=4)
+    stat = Statistic.query.filter_by(match_id=match.id).first()
+    stat.passes = 100
+    db.session.commit()
+    
+    incremental = box_scores()
+    rebuild_team_match_stats()
+    assert box_scores() == incremental
+
+def test_statistics_filter_by_team_at_match_time(client):
+    match = create_match(players_per_team=2)
+    player = Player.query.filter_by(team_id=match.home_team_id).first()
+    player.team_id = match.away_team_id
+    db.session.commit()
+    
+    def listed(team_id):
+        data = client.get(f'/api/statistics/?match_id={match.id}&team_id={team_id}').get_json()
+        return {stat['player_id'] for stat in data['statistics']}
+    
+    assert player.id in listed(match.home_team_id)
+    assert player.id not in listed(match.away_team_id)
+
+def test_statistics_for_teams_outside_the_match_are_refused(app):
+    match = create_match(players_per_team=1)
+    other = Team(name='Terceira equipa', country='Portugal', league='Liga Teste')
+    db.session.add(other)
+    db.session.flush()
+    player = Player(name='Reforço', position='Forward', nationality='Portugal', team_id=other.id)
+    db.session.add(player)
+    db.session.commit()
+    
+    db.session.add(Statistic(match_id=match.id, player_id=player.id, minutes_played=90))
+    with pytest.raises(ValueError):
+        db.session.flush()
+    db.session.rollback()
+    
+    # Com a equipa do jogo indicada explicitamente a linha é aceite
+    db.session.add(Statistic(match_id=match.id, player_id=player.id, team_id=match.home_team_id, minutes_played=90))
+    db.session.commit()
+
+def test_match_statistics_name_only_the_playing_teams(client):
+    match = create_match(players_per_team=1)
+    other = Team(name='Terceira equipa', country='Portugal', league='Liga Teste')
+    db.session.add(other)
+    db.session.commit()
+    # Linha antiga atribuída a uma equipa fora do jogo (escrita sem listeners)
+    db.session.execute(Statistic.__table__.update().where(Statistic.match_id == match.id).values(team_id=other.id))
+    db.session.commit()
+    
+    data = client.get(f'/api/matches/{match.id}/statistics').get_json()
+    
+    assert {stat['team_name'] for stat in data['player_statistics']} == {None}